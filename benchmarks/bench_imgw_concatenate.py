@@ -0,0 +1,35 @@
+"""
+Benchmark of cloupy.scraping.imgw.concatenate_data for a growing number of files.
+
+The files are synthetic daily synop ('s_d') tables of one station-year each,
+packed into in-memory archives, so no network access is needed. With a single
+concatenation the time per file should stay roughly constant when the number of
+files grows (linear scaling).
+
+Usage (with cloupy installed or the repository root on PYTHONPATH):
+    python benchmarks/bench_imgw_concatenate.py [max_files]
+"""
+import contextlib
+import io
+import sys
+import time
+
+from cloupy.scraping import imgw
+from synthetic_imgw import make_archive
+
+
+def main(max_files=400):
+    print('{:>8} {:>10} {:>16}'.format('files', 'seconds', 'ms per file'))
+    files_number = 25
+    while files_number <= max_files:
+        archive = make_archive(files_number)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            imgw.concatenate_data(None, 's_d', None, None, False, range(2018, 2019), True, archives=[archive])
+            elapsed = time.perf_counter() - start
+        print('{:>8} {:>10.3f} {:>16.2f}'.format(files_number, elapsed, elapsed / files_number * 1000))
+        files_number *= 2
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 400)
@@ -0,0 +1,47 @@
+"""
+Benchmark of parsing the IMGW tables with concatenate_data(engine=...).
+
+The files are a synthetic full year of daily synop data ('s_d', one table per
+station, about as many stations as in the IMGW synop network) packed into an
+in-memory archive, so no network access is needed. Engines which are not
+installed are skipped.
+
+Usage (with cloupy installed or the repository root on PYTHONPATH):
+    python benchmarks/bench_imgw_engines.py [stations_number]
+"""
+import contextlib
+import importlib
+import io
+import sys
+import time
+
+from cloupy.scraping import imgw
+from cloupy.scraping.parsing_engines import ENGINE_REQUIREMENTS
+from synthetic_imgw import make_archive
+
+
+def main(stations_number=60):
+    archive = make_archive(stations_number)
+    print('{} stations, 365 days'.format(stations_number))
+    print('{:>8} {:>18} {:>10}'.format('engine', 'memory optimized', 'seconds'))
+    for engine in ['pandas', 'pyarrow', 'polars']:
+        try:
+            for module in ENGINE_REQUIREMENTS[engine]:
+                importlib.import_module(module)
+        except ImportError:
+            print('{:>8} {:>18} {:>10}'.format(engine, '-', 'skipped'))
+            continue
+
+        for optimize_memory_usage in [False, True]:
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                imgw.concatenate_data(
+                    None, 's_d', None, None, optimize_memory_usage, range(2018, 2019), True, archives=[archive],
+                    engine=engine
+                )
+                elapsed = time.perf_counter() - start
+            print('{:>8} {:>18} {:>10.3f}'.format(engine, str(optimize_memory_usage), elapsed))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 60)
@@ -0,0 +1,44 @@
+"""
+Memory usage of the IMGW tables with and without 'optimize_memory_usage'.
+
+A full year of daily synop data ('s_d', about 60 stations) is generated
+synthetically, parsed both ways, and the optimized table is checked to hold
+exactly the same values as the default one.
+
+Usage (with cloupy installed or the repository root on PYTHONPATH):
+    python benchmarks/bench_imgw_memory.py [stations_number]
+"""
+import contextlib
+import io
+import sys
+
+import numpy as np
+
+from cloupy.scraping import imgw
+from synthetic_imgw import make_archive
+
+
+def main(stations_number=60):
+    archive = make_archive(stations_number)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = imgw.concatenate_data(None, 's_d', None, None, False, range(2018, 2019), True, archives=[archive])
+        optimized_df = imgw.concatenate_data(None, 's_d', None, None, True, range(2018, 2019), True, archives=[archive])
+
+    for column in df.columns:
+        if optimized_df[column].dtype == np.dtype('float32'):
+            # float32 holds every value with one decimal place, rounding restores the parsed float64
+            assert np.array_equal(optimized_df[column].astype('float64').round(1), df[column], equal_nan=True)
+        else:
+            assert list(optimized_df[column].astype(object).fillna(-1)) == list(df[column].astype(object).fillna(-1))
+
+    memory = df.memory_usage(deep=True).sum() / 1024 ** 2
+    optimized_memory = optimized_df.memory_usage(deep=True).sum() / 1024 ** 2
+    print('rows: {}, columns: {}'.format(*df.shape))
+    print('default dtypes:   {:8.2f} MiB'.format(memory))
+    print('compact dtypes:   {:8.2f} MiB'.format(optimized_memory))
+    print('reduction:        {:8.1f} %'.format((1 - optimized_memory / memory) * 100))
+    print('all values equal: True')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 60)
@@ -0,0 +1,37 @@
+"""
+Benchmark of parsing the IMGW tables with concatenate_data(parse_workers=...).
+
+The files are synthetic daily synop ('s_d') tables of one station-year each,
+packed into an in-memory archive, so no network access is needed. The time
+should drop with the number of processes up to the number of CPU cores.
+
+Usage (with cloupy installed or the repository root on PYTHONPATH):
+    python benchmarks/bench_imgw_parse_workers.py [files_number]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+from cloupy.scraping import imgw
+from synthetic_imgw import make_archive
+
+
+def main(files_number=400):
+    archive = make_archive(files_number)
+    print('{} files, {} CPU cores'.format(files_number, os.cpu_count()))
+    print('{:>8} {:>10}'.format('workers', 'seconds'))
+    for parse_workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            imgw.concatenate_data(
+                None, 's_d', None, None, True, range(2018, 2019), True, archives=[archive],
+                parse_workers=parse_workers
+            )
+            elapsed = time.perf_counter() - start
+        print('{:>8} {:>10.3f}'.format(parse_workers, elapsed))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 400)
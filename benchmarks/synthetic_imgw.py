@@ -0,0 +1,59 @@
+"""
+Synthetic IMGW archives for the benchmarks (no network access needed).
+
+The tables follow the column layout of the chosen file format: station codes and
+names, dates, measurement statuses ('', '8' or '9'), letter codes (e.g. 'S' or
+'W' for the kind of precipitation) and measurements with one decimal place, as in the files from the IMGW database.
+"""
+import io
+import zipfile
+
+import numpy as np
+
+from cloupy.scraping import imgw
+
+# letters written by IMGW in the columns with letter codes
+LETTER_CODES = {'[S/W/ ]': ['S', 'W', ''], '[Z/R]': ['Z', 'R'], '[L/W]': ['L', 'W'], '[W/N]': ['W', 'N']}
+
+
+def make_table(file_format, station_index, year=2018, rows=365, rng=None):
+    """Return the CSV text of one station-year in the given file format"""
+
+    if rng is None:
+        rng = np.random.default_rng(station_index)
+
+    dtypes = imgw.get_column_dtypes(file_format)
+    names = imgw.get_column_names(file_format)
+    days = np.arange(rows)
+    columns = []
+    for index, name in enumerate(names):
+        if name == 'Kod stacji':
+            columns.append(np.full(rows, str(352200000 + station_index)))
+        elif name == 'Nazwa stacji':
+            columns.append(np.full(rows, '"STACJA {}"'.format(station_index)))
+        elif name == 'Rok':
+            columns.append(np.full(rows, str(year)))
+        elif name == 'Miesiąc':
+            columns.append((days // 31 + 1).astype(str))
+        elif name == 'Dzień':
+            columns.append((days % 31 + 1).astype(str))
+        elif name.endswith(tuple(LETTER_CODES)):
+            columns.append(rng.choice(LETTER_CODES[name[name.rindex('['):]], size=rows))
+        elif dtypes[index] == 'category':
+            columns.append(rng.choice(['', '', '', '8', '9'], size=rows))
+        else:
+            columns.append(rng.normal(10, 8, size=rows).round(1).astype(str))
+    return '\n'.join(','.join(row) for row in zip(*columns))
+
+
+def make_archive(files_number, file_format='s_d', rows_per_file=365):
+    """Return an in-memory archive with 'files_number' synthetic station-years"""
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zip_file:
+        for station_index in range(files_number):
+            zip_file.writestr(
+                '{}_{}_2018.csv'.format(file_format, station_index),
+                make_table(file_format, station_index, rows=rows_per_file).encode('windows-1250')
+            )
+    return zipfile.ZipFile(io.BytesIO(buffer.getvalue()))
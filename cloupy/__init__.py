@@ -13,6 +13,10 @@ any time and place
 ---------DATA SCRAPING FUNCTIONS--------
     d_imgw_data() -- download IMGW data files from the IMGW database and return them
 as one merged pd.DataFrame
+    d_imgw_data_iter() -- download IMGW data files from the IMGW database and yield
+them in chunks (per archive or per year) with constant memory usage
+    d_imgw_refresh_store() -- update the local Parquet store with the IMGW archives
+which are new or changed in the IMGW database
     i_imgw_get_file_formats() -- return the available file formats for the given
 'interval' and 'stations_kind' in the IMGW database (different file formats contain
 different data)
@@ -24,7 +28,10 @@ from the WMO website
     i_wmo_get_stations() -- return pandas.DataFrame with WMO stations information
 (WMO ids, coordinates, etc.)
     i_wmo_search_near_station() -- return the nearest stations from the WMO database
-for the given coordinates
+for the given coordinates (within a degree box, the k nearest or within a radius
+in km)
+    i_wmo_search_near_stations() -- return the nearest stations from the WMO database
+for many points at once
 ----------------------------------------
 
 -------DATA VISUALIZATION FUNCTIONS------
@@ -51,12 +58,15 @@ import warnings
 from cloupy.data_processing.check_data_continuity import check_data_continuity as check_data_continuity
 
 from cloupy.scraping.imgw import download_imgw_climatological_data as d_imgw_data
+from cloupy.scraping.imgw import iter_imgw_data as d_imgw_data_iter
+from cloupy.scraping.imgw import refresh_imgw_store as d_imgw_refresh_store
 from cloupy.scraping.imgw import get_file_formats as i_imgw_get_file_formats
 from cloupy.scraping.imgw import search_for_keywords_in_columns as i_imgw_search_keywords_in_columns
 
 from cloupy.scraping.wmo import download_wmo_climatological_data as d_wmo_data
 from cloupy.scraping.wmo import get_wmo_stations_info as i_wmo_get_stations
 from cloupy.scraping.wmo import search_for_the_nearest_station as i_wmo_search_near_station
+from cloupy.scraping.wmo import search_for_the_nearest_stations as i_wmo_search_near_stations
 
 from cloupy.diagrams.walter_lieth import WalterLieth as g_WalterLieth
 from cloupy.maps.interpolation_map import MapInterpolation as m_MapInterpolation
@@ -487,7 +487,8 @@ class WalterLieth:
                           'Miesieczna suma opadów [mm]',
                           'Absolutna temperatura maksymalna [°C]',
                           'Absolutna temperatura minimalna [°C]'],
-                return_coordinates=return_coordinates
+                return_coordinates=return_coordinates,
+                stations=self.station_name if filter_station else None
             )
             if filter_station:
                 data = data[data['Nazwa stacji'] == self.station_name]
@@ -523,7 +524,8 @@ class WalterLieth:
                           'Suma dobowa opadu [mm]',  # w s_d jest 'u'. dziwne.
                           'Maksymalna temperatura dobowa [°C]',
                           'Minimalna temperatura dobowa [°C]'],
-                return_coordinates=return_coordinates
+                return_coordinates=return_coordinates,
+                stations=self.station_name
             )
 
             data = data[data['Nazwa stacji'] == self.station_name]
@@ -446,7 +446,7 @@ class MapInterpolation:
     def d_imgw_data(
             self, years_range, column_with_values,
             interval='monthly', stations_kind='synop', check_continuity=False,
-            continuity_precision=0.8
+            continuity_precision=0.8, store_dir=None
     ):
         """
          Download data for a drawing from the IMGW database.
@@ -470,6 +470,9 @@ class MapInterpolation:
         of the station that has the longest data continuity (e.g. if the largest
         number of records is 100, then at least 50 records are required) (default
         0.8)
+            store_dir -- directory of a local Parquet store with the parsed IMGW
+        data (requires 'pyarrow'). Only the years which are not in the store are
+        downloaded (default None)
         """
         import cloupy as cl
         from cloupy.data_processing.check_data_continuity import check_data_continuity
@@ -478,7 +481,7 @@ class MapInterpolation:
 
             df = cl.d_imgw_data(
                 'monthly', 'synop', years_range,
-                file_format='s_m_d', return_coordinates=True
+                file_format='s_m_d', return_coordinates=True, store_dir=store_dir
             )
             if check_continuity:
                 df = check_data_continuity(df, 1, continuity_precision)
@@ -505,7 +508,7 @@ class MapInterpolation:
 
             df = cl.d_imgw_data(
                 interval, stations_kind, years_range,
-                file_format_index=0, return_coordinates=True
+                file_format_index=0, return_coordinates=True, store_dir=store_dir
             )
             if check_continuity:
                 df = check_data_continuity(df, 1, continuity_precision)
@@ -7,14 +7,237 @@ get_meteorological_data(interval, stations_kind, years_range, file_format_index=
 
 get_file_formats(interval, stations_kind, file_format_index)
 get_column_names(file_format)
+get_column_schema(file_format=None)
+find_columns(keyword)
 look_for_keywords_in_columns(keywords, file_format=None)
+get_column_dtype(column_name)
+get_column_dtypes(file_format)
+get_storage_dtypes(file_format)
+restore_dtypes(df, file_format, optimize_memory_usage)
+apply_column_dtypes(df, dtypes)
 
 get_urls(interval, stations_kind, years_range)
-download_data(urls)
+create_session(max_workers=1)
+get_archive_cache(use_cache=False, cache_dir=None, cache_max_size=2 * 1024 ** 3, download_dir=None)
+get_listing_index(cache=None, ttl=0)
+get_listing(session, url, listing_index=None)
+get_zip_file_paths(session, url, listing_index=None)
+download_archive(session, url, cache=None)
+download_and_extract_archive(session, url, files_reading_dir_path, cache=None)
+open_archive(session, url, cache=None)
+get_files_reading_dir(files_reading_dir)
+download_data(urls, max_workers=1, cache=None, extract=True, files_reading_dir=None, archive_filter=None,
+              listing_index=None)
+file_matches_format(file_name, file_format)
+read_imgw_csv(source, usecols=None, dtypes=None, engine='pandas')
+read_csv_with_pyarrow(source, usecols=None, dtypes=None)
+read_csv_with_polars(source, usecols=None, dtypes=None)
+get_station_names(stations, split_stations=None)
+normalize_stations(stations, merge_split_stations)
+get_archive_station_id(archive_name)
+get_station_index(cache=None)
+select_station_archives(url, archive_names, stations, station_index)
+index_station_archive(station_index, url, archive_name, archive)
+filter_rows(df, years_range, stations=None)
+concatenate_frames(frames)
+get_key_columns(file_format)
+get_selected_columns(file_format, specific_columns, keywords)
+parse_file(source, selected_columns, dtypes, years_range, stations=None, engine='pandas')
+parse_archive(archive, file_format, selected_columns, dtypes, years_range, stations=None, engine='pandas')
+open_source(file)
+parse_file_content(content, selected_columns, dtypes, years_range, stations=None, engine='pandas')
+parse_files_in_processes(files, selected_columns, dtypes, years_range, stations=None, parse_workers=2,
+                         engine='pandas')
+read_parsed_content(result, dtypes)
+parse_archives(archives, file_formats, selected_columns, dtypes, years_range, stations=None, parse_workers=1,
+               engine='pandas')
+create_empty_frame(file_format, selected_columns)
+get_split_stations()
+map_categories(values, mapping)
+merge_stations(df, split_stations=None)
 concatenate_data(downloaded_files_names, file_formats, specific_columns,
-                keywords, optimize_memory_usage, years_range)
+                keywords, optimize_memory_usage, years_range,
+                merge_splitted_stations, archives=None, stations=None,
+                files_reading_dir=None, parse_workers=1, engine='pandas')
+name_columns(df, file_format, selected_columns)
+join_frames(frames)
+join_coordinates(df)
+choose_file_formats(interval, stations_kind, file_format_index, file_format)
+iter_archives(urls, max_workers=1, cache=None, archive_filter=None, listing_index=None)
+iter_imgw_data(interval, stations_kind, years_range, ..., chunks='archive')
+split_into_years(frames, selected_columns, finalize)
+aggregate_frame(df, period)
+combine_aggregates(partials)
+aggregate_chunks(chunks, period, statistics=None)
+get_years_in_url(url)
+fill_store(store, interval, stations_kind, file_format, years_range, max_workers=1, cache=None, listing_index=None)
+update_store(store, interval, stations_kind, file_format, urls, max_workers=1, cache=None, listing_index=None)
+refresh_imgw_store(interval, stations_kind, years_range, store_dir, ...)
+read_store(store, interval, stations_kind, file_format, years_range, selected_columns, ...)
+download_imgw_climatological_data(interval, stations_kind, years_range, ...)
 """
 
+BASE_URL = 'https://danepubliczne.imgw.pl/data/dane_pomiarowo_obserwacyjne/dane_meteorologiczne/'
+
+# column names of the IMGW file formats (in the order of the columns in the files)
+COLUMN_NAMES = {
+    'k_m_d': ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Absolutna temperatura maksymalna [°C]',
+        'Status pomiaru TMAX', 'Średnia temperatura maksymalna [°C]', 'Status pomiaru TMXS',
+        'Absolutna temperatura minimalna [°C]', 'Status pomiaru TMIN', 'Średnia temperatura minimalna [°C]',
+        'Status pomiaru TMNS', 'Średnia temperatura miesięczna [°C]', 'Status pomiaru STM',
+        'Minimalna temperatura przy gruncie [°C]', 'Status pomiaru TMNG', 'Miesieczna suma opadów [mm]',
+        'Status pomiaru SUMM', 'Maksymalna dobowa suma opadów [mm]', 'Status pomiaru OPMX',
+        'Pierwszy dzień wystapienia opadu maksymalnego', 'Ostatni dzień wystąpienia opadu maksymalnego',
+        'Maksymalna wysokość pokrywy śnieżnej [cm]', 'Status pomiaru PKSN', 'Liczba dni z pokrywą śnieżną',
+        'Liczba dni z opadem deszczu', 'Liczba dni z opadem śniegu'],
+    'k_m_t': ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Średnia miesięczna temperatura [°C]',
+        'Status pomiaru TEMP', 'Średnia miesięczna wilgotność względna [%]', 'Status pomiaru WLGS',
+        'Średnia miesięczna prędkość wiatru [m/s]', 'Status pomiaru FWS',
+        'Średnie miesięczne zachmurzenie ogólne [oktanty]', 'Status pomiaru NOS'],
+    'o_m': ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Miesięczna suma opadów [mm]', 'Status pomiaru SUMM',
+        'Liczba dni z opadem śniegu', 'Status pomiaru LDS', 'Opad maksymalny [mm]', 'Status pomiaru MAXO',
+        'Dzień pierwszy wystąpienia opadu maksymalnego', 'Dzień ostatni wystąpienia opadu maksymalnego',
+        'Liczba dni z pokrywą śnieżną', 'Status pomiaru LDPS'],
+    's_m_d': ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Absolutna temperatura maksymalna [°C]',
+        'Status pomiaru TMAX', 'Średnia temperatura maksymalna [°C]', 'Status pomiaru TMXS',
+        'Absolutna temperatura minimalna [°C]', 'Status pomiaru TMIN', 'Średnia temperatura minimalna [°C]',
+        'Status pomiaru TMNS', 'Średnia temperatura miesięczna [°C]', 'Status pomiaru STM',
+        'Minimalna temperatura przy gruncie [°C]', 'Status pomiaru TMNG', 'Miesieczna suma opadów [mm]',
+        'Status pomiaru SUMM', 'Maksymalna dobowa suma opadów [mm]', 'Status pomiaru OPMX',
+        'Pierwszy dzień wystapienia opadu maksymalnego', 'Ostatni dzień wystąpienia opadu maksymalnego',
+        'Miesięczna suma usłonecznienia [godziny]', 'Status pomiaru SUUS', 'Maksymalna wysokość pokrywy śnieżnej [cm]',
+        'Status pomiaru PKSN', 'Liczba dni z pokrywą śnieżną', 'Status pomiaru PSDN', 'Liczba dni z opadem deszczu',
+        'Status pomiaru DESD', 'Liczba dni z opadem śniegu', 'Status pomiaru SNID',
+        'Liczba dni z opadem deszczu ze śniegiem', 'Status pomiaru DSND', 'Liczba dni z gradem', 'Status pomiaru GRDD',
+        'Liczba dni z mgłą', 'Status pomiaru MGLD', 'Liczba dni z zamgleniem', 'Status pomiaru ZAMD',
+        'Liczba dni z sadzią', 'Status pomiaru SADD', 'Liczba dni z gołoledzią', 'Status pomiaru GOLD',
+        'Liczba dni z zamiecią śnieżną niską', 'Status pomiaru ZAND', 'Liczba dni z zamiecią śnieżną wysoką',
+        'Status pomiaru ZAWD', 'Liczba dni ze zmętnieniem', 'Status pomiaru ZMED', 'Liczba dni z wiatrem >= 10m/s',
+        'Status pomiaru W10D', 'Liczba dni z wiatrem >15m/s', 'Status pomiaru W15D', 'Liczba dni z burzą',
+        'Status pomiaru BURD', 'Liczba dni z rosą', 'Status pomiaru ROSD', 'Liczba dni ze szronem',
+        'Status pomiaru SZRD'],
+    's_m_t': ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Średnie miesięczne zachmurzenie ogólne [oktanty]',
+        'Status pomiaru NOS', 'Średnia miesięczna prędkość wiatru [m/s]', 'Status pomiaru FWS',
+        'Średnia miesięczna temperatura [°C]', 'Status pomiaru TEMP', 'Średnie miesięczne ciśnienie pary wodnej [hPa]',
+        'Status pomiaru CPW', 'Średnia miesięczna wilgotność względna [%]', 'Status pomiaru WLGS',
+        'Średnie miesięczne ciśnienie na poziomie stacji [hPa]', 'Status pomiaru PPPS',
+        'Średnie miesięczne ciśnienie na pozimie morza [hPa]', 'Status pomiaru PPPM', 'Suma opadu dzień [mm]',
+        'Status pomiaru WODZ', 'Suma opadu noc [mm]', 'Status pomiaru WONO'],
+    'k_d': ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Dzień', 'Maksymalna temperatura dobowa [°C]',
+        'Status pomiaru TMAX', 'Minimalna temperatura dobowa [°C]', 'Status pomiaru TMIN',
+        'Średnia temperatura dobowa [°C]', 'Status pomiaru STD', 'Temperatura minimalna przy gruncie [°C]',
+        'Status pomiaru TMNG', 'Suma dobowa opadów [mm]', 'Status pomiaru SMDB', 'Rodzaj opadu [S/W/ ]',
+        'Wysokość pokrywy śnieżnej [cm]', 'Status pomiaru PKSN'],
+    'k_d_t': ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Dzień', 'Średnia dobowa temperatura [°C]',
+        'Status pomiaru TEMP', 'Średnia dobowa wilgotność względna [%]', 'Status pomiaru WLGS',
+        'Średnia dobowa prędkość wiatru [m/s]', 'Status pomiaru FWS', 'Średnie dobowe zachmurzenie ogólne [oktanty]',
+        'Status pomiaru NOS'],
+    'o_d': ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Dzień', 'Suma dobowa opadów [mm]', 'Status pomiaru SMDB',
+        'Rodzaj opadu [S/W/ ]', 'Wysokość pokrywy śnieżnej [cm]', 'Status pomiaru PKSN',
+        'Wysokość świeżo spadłego śniegu [cm]', 'Status pomiaru HSS', 'Gatunek śniegu [kod]', 'Status pomiaru GATS',
+        'Rodzaj pokrywy śnieżnej [kod]', 'Status pomiaru RPSN'],
+    's_d': ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Dzień', 'Maksymalna temperatura dobowa [°C]',
+        'Status pomiaru TMAX', 'Minimalna temperatura dobowa [°C]', 'Status pomiaru TMIN',
+        'Średnia temperatura dobowa [°C]', 'Status pomiaru STD', 'Temperatura minimalna przy gruncie [°C]',
+        'Status pomiaru TMNG', 'Suma dobowa opadu [mm]', 'Status pomiaru SMDB', 'Rodzaj opadu [S/W/ ]',
+        'Wysokość pokrywy śnieżnej [cm]', 'Status pomiaru PKSN', 'Równoważnik wodny śniegu [mm/cm]',
+        'Status pomiaru RWSN', 'Usłonecznienie [godziny]', 'Status pomiaru USL', 'Czas trwania opadu deszczu [godziny]',
+        'Status pomiaru DESZ', 'Czas trwania opadu śniegu [godziny]', 'Status pomiaru SNEG',
+        'Czas trwania opadu deszczu ze śniegiem [godziny]', 'Status pomiaru DISN', 'Czas trwania gradu [godziny]',
+        'Status pomiaru GRAD', 'Czas trwania mgły [godziny]', 'Status pomiaru MGLA',
+        'Czas trwania zamglenia  [godziny]', 'Status pomiaru ZMGL', 'Czas trwania sadzi [godziny]',
+        'Status pomiaru SADZ', 'Czas trwania gołoledzi [godziny]', 'Status pomiaru GOLO',
+        'Czas trwania zamieci śnieżnej niskiej [godziny]', 'Status pomiaru ZMNI',
+        'Czas trwania zamieci śnieżnej wysokiej [godziny]', 'Status pomiaru ZMWS', 'Czas trwania zmętnienia [godziny]',
+        'Status pomiaru ZMET', 'Czas trwania wiatru >=10m/s [godziny]', 'Status pomiaru FF10',
+        'Czas trwania wiatru >15m/s [godziny]', 'Status pomiaru FF15', 'Czas trwania burzy  [godziny]',
+        'Status pomiaru BRZA', 'Czas trwania rosy  [godziny]', 'Status pomiaru ROSA', 'Czas trwania szronu [godziny]',
+        'Status pomiaru SZRO', 'Wystąpienie pokrywy śnieżnej [0/1]', 'Status pomiaru DZPS',
+        'Wystąpienie błyskawicy [0/1]', 'Status pomiaru DZBL', 'Stan gruntu [Z/R]', 'Izoterma dolna [cm]',
+        'Status pomiaru IZD', 'Izoterma górna [cm]', 'Status pomiaru IZG', 'Aktynometria  [J/cm2]',
+        'Status pomiaru AKTN'],
+    's_d_t': ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Dzień', 'Średnie dobowe zachmurzenie ogólne [oktanty]',
+        'Status pomiaru NOS', 'Średnia dobowa prędkość wiatru [m/s]', 'Status pomiaru FWS',
+        'Średnia dobowa temperatura [°C]', 'Status pomiaru TEMP', 'Średnia dobowe ciśnienie pary wodnej [hPa]',
+        'Status pomiaru CPW', 'Średnia dobowa wilgotność względna [%]', 'Status pomiaru WLGS',
+        'Średnia dobowe ciśnienie na poziomie stacji [hPa]', 'Status pomiaru PPPS',
+        'Średnie dobowe ciśnienie na pozimie morza [hPa]', 'Status pomiaru PPPM', 'Suma opadu dzień [mm]',
+        'Status pomiaru WODZ', 'Suma opadu noc [mm]', 'Status pomiaru WONO'],
+    'k_t': ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Dzień', 'Godzina', 'Temperatura powietrza [°C]',
+        'Status pomiaru TEMP', 'Temperatura termometru zwilżonego [°C]', 'Status pomiaru TTZW', 'Wskaźnik lodu [L/W]',
+        'Wskaźnik wentylacji [W/N]', 'Wilgotność względna [%]', 'Status pomiaru WLGW', 'Kod kierunku wiatru [kod]',
+        'Status pomiaru DKDK', 'Prędkość wiatru [m/s]', 'Status pomiaru FWR',
+        'Zachmurzenie ogólne [0-10 do dn.31.12.1988/oktanty od dn.01.01.1989]', 'Status pomiaru ZOGK',
+        'Widzialność [kod]', 'Status pomiaru WID'],
+    's_t': ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Dzień', 'Godzina',
+        'Wysokość podstawy chmur CL CM szyfrowana [kod]', 'Status pomiaru HPOD', 'Wysokość podstawy niższej [m]',
+        'Status pomiaru HPON', 'Wysokość podstawy wyższej [m]', 'Status pomiaru HPOW',
+        'Wysokość podstawy tekstowy [opis]', 'Pomiar przyrzadem 1 (niższa) [P]', 'Pomiar przyrzadem 2 (wyższa) [P]',
+        'Widzialność [kod]', 'Status pomiaru WID', 'Widzialność operatora [m]', 'Status pomiaru WIDO',
+        'Widzialność automat [m]', 'Status pomiaru WIDA', 'Zachmurzenie ogólne [oktanty]', 'Status pomiaru NOG',
+        'Kierunek wiatru  [°]', 'Status pomiaru KRWR', 'Prędkość wiatru [m/s]', 'Status pomiaru FWR',
+        'Poryw wiatru [m/s]', 'Status pomiaru PORW', 'Temperatura powietrza [°C]', 'Status pomiaru TEMP',
+        'Temperatura termometru zwilżonego [°C]', 'Status pomiaru TTZW', 'Wskaźnik wentylacji [W/N]',
+        'Wskaźnik lodu [L/W]', 'Ciśnienie pary wodnej [hPa]', 'Status pomiaru CPW', 'Wilgotność względna [%]',
+        'Status pomiaru WLGW', 'Temperatura punktu rosy [°C]', 'Status pomiaru TPTR',
+        'Ciśnienie na pozimie stacji [hPa]', 'Status pomiaru PPPS', 'Ciśnienie na poziomie morza [hPa]',
+        'Status pomiaru PPPM', 'Charakterystyka tendencji [kod]', 'Wartość tendencji [wartość]', 'Status pomiaru APP',
+        'Opad za 6 godzin [mm]', 'Status pomiaru WO6G', 'Rodzaj opadu za 6 godzin [kod]', 'Status pomiaru ROPT',
+        'Pogoda bieżąca [kod]', 'Pogoda ubiegła [kod]', 'Zachmurzenie niskie [oktanty]', 'Status pomiaru CLCM',
+        'Chmury CL [kod]', 'Status pomiaru CHCL', 'Chmury CL tekstem', 'Chmury CM [kod]', 'Status pomiaru CHCM',
+        'Chmury CM tekstem', 'Chmury CH [kod]', 'Status pomiaru CHCH', 'Chmury CH tekstem', 'Stan gruntu [kod]',
+        'Status pomiaru SGRN', 'Niedosyt wilgotności [hPa]', 'Status pomiaru DEFI', 'Usłonecznienie',
+        'Status pomiaru USLN', 'Wystąpienie rosy [0/1]', 'Status pomiaru ROSW', 'Poryw maksymalny za okres WW [m/s]',
+        'Status pomiaru PORK', 'Godzina wystąpienia porywu', 'Minuta wystąpienia porywu', 'Temperatura gruntu -5 [°C]',
+        'Status pomiaru TG05', 'Temperatura gruntu -10 [°C]', 'Status pomiaru TG10', 'Temperatura gruntu -20 [°C]',
+        'Status pomiaru TG20', 'Temperatura gruntu -50 [°C]', 'Status pomiaru TG50', 'Temperatura gruntu -100 [°C]',
+        'Status pomiaru TG100', 'Temperatura minimalna za 12 godzin [°C]', 'Status pomiaru TMIN',
+        'Temperatura maksymalna za 12 godzin [°C]', 'Status pomiaru TMAX',
+        'Temperatura minimalna przy gruncie za 12 godzin [°C]', 'Status pomiaru TGMI',
+        'Równoważnik wodny śniegu [mm/cm]', 'Status pomiaru RWSN', 'Wysokość pokrywy śnieżnej [cm]',
+        'Status pomiaru PKSN', 'Wysokość świeżo spadłego śniegu [cm]', 'Status pomiaru HSS',
+        'Wysokość śniegu na poletku [cm]', 'Status pomiaru GRSN', 'Gatunek śniegu [kod]',
+        'Ukształtowanie pokrywy [kod]', 'Wysokość próbki [cm]', 'Status pomiaru HPRO', 'Ciężar próbki [g]',
+        'Status pomiaru CIPR']
+}
+
+# schema registry built from COLUMN_NAMES on first use (see 'get_column_schema')
+COLUMN_SCHEMA = None
+
+# stations which were renamed in the IMGW database: {name used in the files: name to merge into},
+# read from 'imgw_split_stations.csv' (see 'get_split_stations')
+SPLIT_STATIONS = None
+
+# modification time and size of an archive in the directory listing (e.g. '2019-03-05 09:49  1.2K')
+LISTING_DETAILS_PATTERN = r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}|\d{2}-[A-Za-z]{3}-\d{4} \d{2}:\d{2})\s+(\d[\d.]*[KMG]?)'
+
+# per-station archives (e.g. '1996_2000_375_s.zip', '2001_375_s.zip'), the digits are the end of the station code
+STATION_ARCHIVE_PATTERN = r'^\d{4}(?:_\d{4})?_(\d{3})_[a-z]\.zip$'
+
+# listings of the IMGW directories kept in memory (used if the archives are not cached on disk)
+MEMORY_LISTINGS = {}
+
+# station index learned in memory (used if the archives are not cached on disk)
+MEMORY_STATION_INDEX = None
+
+# station and date columns, which identify a row in every file format
+KEY_COLUMNS = ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Dzień', 'Godzina']
+
+# units of the columns which hold letters or text instead of numbers (e.g. 'Rodzaj opadu [S/W/ ]')
+TEXT_COLUMN_UNITS = ['[kod]', '[S/W/ ]', '[Z/R]', '[L/W]', '[W/N]', '[opis]', '[P]']
+
+# date columns and the smallest ints which can hold them
+SMALL_INT_COLUMNS = {'Rok': 'int16', 'Miesiąc': 'int8', 'Dzień': 'int8', 'Godzina': 'int8'}
+
+# date columns which identify a row of the data aggregated to the period (see 'aggregate_chunks')
+AGGREGATION_PERIODS = {'daily': ['Rok', 'Miesiąc', 'Dzień'], 'monthly': ['Rok', 'Miesiąc']}
+
+# statistics of the aggregated data
+AGGREGATION_STATISTICS = ['mean', 'min', 'max', 'sum', 'count']
+
+# number of partial aggregates which are combined into one while the archives are streamed
+AGGREGATION_BATCH_SIZE = 32
+
 
 def get_file_formats(
         interval, stations_kind, file_format_index
@@ -89,7 +312,8 @@ def get_file_formats(
 
 def get_column_names(file_format):
     """
-    Return the column names for the given file format.
+    Return the column names for the given file format (None for an unknown file
+    format).
 
     Keyword arguments:
         file_format -- IMGW database file format (e.g. 's_m_t'). Available file
@@ -97,155 +321,76 @@ def get_column_names(file_format):
     s_t
     """
 
-    if file_format == 'k_m_d':
-        return ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Absolutna temperatura maksymalna [°C]',
-                'Status pomiaru TMAX', 'Średnia temperatura maksymalna [°C]', 'Status pomiaru TMXS',
-                'Absolutna temperatura minimalna [°C]', 'Status pomiaru TMIN', 'Średnia temperatura minimalna [°C]',
-                'Status pomiaru TMNS', 'Średnia temperatura miesięczna [°C]', 'Status pomiaru STM',
-                'Minimalna temperatura przy gruncie [°C]', 'Status pomiaru TMNG', 'Miesieczna suma opadów [mm]',
-                'Status pomiaru SUMM', 'Maksymalna dobowa suma opadów [mm]', 'Status pomiaru OPMX',
-                'Pierwszy dzień wystapienia opadu maksymalnego', 'Ostatni dzień wystąpienia opadu maksymalnego',
-                'Maksymalna wysokość pokrywy śnieżnej [cm]', 'Status pomiaru PKSN', 'Liczba dni z pokrywą śnieżną',
-                'Liczba dni z opadem deszczu', 'Liczba dni z opadem śniegu']
-
-    elif file_format == 'k_m_t':
-        return ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Średnia miesięczna temperatura [°C]',
-                'Status pomiaru TEMP', 'Średnia miesięczna wilgotność względna [%]', 'Status pomiaru WLGS',
-                'Średnia miesięczna prędkość wiatru [m/s]', 'Status pomiaru FWS',
-                'Średnie miesięczne zachmurzenie ogólne [oktanty]', 'Status pomiaru NOS']
-
-    elif file_format == 'o_m':
-        return ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Miesięczna suma opadów [mm]', 'Status pomiaru SUMM',
-                'Liczba dni z opadem śniegu', 'Status pomiaru LDS', 'Opad maksymalny [mm]', 'Status pomiaru MAXO',
-                'Dzień pierwszy wystąpienia opadu maksymalnego', 'Dzień ostatni wystąpienia opadu maksymalnego',
-                'Liczba dni z pokrywą śnieżną', 'Status pomiaru LDPS']
-
-    elif file_format == 's_m_d':
-        return ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Absolutna temperatura maksymalna [°C]',
-                'Status pomiaru TMAX', 'Średnia temperatura maksymalna [°C]', 'Status pomiaru TMXS',
-                'Absolutna temperatura minimalna [°C]', 'Status pomiaru TMIN', 'Średnia temperatura minimalna [°C]',
-                'Status pomiaru TMNS', 'Średnia temperatura miesięczna [°C]', 'Status pomiaru STM',
-                'Minimalna temperatura przy gruncie [°C]', 'Status pomiaru TMNG', 'Miesieczna suma opadów [mm]',
-                'Status pomiaru SUMM', 'Maksymalna dobowa suma opadów [mm]', 'Status pomiaru OPMX',
-                'Pierwszy dzień wystapienia opadu maksymalnego', 'Ostatni dzień wystąpienia opadu maksymalnego',
-                'Miesięczna suma usłonecznienia [godziny]', 'Status pomiaru SUUS',
-                'Maksymalna wysokość pokrywy śnieżnej [cm]', 'Status pomiaru PKSN', 'Liczba dni z pokrywą śnieżną',
-                'Status pomiaru PSDN', 'Liczba dni z opadem deszczu', 'Status pomiaru DESD',
-                'Liczba dni z opadem śniegu',
-                'Status pomiaru SNID', 'Liczba dni z opadem deszczu ze śniegiem', 'Status pomiaru DSND',
-                'Liczba dni z gradem', 'Status pomiaru GRDD', 'Liczba dni z mgłą', 'Status pomiaru MGLD',
-                'Liczba dni z zamgleniem', 'Status pomiaru ZAMD', 'Liczba dni z sadzią', 'Status pomiaru SADD',
-                'Liczba dni z gołoledzią', 'Status pomiaru GOLD', 'Liczba dni z zamiecią śnieżną niską',
-                'Status pomiaru ZAND', 'Liczba dni z zamiecią śnieżną wysoką', 'Status pomiaru ZAWD',
-                'Liczba dni ze zmętnieniem', 'Status pomiaru ZMED', 'Liczba dni z wiatrem >= 10m/s',
-                'Status pomiaru W10D', 'Liczba dni z wiatrem >15m/s', 'Status pomiaru W15D', 'Liczba dni z burzą',
-                'Status pomiaru BURD', 'Liczba dni z rosą', 'Status pomiaru ROSD', 'Liczba dni ze szronem',
-                'Status pomiaru SZRD']
-
-    elif file_format == 's_m_t':
-        return ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Średnie miesięczne zachmurzenie ogólne [oktanty]',
-                'Status pomiaru NOS', 'Średnia miesięczna prędkość wiatru [m/s]', 'Status pomiaru FWS',
-                'Średnia miesięczna temperatura [°C]', 'Status pomiaru TEMP',
-                'Średnie miesięczne ciśnienie pary wodnej [hPa]', 'Status pomiaru CPW',
-                'Średnia miesięczna wilgotność względna [%]', 'Status pomiaru WLGS',
-                'Średnie miesięczne ciśnienie na poziomie stacji [hPa]', 'Status pomiaru PPPS',
-                'Średnie miesięczne ciśnienie na pozimie morza [hPa]', 'Status pomiaru PPPM', 'Suma opadu dzień [mm]',
-                'Status pomiaru WODZ', 'Suma opadu noc [mm]', 'Status pomiaru WONO']
-
-    elif file_format == 'k_d':
-        return ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Dzień', 'Maksymalna temperatura dobowa [°C]',
-                'Status pomiaru TMAX', 'Minimalna temperatura dobowa [°C]', 'Status pomiaru TMIN',
-                'Średnia temperatura dobowa [°C]', 'Status pomiaru STD', 'Temperatura minimalna przy gruncie [°C]',
-                'Status pomiaru TMNG', 'Suma dobowa opadów [mm]', 'Status pomiaru SMDB', 'Rodzaj opadu [S/W/ ]',
-                'Wysokość pokrywy śnieżnej [cm]', 'Status pomiaru PKSN']
-
-    elif file_format == 'k_d_t':
-        return ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Dzień', 'Średnia dobowa temperatura [°C]',
-                'Status pomiaru TEMP', 'Średnia dobowa wilgotność względna [%]', 'Status pomiaru WLGS',
-                'Średnia dobowa prędkość wiatru [m/s]', 'Status pomiaru FWS',
-                'Średnie dobowe zachmurzenie ogólne [oktanty]', 'Status pomiaru NOS']
-
-    elif file_format == 'o_d':
-        return ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Dzień', 'Suma dobowa opadów [mm]',
-                'Status pomiaru SMDB', 'Rodzaj opadu [S/W/ ]', 'Wysokość pokrywy śnieżnej [cm]', 'Status pomiaru PKSN',
-                'Wysokość świeżo spadłego śniegu [cm]', 'Status pomiaru HSS', 'Gatunek śniegu [kod]',
-                'Status pomiaru GATS', 'Rodzaj pokrywy śnieżnej [kod]', 'Status pomiaru RPSN']
-
-    elif file_format == 's_d':
-        return ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Dzień', 'Maksymalna temperatura dobowa [°C]',
-                'Status pomiaru TMAX', 'Minimalna temperatura dobowa [°C]', 'Status pomiaru TMIN',
-                'Średnia temperatura dobowa [°C]', 'Status pomiaru STD', 'Temperatura minimalna przy gruncie [°C]',
-                'Status pomiaru TMNG', 'Suma dobowa opadu [mm]', 'Status pomiaru SMDB', 'Rodzaj opadu [S/W/ ]',
-                'Wysokość pokrywy śnieżnej [cm]', 'Status pomiaru PKSN', 'Równoważnik wodny śniegu [mm/cm]',
-                'Status pomiaru RWSN', 'Usłonecznienie [godziny]', 'Status pomiaru USL',
-                'Czas trwania opadu deszczu [godziny]', 'Status pomiaru DESZ', 'Czas trwania opadu śniegu [godziny]',
-                'Status pomiaru SNEG', 'Czas trwania opadu deszczu ze śniegiem [godziny]', 'Status pomiaru DISN',
-                'Czas trwania gradu [godziny]', 'Status pomiaru GRAD', 'Czas trwania mgły [godziny]',
-                'Status pomiaru MGLA', 'Czas trwania zamglenia  [godziny]', 'Status pomiaru ZMGL',
-                'Czas trwania sadzi [godziny]', 'Status pomiaru SADZ', 'Czas trwania gołoledzi [godziny]',
-                'Status pomiaru GOLO', 'Czas trwania zamieci śnieżnej niskiej [godziny]', 'Status pomiaru ZMNI',
-                'Czas trwania zamieci śnieżnej wysokiej [godziny]', 'Status pomiaru ZMWS',
-                'Czas trwania zmętnienia [godziny]', 'Status pomiaru ZMET', 'Czas trwania wiatru >=10m/s [godziny]',
-                'Status pomiaru FF10', 'Czas trwania wiatru >15m/s [godziny]', 'Status pomiaru FF15',
-                'Czas trwania burzy  [godziny]', 'Status pomiaru BRZA', 'Czas trwania rosy  [godziny]',
-                'Status pomiaru ROSA', 'Czas trwania szronu [godziny]', 'Status pomiaru SZRO',
-                'Wystąpienie pokrywy śnieżnej [0/1]', 'Status pomiaru DZPS', 'Wystąpienie błyskawicy [0/1]',
-                'Status pomiaru DZBL', 'Stan gruntu [Z/R]', 'Izoterma dolna [cm]', 'Status pomiaru IZD',
-                'Izoterma górna [cm]', 'Status pomiaru IZG', 'Aktynometria  [J/cm2]', 'Status pomiaru AKTN']
-
-    elif file_format == 's_d_t':
-        return ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Dzień', 'Średnie dobowe zachmurzenie ogólne [oktanty]',
-                'Status pomiaru NOS', 'Średnia dobowa prędkość wiatru [m/s]', 'Status pomiaru FWS',
-                'Średnia dobowa temperatura [°C]', 'Status pomiaru TEMP', 'Średnia dobowe ciśnienie pary wodnej [hPa]',
-                'Status pomiaru CPW', 'Średnia dobowa wilgotność względna [%]', 'Status pomiaru WLGS',
-                'Średnia dobowe ciśnienie na poziomie stacji [hPa]', 'Status pomiaru PPPS',
-                'Średnie dobowe ciśnienie na pozimie morza [hPa]', 'Status pomiaru PPPM', 'Suma opadu dzień [mm]',
-                'Status pomiaru WODZ', 'Suma opadu noc [mm]', 'Status pomiaru WONO']
-
-    elif file_format == 'k_t':
-        return ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Dzień', 'Godzina', 'Temperatura powietrza [°C]',
-                'Status pomiaru TEMP', 'Temperatura termometru zwilżonego [°C]', 'Status pomiaru TTZW',
-                'Wskaźnik lodu [L/W]', 'Wskaźnik wentylacji [W/N]', 'Wilgotność względna [%]', 'Status pomiaru WLGW',
-                'Kod kierunku wiatru [kod]', 'Status pomiaru DKDK', 'Prędkość wiatru [m/s]', 'Status pomiaru FWR',
-                'Zachmurzenie ogólne [0-10 do dn.31.12.1988/oktanty od dn.01.01.1989]', 'Status pomiaru ZOGK',
-                'Widzialność [kod]', 'Status pomiaru WID']
-
-    elif file_format == 's_t':
-        return ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Dzień', 'Godzina',
-                'Wysokość podstawy chmur CL CM szyfrowana [kod]', 'Status pomiaru HPOD',
-                'Wysokość podstawy niższej [m]',
-                'Status pomiaru HPON', 'Wysokość podstawy wyższej [m]', 'Status pomiaru HPOW',
-                'Wysokość podstawy tekstowy [opis]', 'Pomiar przyrzadem 1 (niższa) [P]',
-                'Pomiar przyrzadem 2 (wyższa) [P]',
-                'Widzialność [kod]', 'Status pomiaru WID', 'Widzialność operatora [m]', 'Status pomiaru WIDO',
-                'Widzialność automat [m]', 'Status pomiaru WIDA', 'Zachmurzenie ogólne [oktanty]', 'Status pomiaru NOG',
-                'Kierunek wiatru  [°]', 'Status pomiaru KRWR', 'Prędkość wiatru [m/s]', 'Status pomiaru FWR',
-                'Poryw wiatru [m/s]', 'Status pomiaru PORW', 'Temperatura powietrza [°C]', 'Status pomiaru TEMP',
-                'Temperatura termometru zwilżonego [°C]', 'Status pomiaru TTZW', 'Wskaźnik wentylacji [W/N]',
-                'Wskaźnik lodu [L/W]', 'Ciśnienie pary wodnej [hPa]', 'Status pomiaru CPW', 'Wilgotność względna [%]',
-                'Status pomiaru WLGW', 'Temperatura punktu rosy [°C]', 'Status pomiaru TPTR',
-                'Ciśnienie na pozimie stacji [hPa]', 'Status pomiaru PPPS', 'Ciśnienie na poziomie morza [hPa]',
-                'Status pomiaru PPPM', 'Charakterystyka tendencji [kod]', 'Wartość tendencji [wartość]',
-                'Status pomiaru APP',
-                'Opad za 6 godzin [mm]', 'Status pomiaru WO6G', 'Rodzaj opadu za 6 godzin [kod]', 'Status pomiaru ROPT',
-                'Pogoda bieżąca [kod]', 'Pogoda ubiegła [kod]', 'Zachmurzenie niskie [oktanty]', 'Status pomiaru CLCM',
-                'Chmury CL [kod]', 'Status pomiaru CHCL', 'Chmury CL tekstem', 'Chmury CM [kod]', 'Status pomiaru CHCM',
-                'Chmury CM tekstem', 'Chmury CH [kod]', 'Status pomiaru CHCH', 'Chmury CH tekstem', 'Stan gruntu [kod]',
-                'Status pomiaru SGRN', 'Niedosyt wilgotności [hPa]', 'Status pomiaru DEFI', 'Usłonecznienie',
-                'Status pomiaru USLN', 'Wystąpienie rosy [0/1]', 'Status pomiaru ROSW',
-                'Poryw maksymalny za okres WW [m/s]', 'Status pomiaru PORK', 'Godzina wystąpienia porywu',
-                'Minuta wystąpienia porywu', 'Temperatura gruntu -5 [°C]', 'Status pomiaru TG05',
-                'Temperatura gruntu -10 [°C]', 'Status pomiaru TG10', 'Temperatura gruntu -20 [°C]',
-                'Status pomiaru TG20', 'Temperatura gruntu -50 [°C]', 'Status pomiaru TG50',
-                'Temperatura gruntu -100 [°C]',
-                'Status pomiaru TG100', 'Temperatura minimalna za 12 godzin [°C]', 'Status pomiaru TMIN',
-                'Temperatura maksymalna za 12 godzin [°C]', 'Status pomiaru TMAX',
-                'Temperatura minimalna przy gruncie za 12 godzin [°C]', 'Status pomiaru TGMI',
-                'Równoważnik wodny śniegu [mm/cm]', 'Status pomiaru RWSN', 'Wysokość pokrywy śnieżnej [cm]',
-                'Status pomiaru PKSN', 'Wysokość świeżo spadłego śniegu [cm]', 'Status pomiaru HSS',
-                'Wysokość śniegu na poletku [cm]', 'Status pomiaru GRSN', 'Gatunek śniegu [kod]',
-                'Ukształtowanie pokrywy [kod]', 'Wysokość próbki [cm]', 'Status pomiaru HPRO', 'Ciężar próbki [g]',
-                'Status pomiaru CIPR']
+    column_names = COLUMN_NAMES.get(file_format)
+    return None if column_names is None else list(column_names)
+
+
+def get_column_schema(file_format=None):
+    """
+    Return the schema of the IMGW columns, built once from COLUMN_NAMES. For a
+    file format, return a list of dictionaries {'index': ..., 'name': ..., 'unit':
+    ..., 'dtype': ...} (the compact dtype, see 'get_column_dtype'). If
+    'file_format' is None, return the whole registry: {'columns': {file format:
+    list of columns}, 'formats': {column name: {file format: column index}},
+    'tokens': {word of the upper case column names: set of column names}}.
+
+    Keyword arguments:
+        file_format -- IMGW database file format (e.g. 's_m_t') or None (default
+    None)
+    """
+
+    import re
+
+    global COLUMN_SCHEMA
+
+    if COLUMN_SCHEMA is None:
+        schema = {'columns': {}, 'formats': {}, 'tokens': {}, 'keywords': {}}
+        for format_, column_names in COLUMN_NAMES.items():
+            schema['columns'][format_] = []
+            for index, name in enumerate(column_names):
+                unit = re.search(r'\[(.+)\]$', name)
+                schema['columns'][format_].append({
+                    'index': index, 'name': name, 'unit': unit.group(1) if unit else None,
+                    'dtype': get_column_dtype(name)
+                })
+                schema['formats'].setdefault(name, {}).setdefault(format_, index)
+                for token in name.upper().split():
+                    schema['tokens'].setdefault(token, set()).add(name)
+        COLUMN_SCHEMA = schema
+
+    if file_format is None:
+        return COLUMN_SCHEMA
+    if file_format not in COLUMN_SCHEMA['columns']:
+        raise ValueError(f"There's no such file format ({file_format}) in the IMGW database.")
+    return [dict(column) for column in COLUMN_SCHEMA['columns'][file_format]]
+
+
+def find_columns(keyword):
+    """
+    Return the set of the column names (from all file formats) which contain the
+    keyword (case-insensitive). The candidates are taken from the token index of
+    the schema (the longest word of the keyword must be a part of one of the
+    words of the column name) and the results are remembered for every keyword.
+
+    Keyword arguments:
+        keyword -- str which must be in the column name
+    """
+
+    schema = get_column_schema()
+    keyword = keyword.upper()
+
+    if keyword not in schema['keywords']:
+        words = keyword.split()
+        if words:
+            longest_word = max(words, key=len)
+            candidates = set()
+            for token, names in schema['tokens'].items():
+                if longest_word in token:
+                    candidates |= names
+        else:
+            candidates = schema['formats']
+        schema['keywords'][keyword] = {name for name in candidates if keyword in name.upper()}
+    return schema['keywords'][keyword]
 
 
 def search_for_keywords_in_columns(
@@ -279,37 +424,173 @@ def search_for_keywords_in_columns(
 
         keywords_in_files = {}
         if type(keywords) == list:
+            found_columns = [find_columns(keyword) for keyword in keywords]
             for interval_stkind, file_formats in found_file_formats.items():
                 for file in file_formats:
-                    columns_names = get_column_names(file)
-                    for name in columns_names:
-                        for keyword in keywords:
-                            if keyword.upper() in name.upper():
-                                try:
-                                    keywords_in_files[str(interval_stkind) + ", " + "file_format=" + str(file)].append(
-                                        name)
-                                except KeyError:
-                                    keywords_in_files[str(interval_stkind) + ", " + "file_format=" + str(file)] = [name]
+                    for name in COLUMN_NAMES[file]:
+                        for keyword_columns in found_columns:
+                            if name in keyword_columns:
+                                keywords_in_files.setdefault(
+                                    str(interval_stkind) + ", " + "file_format=" + str(file), []
+                                ).append(name)
         else:
             raise ValueError("Invalid input for 'keywords'. Use a list of strings or a single str.")
         return keywords_in_files
 
     else:
         if type(file_format) == str:
+            if type(keywords) != list:
+                raise ValueError("Invalid input for 'keywords'. Use a list of strings or a single str.")
             keywords_in_columns = []
-            columns_names = get_column_names(file_format)
-            for name in columns_names:
-                if type(keywords) == list:
-                    for keyword in keywords:
-                        if keyword.upper() in name.upper():
-                            keywords_in_columns.append(name)
-                else:
-                    raise ValueError("Invalid input for 'keywords'. Use a list of strings or a single str.")
+            found_columns = [find_columns(keyword) for keyword in keywords]
+            for name in get_column_names(file_format):
+                for keyword_columns in found_columns:
+                    if name in keyword_columns:
+                        keywords_in_columns.append(name)
         else:
             raise ValueError("Invalid input for the 'file_format' argument. Use a single str.")
         return keywords_in_columns
 
 
+def get_column_dtype(column_name):
+    """
+    Return the compact dtype for the IMGW column with the given name: 'category'
+    for the station names and codes, measurement statuses, coded values and
+    columns with letters or text (see TEXT_COLUMN_UNITS), small ints for the date
+    columns and 'float32' for the measurements.
+
+    Keyword arguments:
+        column_name -- name of the column (as returned by 'get_column_names')
+    """
+
+    if column_name in SMALL_INT_COLUMNS:
+        return SMALL_INT_COLUMNS[column_name]
+    elif (
+            column_name in ['Kod stacji', 'Nazwa stacji'] or column_name.startswith('Status pomiaru') or
+            'tekstem' in column_name or any(column_name.endswith(unit) for unit in TEXT_COLUMN_UNITS)
+    ):
+        return 'category'
+    else:
+        return 'float32'
+
+
+def get_column_dtypes(file_format):
+    """
+    Return a dictionary with the compact dtypes for the columns of the given file
+    format ({column index: dtype}).
+
+    Keyword arguments:
+        file_format -- IMGW database file format (e.g. 's_m_t')
+    """
+
+    return {column['index']: column['dtype'] for column in get_column_schema(file_format)}
+
+
+def get_storage_dtypes(file_format):
+    """
+    Return a dictionary with the dtypes used to keep the tables of the given file
+    format in the Parquet store ({column index: dtype}). Columns which are
+    categorical in the compact schema (also those with letter codes) are kept as
+    strings and the measurements as float64, so both the default and the compact
+    dtypes can be restored without losing values (see 'restore_dtypes'). The
+    date columns are left to pandas.
+
+    Keyword arguments:
+        file_format -- IMGW database file format (e.g. 's_m_t')
+    """
+
+    storage_dtypes = {}
+    for column, dtype in get_column_dtypes(file_format).items():
+        if dtype == 'category':
+            storage_dtypes[column] = 'str'
+        elif dtype == 'float32':
+            storage_dtypes[column] = 'float64'
+    return storage_dtypes
+
+
+def restore_dtypes(df, file_format, optimize_memory_usage):
+    """
+    Convert the table read from the Parquet store to the dtypes which it would
+    have if it was parsed from the IMGW files: the compact dtypes if
+    'optimize_memory_usage' is True, otherwise the dtypes inferred by pandas. The
+    categorical columns are kept as strings in the store, so those with numbers
+    only (e.g. the station codes and the measurement statuses) are converted
+    back to numbers first.
+
+    Keyword arguments:
+        df -- IMGW table with column indexes as column names
+        file_format -- IMGW database file format (e.g. 's_m_t')
+        optimize_memory_usage -- use the compact dtypes (see 'get_column_dtypes')
+    """
+
+    import pandas as pd
+
+    dtypes = get_column_dtypes(file_format)
+    for column in df.columns:
+        if dtypes[column] == 'category':
+            try:
+                df[column] = pd.to_numeric(df[column])
+            except (ValueError, TypeError):
+                pass
+
+    if optimize_memory_usage:
+        df = df.astype({column: 'float32' for column in df.columns if dtypes[column] == 'float32'})
+        return apply_column_dtypes(df, dtypes)
+    return df
+
+
+def apply_column_dtypes(df, dtypes):
+    """
+    Cast the columns of the IMGW table to the given dtypes after parsing. The date
+    columns are cast to small ints only if all values fit in the range of the
+    dtype, so no values are lost.
+
+    Keyword arguments:
+        df -- IMGW table with column indexes as column names
+        dtypes -- dictionary with the dtypes ({column index: dtype})
+    """
+
+    import numpy as np
+
+    casts = {}
+    for column in df.columns:
+        dtype = dtypes.get(column)
+        if dtype == 'category':
+            casts[column] = 'category'
+        elif dtype in SMALL_INT_COLUMNS.values():
+            values = df[column]
+            if (
+                    not values.isnull().any() and len(values) > 0 and
+                    values.min() >= np.iinfo(dtype).min and values.max() <= np.iinfo(dtype).max
+            ):
+                casts[column] = dtype
+    return df.astype(casts)
+
+
+def concatenate_frames(frames):
+    """
+    Concatenate IMGW tables into one pd.DataFrame. Categorical columns are given
+    common categories first, so they stay categorical after concatenation.
+
+    Keyword arguments:
+        frames -- list of pd.DataFrames with the same columns
+    """
+
+    import pandas as pd
+    import functools
+
+    common_dtypes = {}
+    for column in frames[0].columns:
+        column_dtypes = [frame[column].dtype for frame in frames]
+        if all(isinstance(dtype, pd.CategoricalDtype) for dtype in column_dtypes):
+            categories = functools.reduce(lambda a, b: a.union(b), [dtype.categories for dtype in column_dtypes])
+            common_dtypes[column] = pd.CategoricalDtype(categories)
+
+    if common_dtypes:
+        frames = [frame.astype(common_dtypes) for frame in frames]  # one cast per frame for all columns
+    return pd.concat(frames)
+
+
 def get_urls(
         interval, stations_kind, years_range
 ):
@@ -376,302 +657,1865 @@ def get_urls(
             years_endings.append(str(year) + '/')
 
     urls = []
-    base_url = 'https://danepubliczne.imgw.pl/data/dane_pomiarowo_obserwacyjne/dane_meteorologiczne/'
     for ending in years_endings:
-        url = base_url + interval + stations_kind + ending
+        url = BASE_URL + interval + stations_kind + ending
         urls.append(url)
     return urls
 
 
-def download_data(urls):
+def create_session(max_workers=1):
     """
-    Download data from the IMGW database.
+    Return a requests.Session whose pool of keep-alive connections is large
+    enough to be shared by 'max_workers' threads.
 
     Keyword arguments:
-        urls -- urls for the data which is requested
+        max_workers -- number of threads which will use the session (default 1)
     """
 
     import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_archive_cache(use_cache=False, cache_dir=None, cache_max_size=2 * 1024 ** 3, download_dir=None):
+    """
+    Return the object which keeps the downloaded archives:
+    cloupy.scraping.imgw_cache.ResumableDownloads if 'download_dir' is given,
+    cloupy.scraping.imgw_cache.ArchiveCache with 'use_cache' or None (the
+    archives are only downloaded).
+
+    Keyword arguments:
+        use_cache -- keep the archives in the cache (default False)
+        cache_dir -- directory of the cache. If None, the default directory will be
+    used (default None)
+        cache_max_size -- maximum size of the cache in bytes (default 2 GiB)
+        download_dir -- directory for checkpointed bulk downloads (default None)
+    """
+
+    if download_dir is not None:
+        from cloupy.scraping.imgw_cache import ResumableDownloads
+        return ResumableDownloads(download_dir)
+    elif use_cache:
+        from cloupy.scraping.imgw_cache import ArchiveCache
+        return ArchiveCache(cache_dir, cache_max_size)
+    return None
+
+
+def get_listing_index(cache=None, ttl=0):
+    """
+    Return the listing index (cloupy.scraping.imgw_cache.ListingIndex). The index
+    is kept next to the cached archives or, without the cache, in memory (shared
+    by all calls in the process).
+
+    Keyword arguments:
+        cache -- cloupy.scraping.imgw_cache.ArchiveCache or None (default None)
+        ttl -- maximum age of the listings in seconds. By default, the listings are
+    always downloaded again (default 0)
+    """
+
+    from cloupy.scraping.imgw_cache import ListingIndex
+    import os
+
+    if cache is not None:
+        return ListingIndex(os.path.join(cache.cache_dir, 'listings.json'), ttl)
+    return ListingIndex(ttl=ttl, listings=MEMORY_LISTINGS)
+
+
+def get_listing(session, url, listing_index=None):
+    """
+    Return the .zip archives listed in the IMGW directory under the given URL as
+    a list of dictionaries: {'name': ..., 'modified': ..., 'size': ...}. The
+    modification time and size are taken as shown in the listing (str) and are
+    None if the listing does not show them. Raise requests.HTTPError if the
+    listing could not be downloaded, so a failed request is never taken for an
+    empty directory.
+
+    Keyword arguments:
+        session -- requests.Session used for the request
+        url -- url of the IMGW directory
+        listing_index -- cloupy.scraping.imgw_cache.ListingIndex. If given, a fresh
+    listing is taken from the index and a downloaded one is saved in it (default
+    None)
+    """
+
     from bs4 import BeautifulSoup as bs
+    import re
+
+    if listing_index is not None:
+        listing = listing_index.get(url)
+        if listing is not None:
+            return listing
+
+    r = session.get(url)
+    r.raise_for_status()
+    soup = bs(r.content, features="html.parser")
+
+    listing = []
+    for element in soup.find_all('a'):
+        if '.zip' not in element.get_text():
+            continue
+
+        row = element.find_parent('tr')
+        if row is not None:  # listing as a table
+            details = row.get_text(' ')
+        else:  # listing as preformatted text
+            details = str(element.next_sibling or '')
+
+        match = re.search(LISTING_DETAILS_PATTERN, details)
+        listing.append({
+            'name': element.get_text(),
+            'modified': match.group(1) if match else None,
+            'size': match.group(2) if match else None
+        })
+
+    if listing_index is not None:
+        listing_index.put(url, listing)
+    return listing
+
+
+def get_zip_file_paths(session, url, listing_index=None):
+    """
+    Return the names of the .zip archives listed in the IMGW directory under
+    the given URL.
+
+    Keyword arguments:
+        session -- requests.Session used for the request
+        url -- url of the IMGW directory
+        listing_index -- cloupy.scraping.imgw_cache.ListingIndex (default None)
+    """
+
+    return [archive['name'] for archive in get_listing(session, url, listing_index)]
+
+
+def download_archive(session, url, cache=None):
+    """
+    Download the .zip archive from the given URL and return its content. Raise
+    requests.HTTPError if the archive could not be downloaded.
+
+    Keyword arguments:
+        session -- requests.Session used for the request
+        url -- url of the .zip archive
+        cache -- cloupy.scraping.imgw_cache.ArchiveCache from which the archive will
+    be served if it has not changed (or ResumableDownloads for checkpointed
+    downloads). If None, always download the archive (default None)
+    """
+
+    if cache is not None:
+        return cache.get(session, url)
+    r = session.get(url)
+    r.raise_for_status()
+    return r.content
+
+
+def open_archive(session, url, cache=None):
+    """
+    Download the .zip archive from the given URL and return it as an in-memory
+    zipfile.ZipFile (nothing is written to disk) with the URL as its 'filename'.
+
+    Keyword arguments:
+        session -- requests.Session used for the request
+        url -- url of the .zip archive
+        cache -- cloupy.scraping.imgw_cache.ArchiveCache for the downloaded archives
+    (default None)
+    """
+
     import zipfile
     import io
 
-    files_reading_dir_path = str(__file__).replace('imgw.py', 'files_reading_folder')
+    archive = zipfile.ZipFile(io.BytesIO(download_archive(session, url, cache)))
+    archive.filename = url
+    return archive
 
-    for url in urls:
-        if urls.index(url) == 0:
-            print("Data download started... 0% done")
 
-        r = requests.get(url)
-        soup = bs(r.content, features="html.parser")
+def download_and_extract_archive(session, url, files_reading_dir_path, cache=None):
+    """
+    Download the .zip archive from the given URL and extract it to the
+    'files_reading_dir_path' directory.
+
+    Keyword arguments:
+        session -- requests.Session used for the request
+        url -- url of the .zip archive
+        files_reading_dir_path -- directory to which the archive will be extracted
+        cache -- cloupy.scraping.imgw_cache.ArchiveCache for the downloaded archives
+    (default None)
+    """
 
-        zip_file_paths = []
-        for element in soup.find_all('a'):
-            if '.zip' in element.get_text():
-                zip_file_paths.append(element.get_text())
+    open_archive(session, url, cache).extractall(files_reading_dir_path)
 
-        for path in zip_file_paths:
-            zip_file = requests.get(url + path)
-            zip_file = zipfile.ZipFile(io.BytesIO(zip_file.content))
-            zip_file.extractall(files_reading_dir_path)
 
-        if (urls.index(url) + 1) % 5 == 0:
-            print("Downloading data... {}% done".format(round((urls.index(url) / len(urls)) * 100)))
-    print("Data downloaded! 100% done")
+def get_files_reading_dir(files_reading_dir):
+    """
+    Return the path of the directory with the extracted IMGW archives. The
+    directory may be given as a path or as the tempfile.TemporaryDirectory
+    returned by 'download_data'.
+    """
 
+    import tempfile
 
-def concatenate_data(
-        downloaded_files_names, file_formats, specific_columns,
-        keywords, optimize_memory_usage, years_range,
-        merge_splitted_stations
+    if files_reading_dir is None:
+        raise ValueError(
+            "Invalid 'files_reading_dir' input. Give the directory to which 'download_data' extracted the files."
+        )
+    if isinstance(files_reading_dir, tempfile.TemporaryDirectory):
+        return files_reading_dir.name
+    return str(files_reading_dir)
+
+
+def download_data(
+        urls, max_workers=1, cache=None, extract=True, files_reading_dir=None,
+        archive_filter=None, listing_index=None
 ):
     """
-    Merge tables from downloaded files and return them as one merged pd.DataFrame.
+    Download data from the IMGW database. If 'extract' is False, return the
+    downloaded archives as a list of in-memory zipfile.ZipFile objects (in the
+    order of 'urls' and of the directory listings). If 'extract' is True and
+    'files_reading_dir' is None, the archives are extracted to a new
+    tempfile.TemporaryDirectory which is returned; it is removed on its
+    'cleanup' (or at the end of a 'with' block), so no files are left behind.
 
     Keyword arguments:
-        downloaded_files_names -- list of downloaded file names
-        file_formats -- IMGW file formats included in downloaded files
-        specific_columns -- which columns will be taken for merge
-        keywords -- words which must be in the column name if the column is to be
-    merged
-        optimize_memory_usage -- reduce pd.DataFrame memory usage
-        years_range -- filter pd.DataFrame up to the given period
+        urls -- urls for the data which is requested
+        max_workers -- maximum number of threads which download the directory
+    listings and the archives concurrently. All threads share one pool of
+    keep-alive connections (default 1)
+        cache -- cloupy.scraping.imgw_cache.ArchiveCache in which the archives are
+    kept between calls. If None, every archive is downloaded (default None)
+        extract -- extract the archives to the 'files_reading_dir' directory. If
+    False, nothing is written to disk (default True)
+        files_reading_dir -- directory to which the archives are extracted. If None,
+    every call extracts to its own temporary directory (default None)
+        archive_filter -- function (url, archive names) -> archive names which
+    chooses the archives to download from every directory (e.g.
+    'select_station_archives'). If None, download all archives (default None)
+        listing_index -- cloupy.scraping.imgw_cache.ListingIndex with the directory
+    listings. If None, every listing is downloaded (default None)
     """
 
-    import pandas as pd
-    import numpy as np
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+    import functools
     import os
+    import tempfile
 
-    if isinstance(file_formats, list) and len(file_formats) > 1:
-        raise ValueError(
-            f"""Invalid value for the 'file_format' argument. Data downloading is possible only for a single file. 
-            {len(file_formats)} files given ({file_formats}).
-            """
-        )
+    if not isinstance(max_workers, int) or max_workers < 1:
+        raise ValueError("Invalid 'max_workers' input. Use a positive int.")
 
-    if isinstance(file_formats, str):
-        file_formats = [file_formats]
+    if extract:
+        if files_reading_dir is None:
+            # own directory for every call, so that concurrent calls do not mix their files
+            temporary_dir = files_reading_dir = tempfile.TemporaryDirectory()
+        else:
+            temporary_dir = None
+        files_reading_dir_path = get_files_reading_dir(files_reading_dir)
+        os.makedirs(files_reading_dir_path, exist_ok=True)  # threads extracting at once would race to create it
+        process_archive = functools.partial(download_and_extract_archive, files_reading_dir_path=files_reading_dir_path)
+    else:
+        process_archive = open_archive
+    session = create_session(max_workers)
+    archives = {}
+
+    print("Data download started... 0% done")
+    with session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        for url in urls:
+            pending[executor.submit(get_zip_file_paths, session, url, listing_index)] = (url, None, None)
+
+        # the url is done when its listing and all of its archives are done, no matter in which order
+        archives_left = {}
+        urls_done = 0
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                url, path, path_index = pending.pop(future)
+                result = future.result()
+
+                if path is None:
+                    if archive_filter is not None:
+                        result = archive_filter(url, result)
+                    archives_left[url] = len(result)
+                    for path_index, path in enumerate(result):
+                        archive_future = executor.submit(process_archive, session, url + path, cache=cache)
+                        pending[archive_future] = (url, path, path_index)
+                else:
+                    archives[(urls.index(url), path_index)] = result
+                    archives_left[url] -= 1
+
+                if archives_left[url] == 0:
+                    del archives_left[url]
+                    urls_done += 1
+                    if urls_done % 5 == 0 and urls_done != len(urls):
+                        print("Downloading data... {}% done".format(round((urls_done / len(urls)) * 100)))
+    print("Data downloaded! 100% done")
 
-    if isinstance(keywords, str):
-        keywords = [keywords]
+    if not extract:
+        return [archives[key] for key in sorted(archives)]
+    return temporary_dir
 
-    df = pd.DataFrame()
-    keywords_in_columns = []
-    files_reading_dir_path = str(__file__).replace('imgw.py', 'files_reading_folder')
 
-    for file in downloaded_files_names:
-        if downloaded_files_names.index(file) == 0:
-            print("Data concatenating started... 0% done")
+def file_matches_format(file_name, file_format):
+    """
+    Return True if the file from the IMGW database contains the data in the given
+    file format (e.g. 'k_d_t_01_2018.csv' matches 'k_d_t' but does not match 'k_d').
 
-        for file_format in file_formats:
+    Keyword arguments:
+        file_name -- name of the file from the IMGW archive
+        file_format -- IMGW database file format (e.g. 's_m_t')
+    """
 
-            if file_format == 's_d' or file_format == 'k_d':
-                avoid_file_format = file_format + '_t'
-            else:
-                avoid_file_format = 'NO FILE FORMAT TO AVOID'
+    if file_format == 's_d' or file_format == 'k_d':
+        avoid_file_format = file_format + '_t'
+    else:
+        avoid_file_format = 'NO FILE FORMAT TO AVOID'
 
-            if file_format in file and avoid_file_format not in file:
+    return file_format in file_name and avoid_file_format not in file_name
 
-                path = os.path.join(files_reading_dir_path, file)
-                csv_DataFrame = pd.read_csv(path, encoding="windows-1250", header=None)
 
-                if specific_columns is not None and keywords is None:
-                    if type(specific_columns) == str:
-                        specific_columns = [specific_columns]
+def read_imgw_csv(source, usecols=None, dtypes=None, engine='pandas'):
+    """
+    Read a single table from the IMGW database and return it as pd.DataFrame with
+    column indexes as column names.
 
-                    if type(specific_columns) is list:
-                        csv_DataFrame = csv_DataFrame[specific_columns]
-                    else:
-                        raise ValueError("Invalid 'specific_columns' type. Use a list of strs or a single str.")
+    Keyword arguments:
+        source -- path to the file or a file-like object (e.g. an archive member)
+        usecols -- indexes of the columns which will be parsed. If None, parse all
+    columns (default None)
+        dtypes -- dtypes for the columns (as returned by 'get_column_dtypes' or
+    'get_storage_dtypes'). The measurements are parsed straight into their dtype,
+    categorical and small int columns are cast right after parsing. If None, the
+    dtypes are inferred by pandas (default None)
+        engine -- 'pandas', 'pyarrow' or 'polars' (see
+    cloupy.scraping.parsing_engines.get_parsing_engine). The table is the same for
+    every engine (default 'pandas')
+    """
 
-                if keywords is not None and len(keywords_in_columns) == 0:
-                    columns = get_column_names(file_format)
-                    for keyword in keywords:
-                        for column in columns:
-                            if keyword.upper() in column.upper():
-                                keywords_in_columns.append(columns.index(column))
+    import pandas as pd
 
-                if keywords is not None:
-                    csv_DataFrame = csv_DataFrame[keywords_in_columns]
+    parsing_dtypes = None
+    if dtypes is not None:
+        casted_after_parsing = ['category'] + list(SMALL_INT_COLUMNS.values())
+        parsing_dtypes = {column: dtype for column, dtype in dtypes.items() if dtype not in casted_after_parsing}
+        if usecols is not None:
+            parsing_dtypes = {column: dtype for column, dtype in parsing_dtypes.items() if column in usecols}
+
+    if engine == 'pyarrow':
+        df = read_csv_with_pyarrow(source, usecols, parsing_dtypes)
+    elif engine == 'polars':
+        df = read_csv_with_polars(source, usecols, parsing_dtypes)
+    else:
+        df = pd.read_csv(source, encoding="windows-1250", header=None, usecols=usecols, dtype=parsing_dtypes)
 
-                if optimize_memory_usage:
-                    for column in csv_DataFrame.columns:
-                        if column == 0:
-                            csv_DataFrame[column] = csv_DataFrame[column].astype('object', errors='ignore')
-                        elif csv_DataFrame[column].dtype == np.dtype('int64'):
-                            csv_DataFrame[column] = csv_DataFrame[column].astype('int16', errors='ignore')
-                        elif csv_DataFrame[column].dtype == np.dtype('float64'):
-                            csv_DataFrame[column] = csv_DataFrame[column].astype('float16', errors='ignore')
-                        else:
-                            csv_DataFrame[column] = csv_DataFrame[column].astype('float16', errors='ignore')
+    if dtypes is None:
+        return df
+    return apply_column_dtypes(df, dtypes)
 
-                df = df.append(csv_DataFrame)
 
-        try:
-            if (downloaded_files_names.index(file) + 1) % (round(len(downloaded_files_names) * 0.1)) == 0:
-                print("Concatenating data... {}% done".format(
-                    round((downloaded_files_names.index(file) / len(downloaded_files_names)) * 100)))
-        except ZeroDivisionError:
-            pass
-    print("Data concatenated! 100% done \n")
+def read_csv_with_pyarrow(source, usecols=None, dtypes=None):
+    """
+    Read the IMGW table with the multithreaded CSV reader of pyarrow and return it
+    as pd.DataFrame with the same columns and dtypes as 'pd.read_csv' would
+    return (see 'read_imgw_csv').
+    """
 
-    try:
-        df = df[df[2] >= min(
-            years_range)]
-        df = df[df[2] <= max(
-            years_range)]
-    except KeyError:
-        print("No column with year has been specified. Can't limit data range to given 'years_range'.")
-
-    if merge_splitted_stations and 1 in df.columns:
-        stations_series = df[1]
-        new_stations_series = []
-        for station in stations_series:
-            if station == 'KATOWICE-MUCHOWIEC':
-                new_stations_series.append('KATOWICE')
-            elif station == 'ŁÓDŹ-LUBLINEK':
-                new_stations_series.append('ŁÓDŹ')
-            elif station == 'POZNAŃ-ŁAWICA':
-                new_stations_series.append('POZNAŃ')
-            elif station == 'WARSZAWA-OKĘCIE':
-                new_stations_series.append('WARSZAWA')
-            elif station == 'WROCŁAW-STRACHOWICE':
-                new_stations_series.append('WROCŁAW')
-            elif station == 'ELBLĄG-MILEJEWO':
-                new_stations_series.append('ELBLĄG')
-            elif station == 'RESKO-SMÓLSKO':
-                new_stations_series.append('RESKO')
-            elif station == 'KOŁOBRZEG-DŹWIRZYNO':
-                new_stations_series.append('KOŁOBRZEG')
-            else:
-                new_stations_series.append(station)
-        df[1] = new_stations_series
+    import numpy as np
+    import pyarrow as pa
+    from pyarrow import csv
 
-    if keywords is not None:
-        return df, keywords_in_columns
+    read_options = csv.ReadOptions(autogenerate_column_names=True, encoding='windows-1250')
+    convert_options = csv.ConvertOptions(strings_can_be_null=True)
+    if usecols is not None:
+        convert_options.include_columns = ['f{}'.format(column) for column in usecols]
+    if dtypes:
+        convert_options.column_types = {
+            'f{}'.format(column): pa.from_numpy_dtype(np.dtype(dtype)) for column, dtype in dtypes.items()
+        }
+
+    table = csv.read_csv(source, read_options=read_options, convert_options=convert_options)
+    df = table.to_pandas()
+    df.columns = [int(name[1:]) for name in df.columns]
+    return fix_empty_columns(df)
+
+
+def read_csv_with_polars(source, usecols=None, dtypes=None):
+    """
+    Read the IMGW table with the multithreaded CSV reader of polars and return it
+    as pd.DataFrame with the same columns and dtypes as 'pd.read_csv' would
+    return (see 'read_imgw_csv').
+    """
+
+    import io
+    import polars as pl
+
+    if hasattr(source, 'read'):
+        content = source.read()
     else:
-        return df
+        with open(source, 'rb') as f:
+            content = f.read()
 
+    # polars reads only utf-8 files
+    content = content.decode('windows-1250').encode('utf-8')
+    df = pl.read_csv(io.BytesIO(content), has_header=False, columns=usecols, infer_schema_length=None).to_pandas()
+    df.columns = [int(name.split('_')[-1]) - 1 for name in df.columns]
+    if dtypes:
+        df = df.astype(dtypes)
+    return fix_empty_columns(df)
 
-def download_imgw_climatological_data(
-        interval, stations_kind, years_range,
-        file_format_index=0, file_format=None, specific_columns=None,
-        keywords=None, merge_split_stations=True, optimize_memory_usage=False,
-        return_coordinates=False
-):
+
+def fix_empty_columns(df):
+    """
+    Cast the columns without any values to float64 (as 'pd.read_csv' does) in the
+    table read with pyarrow or polars.
+    """
+
+    empty_columns = [column for column in df.columns if df[column].dtype == object and df[column].isnull().all()]
+    return df.astype({column: 'float64' for column in empty_columns})
+
+
+def get_station_names(stations, split_stations=None):
     """
-    Download the IMGW data files and return them as one merged pd.DataFrame.
+    Return the set of station names (upper case) for the given stations, together
+    with the split station names which are merged into them.
 
     Keyword arguments:
-        interval -- data interval from the IMGW database ('monthly', 'daily',
-    'prompt')
-        stations_kind -- stations' kind ('synop', 'climat', 'fall')
-        years_range -- years range (e.g. range(2010, 2021))
-        file_format_index -- for which element (from the list of the available file
-    formats in the IMGW database) the data will be downloaded. Usually the length of
-    the list is 2. Valid inputs: 0, 1, 'all' (default 0)
-        file_format -- IMGW database file format. The argument has priority over
-    'file_format_index'. If None, the data will be downloaded correspondingly to
-    'file_format_index' (default None)
-        specific_columns -- which columns from downloaded files will be taken
-    to merge. If None, take all columns (default None)
-        keywords -- words which must be in the column name if the column is to be
-    merged. If None, do not filter the column names (default None)
-        merge_split_stations -- merge stations which are the same but have
-    different names (default True)
-        optimize_memory_usage -- reduce pd.DataFrame memory usage (default False)
-        return_coordinates -- add columns with latitude, longitude and elevation
-    to the returned DataFrame (default False)
+        stations -- names (str) or codes (int) of the stations
+        split_stations -- dictionary {station name: merged station name}. If None,
+    use the table from 'get_split_stations' (default None)
     """
 
-    from os import listdir
-    from os.path import isfile, join
-    import shutil
+    if split_stations is None:
+        split_stations = get_split_stations()
 
-    if file_format not in get_file_formats(interval, stations_kind, 'all') and file_format is not None:
-        raise ValueError(
-            f"""
-            There's no such file format ({file_format}) for the specified combination of 'interval' and 'stations_kind'
-            """
-        )
+    names = {station.upper() for station in stations if isinstance(station, str)}
+    names |= {name for name, merged_name in split_stations.items() if merged_name in names}
+    return names
 
-    files_reading_dir_path = str(__file__).replace('imgw.py', 'files_reading_folder')
 
-    urls = get_urls(interval, stations_kind, years_range)
-    download_data(urls)
-    downloaded_files_names = [f for f in listdir(files_reading_dir_path) if isfile(join(files_reading_dir_path, f))]
+def normalize_stations(stations, merge_split_stations):
+    """
+    Return a tuple (stations, split stations) for the 'stations' and
+    'merge_split_stations' arguments of the download functions: the stations as a
+    list (or None) with the names of the split stations merged into them and the
+    dictionary {station name: merged station name} given in
+    'merge_split_stations' (or None if the default table is used).
 
-    if file_format is not None:
-        if type(file_format) == str:
-            file_formats = [file_format]
-        elif type(file_format) == list:
-            file_formats = [format_ for format_ in file_format]
-        else:
-            raise ValueError("Invalid input for the 'file_format' argument. Use a single str or a list of strs.")
-    else:
-        file_formats = get_file_formats(interval, stations_kind, file_format_index)
+    Keyword arguments:
+        stations -- names (str) or codes (int) of the stations or None
+        merge_split_stations -- True, False or a dictionary {station name: merged
+    station name} (see 'merge_stations')
+    """
 
-    df = concatenate_data(downloaded_files_names, file_formats, specific_columns,
-                          keywords, optimize_memory_usage, years_range,
-                          merge_split_stations)
+    if isinstance(stations, (str, int)):
+        stations = [stations]
 
-    if keywords is not None:
-        keywords_in_columns = df[1]
-        df = df[0]
-    else:
-        df = df
-        keywords_in_columns = None
+    split_stations = merge_split_stations if isinstance(merge_split_stations, dict) else None
+    if split_stations is not None and stations is not None:
+        stations = list(stations) + sorted(get_station_names(stations, split_stations))
+    return stations, split_stations
 
-    if len(file_formats) == 1:
-        column_names = get_column_names(file_formats[0])
 
-        if specific_columns is not None and keywords is None:
-            chosen_columns_names = []
-            if type(specific_columns) == list:
-                for column_index in specific_columns:
-                    chosen_columns_names.append(column_names[column_index])
-            df.columns = chosen_columns_names
+def get_archive_station_id(archive_name):
+    """
+    Return the station id (the last 3 digits of the station code) of the
+    per-station IMGW archive or None if the archive contains many stations (e.g.
+    '2001_375_s.zip' -> '375', '2001_01_k.zip' -> None).
+    """
 
-        elif keywords is not None:
-            chosen_columns_names = []
-            for column_index in keywords_in_columns:
-                chosen_columns_names.append(column_names[column_index])
-            df.columns = chosen_columns_names
+    import re
 
-        else:
-            df.columns = column_names
+    match = re.match(STATION_ARCHIVE_PATTERN, archive_name)
+    return match.group(1) if match else None
 
-    shutil.rmtree(files_reading_dir_path)
 
-    if return_coordinates:
-        import pandas as pd
+def get_station_index(cache=None):
+    """
+    Return the station index (cloupy.scraping.imgw_cache.StationIndex). The index
+    is kept next to the cached archives or, without the cache, in memory.
 
-        print('Joining coordinates to the dataframe...')
+    Keyword arguments:
+        cache -- cloupy.scraping.imgw_cache.ArchiveCache or None (default None)
+    """
 
-        lat = []
-        lon = []
-        elv = []
+    from cloupy.scraping.imgw_cache import StationIndex
+    import os
 
-        path = str(__file__).replace('imgw.py', 'imgw_coordinates.csv')
-        station_coordinates = pd.read_csv(path, index_col=0)
+    global MEMORY_STATION_INDEX
 
-        for station in list(df['Nazwa stacji']):
-            try:
-                coordinates = station_coordinates[station]
-            except KeyError:
-                lat.append(None)
-                lon.append(None)
-                elv.append(None)
-                continue
+    if cache is not None:
+        return StationIndex(os.path.join(cache.cache_dir, 'stations.json'))
+    if MEMORY_STATION_INDEX is None:
+        MEMORY_STATION_INDEX = StationIndex()
+    return MEMORY_STATION_INDEX
+
+
+def select_station_archives(url, archive_names, stations, station_index):
+    """
+    Return the names of the archives under the url which can contain the data for
+    the given stations. The station names are mapped to the per-station archives
+    through their codes from the station registry (see
+    'cloupy.scraping.imgw_stations.StationRegistry'), so they are selected even
+    before the first download. For the names without known codes, the station
+    index is used and per-station archives which are not in the index yet are
+    returned. Archives with many stations are always returned.
+
+    Keyword arguments:
+        url -- url of the IMGW directory
+        archive_names -- names of the archives in the directory
+        stations -- names (str) or codes (int) of the stations
+        station_index -- cloupy.scraping.imgw_cache.StationIndex
+    """
+
+    from cloupy.scraping.imgw_stations import get_station_registry
+
+    names = get_station_names(stations)
+    ids = {str(station)[-3:] for station in stations if not isinstance(station, str)}
 
-            lon.append(coordinates[1])
-            lat.append(coordinates[0])
-            elv.append(coordinates[2])
+    # a station and its split names have the same code, so it is enough that one of them is known
+    registry = get_station_registry()
+    unresolved_names = set()
+    for station in [station for station in stations if isinstance(station, str)]:
+        station_names = get_station_names([station])
+        codes = set().union(*[registry.get_codes(name) for name in station_names])
+        if codes:
+            ids |= {str(code)[-3:] for code in codes}
+        else:
+            unresolved_names |= station_names
+    indexed_archives = station_index.get(url)
+
+    selected_archives = []
+    for archive_name in archive_names:
+        archive_id = get_archive_station_id(archive_name)
+        if (
+                archive_id is None or archive_id in ids or
+                (unresolved_names and archive_name not in indexed_archives) or
+                names & set(indexed_archives.get(archive_name, []))
+        ):
+            selected_archives.append(archive_name)
+    return selected_archives
+
+
+def index_station_archive(station_index, url, archive_name, archive):
+    """
+    Add the station names from the per-station archive to the station index
+    (archives with many stations and indexed archives are skipped).
 
-        df['lon'] = lon
-        df['lat'] = lat
-        df['elv'] = elv
+    Keyword arguments:
+        station_index -- cloupy.scraping.imgw_cache.StationIndex
+        url -- url of the IMGW directory
+        archive_name -- name of the archive
+        archive -- zipfile.ZipFile with the IMGW tables
+    """
 
+    if get_archive_station_id(archive_name) is None or archive_name in station_index.get(url):
+        return
+
+    station_names = set()
+    for name in archive.namelist():
+        with archive.open(name) as member:
+            station_names |= set(read_imgw_csv(member, usecols=[1])[1].dropna().astype(str))
+    station_index.update(url, archive_name, station_names)
+
+
+def filter_rows(df, years_range, stations=None):
+    """
+    Return only the rows of the IMGW table which are within 'years_range' and
+    which belong to one of the given stations.
+
+    Keyword arguments:
+        df -- IMGW table with column indexes as column names (the year in column 2,
+    the station code in column 0 and the station name in column 1)
+        years_range -- years range (e.g. range(2010, 2021))
+        stations -- names (str) or codes (int) of the stations. If None, do not
+    filter the stations (default None)
+    """
+
+    mask = (df[2] >= min(years_range)) & (df[2] <= max(years_range))
+
+    if stations is not None:
+        codes = [station for station in stations if not isinstance(station, str)]
+        mask &= df[1].isin(get_station_names(stations)) | df[0].isin(codes)
+
+    return df[mask]
+
+
+def get_key_columns(file_format):
+    """Return indexes of the station and date columns of the file format"""
+
+    column_names = get_column_names(file_format)
+    return [column_names.index(name) for name in KEY_COLUMNS if name in column_names]
+
+
+def get_selected_columns(file_format, specific_columns, keywords):
+    """
+    Return indexes of the columns chosen with 'keywords' or 'specific_columns'
+    ('keywords' have priority). If both are None, return None (all columns).
+
+    Keyword arguments:
+        file_format -- IMGW database file format (e.g. 's_m_t')
+        specific_columns -- indexes of the columns (a list of ints or a single int)
+        keywords -- words which must be in the column name if the column is to be
+    chosen
+    """
+
+    if isinstance(keywords, str):
+        keywords = [keywords]
+
+    if keywords is not None:
+        keywords_in_columns = []
+        column_names = get_column_names(file_format)
+        for keyword in keywords:
+            keyword_columns = find_columns(keyword)
+            for column in column_names:
+                if column in keyword_columns:
+                    keywords_in_columns.append(get_column_schema()['formats'][column][file_format])
+        return keywords_in_columns
+    elif specific_columns is not None:
+        if type(specific_columns) == int:
+            specific_columns = [specific_columns]
+
+        if type(specific_columns) is list:
+            return specific_columns
+        else:
+            raise ValueError("Invalid 'specific_columns' type. Use a list of ints or a single int.")
+    else:
+        return None
+
+
+def parse_file(
+        source, selected_columns, dtypes, years_range, stations=None, engine='pandas'
+):
+    """
+    Parse a single IMGW table and return only its chosen columns and rows.
+
+    Keyword arguments:
+        source -- path to the file or a file-like object (e.g. an archive member)
+        selected_columns -- indexes of the columns to return (as returned by
+    'get_selected_columns'). If None, return all columns
+        dtypes -- compact dtypes for the columns or None (see 'read_imgw_csv')
+        years_range -- years range (e.g. range(2010, 2021))
+        stations -- names (str) or codes (int) of the stations which will be kept.
+    If None, keep every station (default None)
+        engine -- engine which parses the table (see 'read_imgw_csv') (default
+    'pandas')
+    """
+
+    # the year (and the station columns for 'stations') must be parsed for filtering even if not selected
+    if selected_columns is not None:
+        filtering_columns = [2] if stations is None else [0, 1, 2]
+        usecols = sorted(set(selected_columns) | set(filtering_columns))
+    else:
+        usecols = None
+
+    df = read_imgw_csv(source, usecols, dtypes, engine)
+    df = filter_rows(df, years_range, stations)
+    if selected_columns is not None:
+        df = df[selected_columns]
+    return df
+
+
+def parse_archive(
+        archive, file_format, selected_columns, dtypes, years_range, stations=None, engine='pandas'
+):
+    """
+    Parse the members of the archive which match the file format and return a
+    list of pd.DataFrames (see 'parse_file').
+
+    Keyword arguments:
+        archive -- zipfile.ZipFile with the IMGW tables
+        file_format -- IMGW database file format (e.g. 's_m_t')
+        selected_columns -- indexes of the columns to return or None (all columns)
+        dtypes -- compact dtypes for the columns or None (see 'read_imgw_csv')
+        years_range -- years range (e.g. range(2010, 2021))
+        stations -- names (str) or codes (int) of the stations which will be kept.
+    If None, keep every station (default None)
+        engine -- engine which parses the tables (see 'read_imgw_csv') (default
+    'pandas')
+    """
+
+    frames = []
+    for name in archive.namelist():
+        if file_matches_format(name, file_format):
+            with archive.open(name) as member:
+                frames.append(parse_file(member, selected_columns, dtypes, years_range, stations, engine))
+    return frames
+
+
+def open_source(file):
+    """
+    Return the IMGW table opened as a parse_file source (a binary file object
+    which has to be closed, e.g. with the 'with' statement): the opened file or
+    archive member.
+
+    Keyword arguments:
+        file -- path to the file or a tuple (zipfile.ZipFile, member name)
+    """
+
+    if isinstance(file, tuple):
+        zip_file, name = file
+        return zip_file.open(name)
+    return open(file, 'rb')
+
+
+def read_source(file):
+    """Return the raw content (bytes) of the IMGW table (see 'open_source')"""
+
+    if isinstance(file, tuple):
+        zip_file, name = file
+        return zip_file.read(name)
+    with open(file, 'rb') as f:
+        return f.read()
+
+
+def parse_file_content(
+        content, selected_columns, dtypes, years_range, stations=None, engine='pandas'
+):
+    """
+    Parse the raw content of the IMGW table in a worker process (see
+    'parse_file'). The table is returned as an Arrow IPC stream (bytes), which is
+    much cheaper to send between processes than a pickled pd.DataFrame, or as
+    pd.DataFrame if 'pyarrow' is not installed.
+    """
+
+    import io
+
+    df = parse_file(io.BytesIO(content), selected_columns, dtypes, years_range, stations, engine)
+
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return df
+
+    table = pa.Table.from_pandas(df.rename(columns=str), preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def parse_files_in_processes(
+        files, selected_columns, dtypes, years_range, stations=None, parse_workers=2, engine='pandas'
+):
+    """
+    Parse the IMGW tables in a pool of processes and yield them as pd.DataFrames
+    in the order of 'files'. The files are read (and decompressed) in the main
+    process and at most 2 * 'parse_workers' of them wait in the pool at once.
+
+    Keyword arguments:
+        files -- paths to the files or tuples (zipfile.ZipFile, member name)
+        parse_workers -- number of processes (default 2)
+        other arguments -- as in 'parse_file'
+    """
+
+    from concurrent.futures import ProcessPoolExecutor
+    from collections import deque
+
+    with ProcessPoolExecutor(max_workers=parse_workers) as executor:
+        pending = deque()
+        for file in files:
+            pending.append(executor.submit(
+                parse_file_content, read_source(file), selected_columns, dtypes, years_range, stations, engine
+            ))
+            if len(pending) >= 2 * parse_workers:
+                yield read_parsed_content(pending.popleft().result(), dtypes)
+        while pending:
+            yield read_parsed_content(pending.popleft().result(), dtypes)
+
+
+def read_parsed_content(result, dtypes):
+    """
+    Return the table parsed by 'parse_file_content' (Arrow IPC stream or
+    pd.DataFrame) as pd.DataFrame with column indexes as column names.
+
+    Keyword arguments:
+        result -- value returned by 'parse_file_content'
+        dtypes -- compact dtypes used for parsing or None (see 'read_imgw_csv')
+    """
+
+    if not isinstance(result, bytes):
+        return result
+
+    import pyarrow as pa
+    df = pa.ipc.open_stream(result).read_all().to_pandas()
+    df = df.rename(columns=int)
+    if dtypes is not None:  # e.g. a column without values loses its small int dtype
+        df = apply_column_dtypes(df, dtypes)
+    return df
+
+
+def parse_archives(
+        archives, file_formats, selected_columns, dtypes, years_range, stations=None, parse_workers=1, engine='pandas'
+):
+    """
+    Parse the tables of the given file formats from the archives as they come
+    (e.g. from 'iter_archives') and return a dictionary {file format: list of
+    pd.DataFrames}. Every archive is read once for all file formats and is not
+    referenced after its tables were sent for parsing, so only the archives being
+    downloaded or parsed at the moment are kept in memory.
+
+    Keyword arguments:
+        archives -- iterable of zipfile.ZipFile objects with the IMGW tables
+        file_formats -- IMGW database file formats (e.g. ['s_d', 's_d_t'])
+        selected_columns -- {file format: indexes of the columns to return or None}
+        dtypes -- {file format: compact dtypes for the columns or None}
+        parse_workers -- number of processes which parse the tables in parallel
+    (default 1)
+        other arguments -- as in 'parse_file'
+    """
+
+    from concurrent.futures import ProcessPoolExecutor
+    from collections import deque
+
+    if not isinstance(parse_workers, int) or parse_workers < 1:
+        raise ValueError("Invalid 'parse_workers' input. Use a positive int.")
+
+    def iter_files():
+        for archive in archives:
+            for name in archive.namelist():
+                for format_ in file_formats:
+                    if file_matches_format(name, format_):
+                        yield format_, (archive, name)
+
+    frames = {format_: [] for format_ in file_formats}
+    if parse_workers == 1:
+        for format_, file in iter_files():
+            with open_source(file) as source:
+                frames[format_].append(
+                    parse_file(source, selected_columns[format_], dtypes[format_], years_range, stations, engine)
+                )
+        return frames
+
+    with ProcessPoolExecutor(max_workers=parse_workers) as executor:
+        pending = deque()
+        for format_, file in iter_files():
+            pending.append((format_, executor.submit(
+                parse_file_content, read_source(file), selected_columns[format_], dtypes[format_],
+                years_range, stations, engine
+            )))
+            if len(pending) >= 2 * parse_workers:
+                format_, future = pending.popleft()
+                frames[format_].append(read_parsed_content(future.result(), dtypes[format_]))
+        while pending:
+            format_, future = pending.popleft()
+            frames[format_].append(read_parsed_content(future.result(), dtypes[format_]))
+    return frames
+
+
+def create_empty_frame(file_format, selected_columns):
+    """Return an empty IMGW table with the chosen columns of the file format"""
+
+    import pandas as pd
+
+    if selected_columns is None:
+        selected_columns = list(range(len(get_column_names(file_format))))
+    return pd.DataFrame(columns=selected_columns)
+
+
+def get_split_stations():
+    """
+    Return the dictionary {station name: merged station name} of the stations
+    which are the same but have different names in the IMGW database. The table
+    is kept in 'imgw_split_stations.csv', so new stations can be added without
+    changing the code.
+    """
+
+    import pandas as pd
+
+    global SPLIT_STATIONS
+
+    if SPLIT_STATIONS is None:
+        path = str(__file__).replace('imgw.py', 'imgw_split_stations.csv')
+        table = pd.read_csv(path, encoding='utf-8', dtype=str)
+        SPLIT_STATIONS = dict(zip(table['station'], table['merged_station']))
+    return SPLIT_STATIONS
+
+
+def map_categories(values, mapping):
+    """
+    Replace the values of pd.Series with the values from 'mapping' (values which
+    are not in 'mapping' are kept). Every distinct value is looked up only once
+    and the result is built from the codes of the values, so the time does not
+    depend on the number of rows. Categorical series stay categorical.
+
+    Keyword arguments:
+        values -- pd.Series
+        mapping -- dictionary {value: new value}
+    """
+
+    import pandas as pd
+    import numpy as np
+
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        categories = values.cat.categories
+        new_values = pd.Index([mapping.get(category, category) for category in categories])
+        new_categories = new_values.unique().sort_values()
+        recoding = new_categories.get_indexer(new_values)
+        codes = values.cat.codes.to_numpy()
+        new_codes = np.where(codes >= 0, recoding[np.maximum(codes, 0)], -1)
+        return pd.Series(pd.Categorical.from_codes(new_codes, new_categories), index=values.index, name=values.name)
+
+    codes, uniques = pd.factorize(values)
+    new_uniques = pd.Index([mapping.get(unique, unique) for unique in uniques], dtype=uniques.dtype)
+    new_values = new_uniques.take(codes, allow_fill=True, fill_value=np.nan)
+    return pd.Series(new_values, index=values.index, name=values.name)
+
+
+def merge_stations(df, split_stations=None):
+    """
+    Merge stations which are the same but have different names in the IMGW table
+    with column indexes as column names.
+
+    Keyword arguments:
+        df -- IMGW table with the station names in column 1
+        split_stations -- dictionary {station name: merged station name}. If None,
+    use the table from 'get_split_stations' (default None)
+    """
+
+    if split_stations is None:
+        split_stations = get_split_stations()
+
+    if 1 in df.columns:
+        df[1] = map_categories(df[1], split_stations)
+    return df
+
+
+def concatenate_data(
+        downloaded_files_names, file_formats, specific_columns,
+        keywords, optimize_memory_usage, years_range,
+        merge_splitted_stations, archives=None, stations=None,
+        files_reading_dir=None, parse_workers=1, engine='pandas'
+):
+    """
+    Merge tables from downloaded files and return them as one merged pd.DataFrame.
+    Only the chosen columns are parsed and the rows are filtered file by file.
+
+    Keyword arguments:
+        downloaded_files_names -- list of downloaded file names
+        file_formats -- IMGW file formats included in downloaded files
+        specific_columns -- which columns will be taken for merge
+        keywords -- words which must be in the column name if the column is to be
+    merged
+        optimize_memory_usage -- reduce pd.DataFrame memory usage with compact
+    dtypes which keep all values (see 'get_column_dtypes')
+        years_range -- filter pd.DataFrame up to the given period
+        merge_splitted_stations -- merge stations which are the same but have
+    different names (True, False or a dictionary {station name: merged station
+    name} used instead of the default table, see 'get_split_stations')
+        archives -- zipfile.ZipFile objects returned by 'download_data(urls,
+    extract=False)'. If given, the tables are read straight from the archives
+    (only the members matching 'file_formats' are opened) and
+    'downloaded_files_names' is ignored (default None)
+        stations -- names (str) or codes (int) of the stations which will be kept.
+    If None, keep every station (default None)
+        files_reading_dir -- directory with the extracted files: the path given to
+    'download_data' or the tempfile.TemporaryDirectory returned by it. Required
+    if 'archives' is None (default None)
+        parse_workers -- number of processes which parse the files in parallel. The
+    merged table is the same for any number of processes (default 1)
+        engine -- 'pandas', 'pyarrow' (multithreaded Arrow CSV reader), 'polars' or
+    'auto' ('pyarrow' if it is installed). If the engine is not installed, the
+    files are parsed with pandas. The merged table is the same for every engine
+    (default 'pandas')
+    """
+
+    import os
+    from cloupy.scraping.parsing_engines import get_parsing_engine
+
+    engine = get_parsing_engine(engine)
+
+    if not isinstance(parse_workers, int) or parse_workers < 1:
+        raise ValueError("Invalid 'parse_workers' input. Use a positive int.")
+
+    if isinstance(file_formats, list) and len(file_formats) > 1:
+        raise ValueError(
+            f"""Invalid value for the 'file_format' argument. Data downloading is possible only for a single file. 
+            {len(file_formats)} files given ({file_formats}).
+            """
+        )
+
+    if isinstance(file_formats, str):
+        file_formats = [file_formats]
+
+    stations, split_stations = normalize_stations(stations, merge_splitted_stations)
+
+    selected_columns = get_selected_columns(file_formats[0], specific_columns, keywords)
+    dtypes = get_column_dtypes(file_formats[0]) if optimize_memory_usage else None
+
+    if archives is not None:
+        files_reading_dir_path = None
+        sources = [(name, zip_file) for zip_file in archives for name in zip_file.namelist()]
+    else:
+        files_reading_dir_path = get_files_reading_dir(files_reading_dir)
+        sources = [(name, None) for name in downloaded_files_names]
+
+    # (path or (archive, member name)) of every file in the file format, in the order of 'sources'
+    files = []
+    for file, zip_file in sources:
+        for file_format in file_formats:
+            if file_matches_format(file, file_format):
+                files.append((zip_file, file) if zip_file is not None else os.path.join(files_reading_dir_path, file))
+
+    print("Data concatenating started... 0% done")
+    if parse_workers > 1:
+        parsed_files = parse_files_in_processes(
+            files, selected_columns, dtypes, years_range, stations, parse_workers, engine
+        )
+    else:
+        def parse(file):
+            with open_source(file) as source:
+                return parse_file(source, selected_columns, dtypes, years_range, stations, engine)
+
+        parsed_files = (parse(file) for file in files)
+
+    frames = []
+    for file_index, csv_DataFrame in enumerate(parsed_files):
+        frames.append(csv_DataFrame)
+
+        try:
+            if (file_index + 1) % (round(len(files) * 0.1)) == 0:
+                print("Concatenating data... {}% done".format(
+                    round((file_index / len(files)) * 100)))
+        except ZeroDivisionError:
+            pass
+    print("Data concatenated! 100% done \n")
+
+    # a single concatenation at the end, appending file by file would copy the whole frame every time
+    if frames:
+        df = concatenate_frames(frames)
+    else:
+        df = create_empty_frame(file_formats[0], selected_columns)
+
+    if merge_splitted_stations:
+        df = merge_stations(df, split_stations)
+
+    if keywords is not None:
+        return df, selected_columns
+    else:
+        return df
+
+
+def name_columns(df, file_format, selected_columns):
+    """
+    Replace the column indexes of the IMGW table with the column names.
+
+    Keyword arguments:
+        df -- IMGW table with column indexes as column names
+        file_format -- IMGW database file format (e.g. 's_m_t')
+        selected_columns -- indexes of the columns in 'df' or None (all columns)
+    """
+
+    column_names = get_column_names(file_format)
+    if selected_columns is None:
+        df.columns = column_names
+    else:
+        df.columns = [column_names[column_index] for column_index in selected_columns]
+    return df
+
+
+def join_frames(frames):
+    """
+    Join the named IMGW tables of several file formats on their common station and
+    date columns (outer join) and return one pd.DataFrame. Other columns which are
+    in more than one table get the file format in their name.
+
+    Keyword arguments:
+        frames -- dictionary {file format: pd.DataFrame with named columns}
+    """
+
+    import pandas as pd
+    import functools
+
+    keys = [name for name in KEY_COLUMNS if all(name in df.columns for df in frames.values())]
+    if not keys:
+        raise ValueError("The tables have no common station and date columns to join on.")
+
+    renamed_frames = []
+    for format_, df in frames.items():
+        other_columns = set().union(*[set(other.columns) for other_format, other in frames.items() if other_format != format_])
+        df = df.rename(columns={
+            column: '{} ({})'.format(column, format_)
+            for column in df.columns if column not in keys and column in other_columns
+        })
+        renamed_frames.append(df)
+
+    key_dtypes = {key: renamed_frames[0][key].dtype for key in keys}
+    df = functools.reduce(lambda left, right: pd.merge(left, right, on=keys, how='outer'), renamed_frames)
+    return df.astype({key: dtype for key, dtype in key_dtypes.items() if isinstance(dtype, pd.CategoricalDtype)})
+
+
+def join_coordinates(df):
+    """
+    Add columns with longitude, latitude and elevation of the stations to the
+    IMGW table with the 'Nazwa stacji' column. The coordinates are looked up in the
+    station registry (see cloupy.scraping.imgw_stations). If the table has the 'Kod
+    stacji' column, stations with unknown names are looked up by their codes.
+    """
+
+    from cloupy.scraping.imgw_stations import get_station_registry
+
+    registry = get_station_registry()
+    coordinates = registry.lookup(df['Nazwa stacji'])
+
+    if 'Kod stacji' in df.columns:
+        registry.add_codes(df['Kod stacji'], df['Nazwa stacji'])
+        unknown = coordinates['lat'].isnull().to_numpy()
+        if unknown.any():
+            coordinates.loc[unknown] = registry.lookup(df['Kod stacji'][unknown]).to_numpy()
+
+    for column in ['lon', 'lat', 'elv']:
+        df[column] = coordinates[column].to_numpy()
+    return df
+
+
+def choose_file_formats(
+        interval, stations_kind, file_format_index, file_format
+):
+    """
+    Return the list of file formats to download ('file_format' has priority over
+    'file_format_index'). See 'download_imgw_climatological_data' for arguments.
+    """
+
+    if file_format is None:
+        return get_file_formats(interval, stations_kind, file_format_index)
+
+    if type(file_format) == str:
+        file_formats = [file_format]
+    elif type(file_format) == list:
+        file_formats = [format_ for format_ in file_format]
+    else:
+        raise ValueError("Invalid input for the 'file_format' argument. Use a single str or a list of strs.")
+
+    for format_ in file_formats:
+        if format_ not in get_file_formats(interval, stations_kind, 'all'):
+            raise ValueError(
+                f"""
+                There's no such file format ({format_}) for the specified combination of 'interval' and 'stations_kind'
+                """
+            )
+    return file_formats
+
+
+def iter_archives(urls, max_workers=1, cache=None, archive_filter=None, listing_index=None):
+    """
+    Yield (url, archive name, zipfile.ZipFile) for every archive under the given
+    IMGW urls, in order. The directory listings are downloaded concurrently (as
+    in 'download_data') and at most 'max_workers' archives are downloaded ahead
+    of the one being consumed, so the memory usage does not grow with the number
+    of archives.
+
+    Keyword arguments:
+        urls -- urls for the data which is requested
+        max_workers -- maximum number of threads which download the archives
+    concurrently (default 1)
+        cache -- cloupy.scraping.imgw_cache.ArchiveCache for the downloaded archives
+    (default None)
+        archive_filter -- function choosing the archives to download (see
+    'download_data') (default None)
+        listing_index -- cloupy.scraping.imgw_cache.ListingIndex (default None)
+    """
+
+    from concurrent.futures import ThreadPoolExecutor
+    from collections import deque
+
+    if not isinstance(max_workers, int) or max_workers < 1:
+        raise ValueError("Invalid 'max_workers' input. Use a positive int.")
+
+    archives_left = {}
+    urls_done = 0
+
+    # the url is done when its listing and all of its archives are done
+    def count_done(url):
+        nonlocal urls_done
+        archives_left[url] -= 1
+        if archives_left[url] == 0:
+            urls_done += 1
+            if urls_done % 5 == 0 and urls_done != len(urls):
+                print("Downloading data... {}% done".format(round((urls_done / len(urls)) * 100)))
+
+    print("Data download started... 0% done")
+    session = create_session(max_workers)
+    with session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        listings = [executor.submit(get_zip_file_paths, session, url, listing_index) for url in urls]
+        pending = deque()
+        for url, listing in zip(urls, listings):
+            paths = listing.result()
+            if archive_filter is not None:
+                paths = archive_filter(url, paths)
+            archives_left[url] = len(paths) + 1
+            count_done(url)
+            for path in paths:
+                pending.append((url, path, executor.submit(open_archive, session, url + path, cache)))
+                if len(pending) > max_workers:
+                    url_, path_, future = pending.popleft()
+                    archive = future.result()
+                    count_done(url_)
+                    yield url_, path_, archive
+
+        while pending:
+            url_, path_, future = pending.popleft()
+            archive = future.result()
+            count_done(url_)
+            yield url_, path_, archive
+    print("Data downloaded! 100% done")
+
+
+def iter_imgw_data(
+        interval, stations_kind, years_range,
+        file_format_index=0, file_format=None, specific_columns=None,
+        keywords=None, merge_split_stations=True, optimize_memory_usage=False,
+        return_coordinates=False, max_workers=1, use_cache=False,
+        cache_dir=None, cache_max_size=2 * 1024 ** 3, stations=None,
+        chunks='archive', listing_ttl=0, download_dir=None, engine='pandas'
+):
+    """
+    Download the IMGW data files and yield them in chunks (pd.DataFrames) instead of
+    one merged pd.DataFrame. The chunks have the same columns as the DataFrame
+    returned by 'download_imgw_climatological_data', so they can be aggregated or
+    written out one by one with memory usage which does not depend on the length
+    of 'years_range'. Empty chunks are skipped.
+
+    Keyword arguments:
+        chunks -- size of a single chunk: 'archive' (data from a single downloaded
+    archive) or 'year' (data from a single year) (default 'archive')
+        other arguments -- as in 'download_imgw_climatological_data'
+    """
+
+    from cloupy.scraping.parsing_engines import get_parsing_engine
+
+    if chunks not in ['archive', 'year']:
+        raise ValueError("Invalid 'chunks' input. Available inputs: 'archive', 'year'.")
+    engine = get_parsing_engine(engine)
+
+    file_formats = choose_file_formats(interval, stations_kind, file_format_index, file_format)
+    if len(file_formats) > 1:
+        raise ValueError(
+            f"""Invalid value for the 'file_format' argument. Data downloading is possible only for a single file. 
+            {len(file_formats)} files given ({file_formats}).
+            """
+        )
+    file_format = file_formats[0]
+
+    stations, split_stations = normalize_stations(stations, merge_split_stations)
+
+    selected_columns = get_selected_columns(file_format, specific_columns, keywords)
+    dtypes = get_column_dtypes(file_format) if optimize_memory_usage else None
+
+    # the year is needed to split the data into years, even if it was not selected
+    parsed_columns = selected_columns
+    if chunks == 'year' and selected_columns is not None and 2 not in selected_columns:
+        parsed_columns = selected_columns + [2]
+
+    cache = get_archive_cache(use_cache, cache_dir, cache_max_size, download_dir)
+
+    def finalize(df):
+        if merge_split_stations:
+            df = merge_stations(df, split_stations)
+        df = name_columns(df, file_format, selected_columns)
+        if return_coordinates:
+            df = join_coordinates(df)
+        return df
+
+    if stations is not None:
+        import functools
+        station_index = get_station_index(cache)
+        archive_filter = functools.partial(select_station_archives, stations=stations, station_index=station_index)
+    else:
+        station_index = archive_filter = None
+
+    urls = get_urls(interval, stations_kind, years_range)
+    url_frames = []
+    previous_url = None
+    listing_index = get_listing_index(cache, listing_ttl)
+    for url, archive_name, archive in iter_archives(urls, max_workers, cache, archive_filter, listing_index):
+        if station_index is not None:
+            index_station_archive(station_index, url, archive_name, archive)
+            station_index.save()
+
+        frames = parse_archive(archive, file_format, parsed_columns, dtypes, years_range, stations, engine)
+        frames = [frame for frame in frames if not frame.empty]
+
+        if chunks == 'archive':
+            if frames:
+                yield finalize(concatenate_frames(frames))
+            continue
+
+        if url != previous_url:
+            yield from split_into_years(url_frames, selected_columns, finalize)
+            url_frames = []
+            previous_url = url
+        url_frames += frames
+
+    if chunks == 'year':
+        yield from split_into_years(url_frames, selected_columns, finalize)
+
+
+def split_into_years(frames, selected_columns, finalize):
+    """
+    Concatenate the frames from a single IMGW url and yield the data year by year
+    (helper for 'iter_imgw_data').
+    """
+
+    if not frames:
+        return
+
+    df = concatenate_frames(frames)
+    for year in sorted(df[2].unique()):
+        chunk = df[df[2] == year]
+        if selected_columns is not None:
+            chunk = chunk[selected_columns]
+        yield finalize(chunk.copy())
+
+
+def aggregate_frame(df, period):
+    """
+    Return partial aggregates (sum, count, min and max) of the measurement columns
+    of the IMGW table (those with 'float32' as the compact dtype, so no statuses
+    or codes) per station and period. Partial aggregates of several tables can be
+    combined with 'combine_aggregates'.
+
+    Keyword arguments:
+        df -- IMGW table with named columns
+        period -- 'daily' or 'monthly'
+    """
+
+    import pandas as pd
+
+    keys = [name for name in ['Kod stacji', 'Nazwa stacji'] + AGGREGATION_PERIODS[period] if name in df.columns]
+    values = [
+        column for column in df.columns
+        if get_column_dtype(column) == 'float32' and pd.api.types.is_numeric_dtype(df[column])
+    ]
+
+    grouped = df.groupby(keys, observed=True, sort=False)[values]
+    return pd.concat({
+        'sum': grouped.sum(min_count=1), 'count': grouped.count(), 'min': grouped.min(), 'max': grouped.max()
+    }, axis=1)
+
+
+def combine_aggregates(partials):
+    """
+    Combine the partial aggregates returned by 'aggregate_frame' (or by this
+    function) into one.
+
+    Keyword arguments:
+        partials -- list of the partial aggregates
+    """
+
+    import pandas as pd
+
+    df = pd.concat(partials)
+    levels = list(range(df.index.nlevels))
+
+    def group(statistic):
+        return df[statistic].groupby(level=levels, observed=True, sort=False)
+
+    return pd.concat({
+        'sum': group('sum').sum(min_count=1), 'count': group('count').sum(),
+        'min': group('min').min(), 'max': group('max').max()
+    }, axis=1)
+
+
+def aggregate_chunks(chunks, period, statistics=None):
+    """
+    Aggregate the IMGW tables (e.g. chunks yielded by 'iter_imgw_data') to daily or
+    monthly statistics per station and return one pd.DataFrame. Every chunk is
+    reduced to partial aggregates as soon as it is read, so only the aggregates
+    are kept in memory. The columns of the statistics are named after the
+    measurement and the statistic (e.g. 'Temperatura powietrza [°C] (mean)').
+    Non-numeric columns (e.g. measurement statuses) are skipped.
+
+    Keyword arguments:
+        chunks -- iterable of IMGW tables with named columns (the station and date
+    columns are required)
+        period -- 'daily' or 'monthly'
+        statistics -- list of the statistics ('mean', 'min', 'max', 'sum',
+    'count'). If None, return every statistic (default None)
+    """
+
+    import pandas as pd
+
+    if period not in AGGREGATION_PERIODS:
+        raise ValueError("Invalid 'period' input. Available inputs: 'daily', 'monthly'.")
+
+    if statistics is None:
+        statistics = AGGREGATION_STATISTICS
+    elif isinstance(statistics, str):
+        statistics = [statistics]
+    for statistic in statistics:
+        if statistic not in AGGREGATION_STATISTICS:
+            raise ValueError(
+                "Invalid 'statistics' input. Available statistics: {}.".format(', '.join(AGGREGATION_STATISTICS))
+            )
+
+    partials = []
+    for chunk in chunks:
+        partials.append(aggregate_frame(chunk, period))
+        if len(partials) >= AGGREGATION_BATCH_SIZE:
+            partials = [combine_aggregates(partials)]
+
+    if not partials:
+        return pd.DataFrame()
+
+    aggregates = combine_aggregates(partials).sort_index()
+    aggregates = {statistic: aggregates[statistic] for statistic in ['sum', 'count', 'min', 'max']}
+    aggregates['mean'] = aggregates['sum'] / aggregates['count'].where(aggregates['count'] > 0)
+
+    columns = {}
+    for column in aggregates['sum'].columns:
+        for statistic in statistics:
+            columns['{} ({})'.format(column, statistic)] = aggregates[statistic][column]
+    return pd.DataFrame(columns, index=aggregates['sum'].index).reset_index()
+
+
+def get_years_in_url(url):
+    """
+    Return the years covered by the IMGW url (e.g. range(1996, 2001) for
+    '.../1996_2000/' and range(2018, 2019) for '.../2018/').
+    """
+
+    ending = url.rstrip('/').split('/')[-1]
+    years = [int(year) for year in ending.split('_')]
+    return range(years[0], years[-1] + 1)
+
+
+def fill_store(
+        store, interval, stations_kind, file_format, years_range,
+        max_workers=1, cache=None, listing_index=None
+):
+    """
+    Download and parse the data for the years from 'years_range' which are not in
+    the Parquet store yet, and save them in the store. Every url covers whole
+    years, so all of its years are saved (also those outside 'years_range'). The
+    current year is still being published, so it is always updated (only its new
+    and changed archives are downloaded).
+
+    Keyword arguments:
+        store -- cloupy.scraping.imgw_cache.ParquetStore
+        interval -- data interval from the IMGW database ('monthly', 'daily',
+    'prompt')
+        stations_kind -- stations' kind ('synop', 'climat', 'fall')
+        file_format -- IMGW database file format (e.g. 's_m_t')
+        years_range -- years range (e.g. range(2010, 2021))
+        max_workers -- maximum number of threads which download the data
+    concurrently (default 1)
+        cache -- cloupy.scraping.imgw_cache.ArchiveCache for the downloaded archives
+    (default None)
+        listing_index -- cloupy.scraping.imgw_cache.ListingIndex with the directory
+    listings (default None)
+    """
+
+    import datetime
+
+    current_year = datetime.date.today().year
+    missing_years = [
+        year for year in years_range
+        if year >= current_year or not store.has_partition(interval, stations_kind, file_format, year)
+    ]
+    if missing_years:
+        urls = get_urls(interval, stations_kind, missing_years)
+        update_store(store, interval, stations_kind, file_format, urls, max_workers, cache, listing_index)
+
+
+def update_store(
+        store, interval, stations_kind, file_format, urls,
+        max_workers=1, cache=None, listing_index=None
+):
+    """
+    Bring the Parquet store up to date with the IMGW directories under the given
+    urls and return a summary ({'new': ..., 'changed': ..., 'unchanged': ...,
+    'removed': ...} numbers of archives). The directory listings are compared
+    with the manifest of the store: only the archives which are new or whose size
+    or modification time differ are downloaded, and only those whose checksum
+    differs are parsed again (their files in the year partitions are replaced).
+    Archives which disappeared from the listing are removed from the store. A
+    directory whose listing could not be downloaded is skipped, so nothing is
+    removed from the store because of a failed request.
+
+    Keyword arguments:
+        urls -- urls of the IMGW directories
+        other arguments -- as in 'fill_store'
+    """
+
+    from concurrent.futures import ThreadPoolExecutor
+    from collections import deque
+    import requests
+    import hashlib
+    import zipfile
+    import io
+
+    if not isinstance(max_workers, int) or max_workers < 1:
+        raise ValueError("Invalid 'max_workers' input. Use a positive int.")
+
+    storage_dtypes = get_storage_dtypes(file_format)
+    manifest = store.read_manifest(interval, stations_kind, file_format)
+    summary = {'new': 0, 'changed': 0, 'unchanged': 0, 'removed': 0}
+
+    def save_archive(url, archive, content):
+        years = get_years_in_url(url)
+        url_manifest = manifest.setdefault(url, {})
+        checksum = hashlib.sha256(content).hexdigest()
+        previous = url_manifest.get(archive['name'])
+
+        if previous is not None and previous['sha256'] == checksum:
+            summary['unchanged'] += 1
+        else:
+            summary['new' if previous is None else 'changed'] += 1
+            frames = parse_archive(
+                zipfile.ZipFile(io.BytesIO(content)), file_format, None, storage_dtypes, years
+            )
+            df = concatenate_frames(frames) if frames else create_empty_frame(file_format, None)
+            part_name = archive['name'][:-len('.zip')]
+            for year in years:
+                year_df = df[df[2] == year]
+                if year_df.empty:
+                    store.remove_part(interval, stations_kind, file_format, year, part_name)
+                else:
+                    store.write_part(interval, stations_kind, file_format, year, part_name, year_df)
+
+        url_manifest[archive['name']] = {
+            'size': archive['size'], 'modified': archive['modified'], 'sha256': checksum
+        }
+
+    print("Store update started... 0% done")
+    session = create_session(max_workers)
+    with session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for url_index, url in enumerate(urls):
+            try:
+                listing = get_listing(session, url, listing_index)
+            except requests.HTTPError as error:
+                print("WARNING: Skipping '{}', because its listing could not be downloaded ({}).".format(url, error))
+                continue
+            url_manifest = manifest.get(url, {})
+
+            to_download = []
+            for archive in listing:
+                previous = url_manifest.get(archive['name'])
+                if (
+                        previous is None or archive['size'] is None or
+                        previous['size'] != archive['size'] or previous['modified'] != archive['modified']
+                ):
+                    to_download.append(archive)
+                else:
+                    summary['unchanged'] += 1
+
+            # at most 'max_workers' archives are downloaded ahead of the one being parsed
+            pending = deque()
+            for archive in to_download:
+                pending.append((archive, executor.submit(download_archive, session, url + archive['name'], cache)))
+                if len(pending) > max_workers:
+                    archive_, future = pending.popleft()
+                    save_archive(url, archive_, future.result())
+            while pending:
+                archive_, future = pending.popleft()
+                save_archive(url, archive_, future.result())
+
+            listed_names = [archive['name'] for archive in listing]
+            for name in [name for name in manifest.get(url, {}) if name not in listed_names]:
+                for year in get_years_in_url(url):
+                    store.remove_part(interval, stations_kind, file_format, year, name[:-len('.zip')])
+                del manifest[url][name]
+                summary['removed'] += 1
+
+            for year in get_years_in_url(url):
+                if store.has_parts(interval, stations_kind, file_format, year):
+                    store.mark_complete(interval, stations_kind, file_format, year)
+                else:
+                    store.mark_incomplete(interval, stations_kind, file_format, year)
+            store.write_manifest(interval, stations_kind, file_format, manifest)
+
+            if (url_index + 1) % 5 == 0 and url_index + 1 != len(urls):
+                print("Updating the store... {}% done".format(round(((url_index + 1) / len(urls)) * 100)))
+    print("Store updated! 100% done")
+    return summary
+
+
+def refresh_imgw_store(
+        interval, stations_kind, years_range, store_dir,
+        file_format_index=0, file_format=None, max_workers=1,
+        use_cache=False, cache_dir=None, cache_max_size=2 * 1024 ** 3,
+        listing_ttl=0
+):
+    """
+    Refresh the local Parquet store with the IMGW data for the given years and
+    return a summary of the archives ({'new': ..., 'changed': ..., 'unchanged':
+    ..., 'removed': ...}). Only the archives which are new or changed in the IMGW
+    database are downloaded and parsed again, so e.g. a nightly refresh of the
+    current year does not download the finished years again.
+
+    Keyword arguments:
+        store_dir -- directory of the Parquet store (requires 'pyarrow')
+        listing_ttl -- maximum age (in seconds) of the directory listings taken from
+    the listing index. By default, the listings are always downloaded, so no
+    changes are missed (default 0)
+        other arguments -- as in 'download_imgw_climatological_data'
+    """
+
+    from cloupy.scraping.imgw_cache import ParquetStore
+
+    file_formats = choose_file_formats(interval, stations_kind, file_format_index, file_format)
+
+    cache = get_archive_cache(use_cache, cache_dir, cache_max_size)
+    listing_index = get_listing_index(cache, listing_ttl)
+    store = ParquetStore(store_dir)
+    urls = get_urls(interval, stations_kind, years_range)
+    summary = {'new': 0, 'changed': 0, 'unchanged': 0, 'removed': 0}
+    for format_ in file_formats:
+        update_summary = update_store(
+            store, interval, stations_kind, format_, urls, max_workers, cache, listing_index
+        )
+        for key, value in update_summary.items():
+            summary[key] += value
+    return summary
+
+
+def read_store(
+        store, interval, stations_kind, file_format, years_range,
+        selected_columns, stations=None, optimize_memory_usage=False
+):
+    """
+    Read the data from the Parquet store and return it as one pd.DataFrame with
+    column indexes as column names. Only the partitions of 'years_range' and only
+    the chosen columns are read.
+
+    Keyword arguments:
+        store -- cloupy.scraping.imgw_cache.ParquetStore
+        selected_columns -- indexes of the columns to return or None (all columns)
+        stations -- names (str) or codes (int) of the stations which will be kept.
+    If None, keep every station (default None)
+        optimize_memory_usage -- use the compact dtypes (default False)
+        other arguments -- as in 'fill_store'
+    """
+
+    import pandas as pd
+
+    if isinstance(stations, (str, int)):
+        stations = [stations]
+
+    if selected_columns is not None:
+        filtering_columns = [2] if stations is None else [0, 1, 2]
+        columns = sorted(set(selected_columns) | set(filtering_columns))
+    else:
+        columns = None
+
+    frames = store.read_partitions(interval, stations_kind, file_format, years_range, columns)
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return create_empty_frame(file_format, selected_columns)
+
+    df = restore_dtypes(concatenate_frames(frames), file_format, optimize_memory_usage)
+    df = filter_rows(df, years_range, stations)
+    for column in df.columns:  # as if only the kept rows were parsed
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].cat.remove_unused_categories()
+    if selected_columns is not None:
+        df = df[selected_columns]
+    return df
+
+
+def download_imgw_climatological_data(
+        interval, stations_kind, years_range,
+        file_format_index=0, file_format=None, specific_columns=None,
+        keywords=None, merge_split_stations=True, optimize_memory_usage=False,
+        return_coordinates=False, max_workers=1, use_cache=False,
+        cache_dir=None, cache_max_size=2 * 1024 ** 3, stations=None,
+        store_dir=None, parse_workers=1, join_file_formats=False,
+        listing_ttl=0, download_dir=None, aggregate=None, statistics=None,
+        engine='pandas'
+):
+    """
+    Download the IMGW data files and return them as one merged pd.DataFrame. The
+    archives are read in memory (nothing is written to the package directory), so
+    several calls can run concurrently in threads or processes. Every archive is
+    parsed as soon as it is downloaded, so only a few archives are kept in memory
+    at once, whatever the length of 'years_range'. If more than one
+    file format is chosen, the archives are downloaded once and a dictionary
+    {file format: pd.DataFrame} is returned (or a single pd.DataFrame with
+    'join_file_formats').
+
+    Keyword arguments:
+        interval -- data interval from the IMGW database ('monthly', 'daily',
+    'prompt')
+        stations_kind -- stations' kind ('synop', 'climat', 'fall')
+        years_range -- years range (e.g. range(2010, 2021))
+        file_format_index -- for which element (from the list of the available file
+    formats in the IMGW database) the data will be downloaded. Usually the length of
+    the list is 2. Valid inputs: 0, 1, 'all' (default 0)
+        file_format -- IMGW database file format. The argument has priority over
+    'file_format_index'. If None, the data will be downloaded correspondingly to
+    'file_format_index' (default None)
+        specific_columns -- which columns from downloaded files will be taken
+    to merge. If None, take all columns (default None)
+        keywords -- words which must be in the column name if the column is to be
+    merged. If None, do not filter the column names (default None)
+        merge_split_stations -- merge stations which are the same but have
+    different names. A dictionary {station name: merged station name} can be
+    given instead of the default table from 'imgw_split_stations.csv' (default
+    True)
+        optimize_memory_usage -- reduce pd.DataFrame memory usage. Station names
+    and codes, measurement statuses and coded values become categorical, the date
+    columns become small ints and the measurements become float32. No values are
+    lost (default False)
+        return_coordinates -- add columns with latitude, longitude and elevation
+    to the returned DataFrame (default False)
+        max_workers -- maximum number of threads which download the data
+    concurrently (default 1)
+        use_cache -- keep the downloaded archives in a persistent cache on disk.
+    Cached archives are revalidated with the IMGW server and downloaded again only
+    if they have changed (default False)
+        cache_dir -- directory of the cache. If None, '~/.cache/cloupy/imgw' is used
+    (default None)
+        cache_max_size -- maximum size of the cache in bytes. The least recently
+    used archives are removed when the cache grows bigger (default 2 GiB)
+        stations -- names (str) or codes (int) of the stations for which the data
+    will be returned. Per-station archives (daily and prompt data) which cannot
+    contain the stations are not downloaded: codes are matched with the archive
+    names, names with the station index learned from previously downloaded
+    archives (kept in 'cache_dir' with 'use_cache'). If None, return the data for
+    every station (default None)
+        store_dir -- directory of a local Parquet store with the parsed data
+    (requires 'pyarrow'). If given, only the years which are not in the store
+    are downloaded and parsed, and the data is read from the store with only the
+    chosen years and columns. If None, do not use the store (default None)
+        parse_workers -- number of processes which parse the downloaded files in
+    parallel (default 1)
+        join_file_formats -- if more than one file format is chosen, join the tables
+    on the station and date columns (which are always included) into one
+    pd.DataFrame. Other columns present in several tables get the file format in
+    their name (e.g. 'Status pomiaru (s_d_t)') (default False)
+        listing_ttl -- maximum age (in seconds) of the IMGW directory listings which
+    are reused instead of being downloaded again. The listings are kept in
+    'cache_dir' with 'use_cache' or in memory otherwise. Archives published in the
+    meantime are not seen until the reused listings expire. By default, the
+    listings are always downloaded (default 0)
+        download_dir -- directory for checkpointed bulk downloads (see
+    cloupy.scraping.imgw_cache.ResumableDownloads). Every verified archive is
+    recorded there, so a failed download can be run again and continues where it
+    stopped (partial archives are resumed with HTTP Range requests). If given, it
+    is used instead of the cache (default None)
+        aggregate -- aggregate the data to 'daily' (from the prompt data) or
+    'monthly' (from the prompt or daily data) statistics per station while the
+    archives are streamed, so the full table is never held in memory (see
+    'aggregate_chunks'). Only a single file format can be aggregated and the store
+    is not used. If None, return the data as it is (default None)
+        statistics -- statistics of the aggregated data ('mean', 'min', 'max',
+    'sum', 'count'). If None, return every statistic (default None)
+        engine -- engine which parses the downloaded files: 'pandas', 'pyarrow'
+    (multithreaded Arrow CSV reader), 'polars' or 'auto' ('pyarrow' if it is
+    installed). If the engine is not installed, the files are parsed with pandas
+    (default 'pandas')
+    """
+
+    file_formats = choose_file_formats(interval, stations_kind, file_format_index, file_format)
+
+    if aggregate is not None:
+        if (interval, aggregate) not in [('prompt', 'daily'), ('prompt', 'monthly'), ('daily', 'monthly')]:
+            raise ValueError(
+                "Invalid 'aggregate' input. Use 'daily' or 'monthly' for the prompt data and 'monthly' for the "
+                "daily data."
+            )
+        if len(file_formats) > 1 or store_dir is not None:
+            raise ValueError("Data aggregation is possible only for a single file format and without 'store_dir'.")
+
+        selected_columns = get_selected_columns(file_formats[0], specific_columns, keywords)
+        if selected_columns is not None:
+            key_columns = get_key_columns(file_formats[0])
+            selected_columns = key_columns + [column for column in selected_columns if column not in key_columns]
+
+        chunks = iter_imgw_data(
+            interval, stations_kind, years_range, file_format=file_formats[0], specific_columns=selected_columns,
+            merge_split_stations=merge_split_stations, optimize_memory_usage=optimize_memory_usage,
+            max_workers=max_workers, use_cache=use_cache, cache_dir=cache_dir, cache_max_size=cache_max_size,
+            stations=stations, listing_ttl=listing_ttl, download_dir=download_dir, engine=engine
+        )
+        df = aggregate_chunks(chunks, aggregate, statistics)
+
+        if return_coordinates and not df.empty:
+            print('Joining coordinates to the dataframe...')
+            df = join_coordinates(df)
+            print('Coordinates joined!')
+        return df
+
+    stations, split_stations = normalize_stations(stations, merge_split_stations)
+
+    cache = get_archive_cache(use_cache, cache_dir, cache_max_size, download_dir)
+    listing_index = get_listing_index(cache, listing_ttl)
+
+    selected_columns = {}
+    for format_ in file_formats:
+        selected_columns[format_] = get_selected_columns(format_, specific_columns, keywords)
+        if join_file_formats and selected_columns[format_] is not None:
+            key_columns = get_key_columns(format_)
+            selected_columns[format_] = key_columns + [
+                column for column in selected_columns[format_] if column not in key_columns
+            ]
+
+    frames = {}
+    if store_dir is not None:
+        from cloupy.scraping.imgw_cache import ParquetStore
+
+        store = ParquetStore(store_dir)
+        for format_ in file_formats:
+            fill_store(store, interval, stations_kind, format_, years_range, max_workers, cache, listing_index)
+            df = read_store(
+                store, interval, stations_kind, format_, years_range,
+                selected_columns[format_], stations, optimize_memory_usage
+            )
+            if merge_split_stations:
+                df = merge_stations(df, split_stations)
+            frames[format_] = df
+    else:
+        urls = get_urls(interval, stations_kind, years_range)
+        if stations is not None:
+            import functools
+            station_index = get_station_index(cache)
+            archive_filter = functools.partial(select_station_archives, stations=stations, station_index=station_index)
+        else:
+            station_index = archive_filter = None
+
+        def iter_downloaded_archives():
+            for url, archive_name, archive in iter_archives(urls, max_workers, cache, archive_filter, listing_index):
+                if station_index is not None:
+                    index_station_archive(station_index, url, archive_name, archive)
+                yield archive
+            if station_index is not None:
+                station_index.save()
+
+        # every file format is parsed from the same archives, as soon as they are downloaded
+        dtypes = {
+            format_: get_column_dtypes(format_) if optimize_memory_usage else None for format_ in file_formats
+        }
+        parsed_frames = parse_archives(
+            iter_downloaded_archives(), file_formats, selected_columns, dtypes, years_range, stations,
+            parse_workers, engine
+        )
+        print("Data concatenated! 100% done \n")
+
+        for format_ in file_formats:
+            if parsed_frames[format_]:
+                df = concatenate_frames(parsed_frames[format_])
+            else:
+                df = create_empty_frame(format_, selected_columns[format_])
+            if merge_split_stations:
+                df = merge_stations(df, split_stations)
+            frames[format_] = df
+
+    for format_ in file_formats:
+        frames[format_] = name_columns(frames[format_], format_, selected_columns[format_])
+
+    if len(file_formats) == 1:
+        df = frames[file_formats[0]]
+    elif join_file_formats:
+        df = join_frames(frames)
+    else:
+        df = frames
+
+    if return_coordinates:
+        print('Joining coordinates to the dataframe...')
+        if isinstance(df, dict):
+            df = {format_: join_coordinates(frame) for format_, frame in df.items()}
+        else:
+            df = join_coordinates(df)
         print('Coordinates joined!')
 
     return df
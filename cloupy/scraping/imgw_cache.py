@@ -0,0 +1,665 @@
+"""
+Persistent storage for the files downloaded from the IMGW database.
+
+ArchiveCache(cache_dir=None, max_size=2 * 1024 ** 3)
+ParquetStore(store_dir)
+StationIndex(path=None)
+ListingIndex(path=None, ttl=3600, listings=None)
+ResumableDownloads(download_dir, chunk_size=1024 ** 2)
+get_default_cache_dir()
+"""
+
+
+def get_default_cache_dir():
+    """Return the default directory of the cloupy cache (~/.cache/cloupy/imgw)"""
+
+    import os
+
+    return os.path.join(os.path.expanduser('~'), '.cache', 'cloupy', 'imgw')
+
+
+def write_atomically(path, content):
+    """
+    Write 'content' (bytes) to 'path' through a temporary file in the same
+    directory, so other processes never read a half-written file.
+    """
+
+    import os
+    import tempfile
+
+    file_descriptor, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(file_descriptor, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ArchiveCache:
+    """
+    Content-addressed cache of the .zip archives from the IMGW database. Every
+    archive is stored under the hash of its URL, next to a small metadata file
+    with its ETag and Last-Modified headers. Cached archives are revalidated with
+    conditional requests, so unchanged archives are never downloaded twice. When
+    the cache grows above 'max_size', the least recently used archives are
+    removed.
+
+    Keyword arguments:
+        cache_dir -- directory in which the archives will be stored. If None, the
+    default directory will be used (~/.cache/cloupy/imgw) (default None)
+        max_size -- maximum size of the cache in bytes (default 2 GiB)
+    """
+
+    def __init__(
+            self, cache_dir=None, max_size=2 * 1024 ** 3
+    ):
+        import os
+        import threading
+
+        if cache_dir is None:
+            cache_dir = get_default_cache_dir()
+        if not isinstance(max_size, int) or max_size < 0:
+            raise ValueError("Invalid 'max_size' input. Use a non-negative int (number of bytes).")
+
+        self.cache_dir = str(cache_dir)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def paths(self, url):
+        """Return paths of the archive and its metadata file for the given URL"""
+
+        import hashlib
+        import os
+
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key + '.zip'), os.path.join(self.cache_dir, key + '.json')
+
+    def read_metadata(self, url):
+        """Return the metadata of the cached archive or None if the archive is not cached"""
+
+        import json
+        import os
+
+        archive_path, metadata_path = self.paths(url)
+        if not os.path.isfile(archive_path):
+            return None
+        try:
+            with open(metadata_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def write_metadata(self, url, metadata):
+        """Save the metadata of the cached archive for the given URL"""
+
+        import json
+
+        _, metadata_path = self.paths(url)
+        write_atomically(metadata_path, json.dumps(metadata).encode('utf-8'))
+
+    def get(self, session, url):
+        """
+        Return the content of the archive from the given URL. The archive is read
+        from the cache if the server confirms that it has not changed (or if the
+        server is unreachable or fails with 5xx); otherwise it is downloaded and
+        cached. Raise requests.HTTPError if the archive could not be downloaded and
+        is not cached.
+
+        Keyword arguments:
+            session -- requests.Session used for the request
+            url -- url of the .zip archive
+        """
+
+        import requests
+        import time
+
+        archive_path, _ = self.paths(url)
+        metadata = self.read_metadata(url)
+
+        headers = {}
+        if metadata is not None:
+            if metadata.get('etag'):
+                headers['If-None-Match'] = metadata['etag']
+            if metadata.get('last_modified'):
+                headers['If-Modified-Since'] = metadata['last_modified']
+
+        try:
+            r = session.get(url, headers=headers)
+        except requests.ConnectionError:
+            if metadata is None:
+                raise
+            r = None
+
+        if metadata is not None and (r is None or r.status_code == 304 or r.status_code >= 500):
+            try:
+                with open(archive_path, 'rb') as f:
+                    content = f.read()
+            except FileNotFoundError:  # evicted by another process in the meantime
+                r = session.get(url)
+                r.raise_for_status()
+                return r.content
+            metadata['last_access'] = time.time()
+            self.write_metadata(url, metadata)
+            return content
+
+        r.raise_for_status()
+
+        write_atomically(archive_path, r.content)
+        self.write_metadata(url, {
+            'url': url,
+            'etag': r.headers.get('ETag'),
+            'last_modified': r.headers.get('Last-Modified'),
+            'size': len(r.content),
+            'last_access': time.time()
+        })
+        self.evict()
+        return r.content
+
+    def keys(self):
+        """
+        Return the keys (URL hashes) of the cached archives. Other files in the
+        cache directory (e.g. the station and listing indexes) are not archives.
+        """
+
+        import os
+
+        return [file[:-len('.zip')] for file in os.listdir(self.cache_dir) if file.endswith('.zip')]
+
+    def evict(self):
+        """Remove the least recently used archives until the cache fits in 'max_size'"""
+
+        import json
+        import os
+
+        with self._lock:
+            entries = []
+            for key in self.keys():
+                metadata_path = os.path.join(self.cache_dir, key + '.json')
+                try:
+                    with open(metadata_path, 'r', encoding='utf-8') as f:
+                        metadata = json.load(f)
+                except (FileNotFoundError, ValueError):
+                    continue
+                entries.append((metadata.get('last_access', 0), metadata.get('size', 0), metadata_path))
+
+            cache_size = sum(entry[1] for entry in entries)
+            for _, size, metadata_path in sorted(entries):
+                if cache_size <= self.max_size:
+                    break
+                for path in [metadata_path[:-len('.json')] + '.zip', metadata_path]:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                cache_size -= size
+
+    def clear(self):
+        """Remove every archive from the cache (the station and listing indexes are kept)"""
+
+        import os
+
+        with self._lock:
+            for key in self.keys():
+                for path in [os.path.join(self.cache_dir, key + '.zip'), os.path.join(self.cache_dir, key + '.json')]:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+
+
+class ParquetStore:
+    """
+    Columnar store of the parsed IMGW tables. The tables are kept as Parquet files
+    partitioned by interval, stations kind, file format and year, with one file
+    for every source archive:
+
+        store_dir/interval=daily/stations_kind=synop/file_format=s_d/year=2018/2018_375_s.parquet
+
+    The columns are named with the column indexes ('0', '1', ...), so a single
+    column can be read without parsing the rest of the file. A year partition is
+    complete (and readable) only when all archives of its year were parsed and
+    at least one of them had data for the year. Next
+    to the partitions, a manifest keeps the name, size, modification time and
+    checksum of every parsed archive, so changed archives can be found and only
+    their files replaced. Requires the 'pyarrow' package.
+
+    Keyword arguments:
+        store_dir -- directory of the store
+    """
+
+    def __init__(self, store_dir):
+        import os
+
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError(
+                "The IMGW Parquet store requires the 'pyarrow' package. Install it with 'pip install pyarrow'."
+            )
+
+        self.store_dir = str(store_dir)
+        os.makedirs(self.store_dir, exist_ok=True)
+
+    def format_dir(
+            self, interval, stations_kind, file_format
+    ):
+        """Return the directory with the partitions of the file format"""
+
+        import os
+
+        return os.path.join(
+            self.store_dir, 'interval=' + interval, 'stations_kind=' + stations_kind, 'file_format=' + file_format
+        )
+
+    def partition_dir(
+            self, interval, stations_kind, file_format, year
+    ):
+        """Return the directory of the year partition"""
+
+        import os
+
+        return os.path.join(self.format_dir(interval, stations_kind, file_format), 'year=' + str(year))
+
+    def has_partition(
+            self, interval, stations_kind, file_format, year
+    ):
+        """Return True if the year partition is complete"""
+
+        import os
+
+        return os.path.isfile(os.path.join(self.partition_dir(interval, stations_kind, file_format, year), '_COMPLETE'))
+
+    def mark_complete(
+            self, interval, stations_kind, file_format, year
+    ):
+        """Mark the year partition as complete"""
+
+        import os
+
+        path = self.partition_dir(interval, stations_kind, file_format, year)
+        os.makedirs(path, exist_ok=True)
+        write_atomically(os.path.join(path, '_COMPLETE'), b'')
+
+    def mark_incomplete(
+            self, interval, stations_kind, file_format, year
+    ):
+        """Remove the mark of the complete year partition (if it exists)"""
+
+        import os
+
+        try:
+            os.remove(os.path.join(self.partition_dir(interval, stations_kind, file_format, year), '_COMPLETE'))
+        except FileNotFoundError:
+            pass
+
+    def has_parts(
+            self, interval, stations_kind, file_format, year
+    ):
+        """Return True if the year partition has the data of at least one archive"""
+
+        import os
+
+        path = self.partition_dir(interval, stations_kind, file_format, year)
+        return os.path.isdir(path) and any(file.endswith('.parquet') for file in os.listdir(path))
+
+    def write_part(
+            self, interval, stations_kind, file_format, year, part_name, df
+    ):
+        """
+        Save the data of a single archive for a single year in the year partition
+        (replaces the previous file of the archive).
+
+        Keyword arguments:
+            part_name -- name of the source archive (without '.zip')
+            df -- IMGW table with column indexes as column names
+        """
+
+        import io
+        import os
+
+        path = self.partition_dir(interval, stations_kind, file_format, year)
+        os.makedirs(path, exist_ok=True)
+
+        buffer = io.BytesIO()
+        df = df.rename(columns=str).reset_index(drop=True)
+        df.to_parquet(buffer, engine='pyarrow', index=False)
+        write_atomically(os.path.join(path, part_name + '.parquet'), buffer.getvalue())
+
+    def remove_part(
+            self, interval, stations_kind, file_format, year, part_name
+    ):
+        """Remove the file of the archive from the year partition (if it exists)"""
+
+        import os
+
+        try:
+            os.remove(os.path.join(self.partition_dir(interval, stations_kind, file_format, year), part_name + '.parquet'))
+        except FileNotFoundError:
+            pass
+
+    def read_partitions(
+            self, interval, stations_kind, file_format, years, columns=None
+    ):
+        """
+        Return a list of tables (with column indexes as column names) from the
+        complete partitions of the given years, in the order of years and archive
+        names. Only the given columns are read.
+
+        Keyword arguments:
+            years -- years of the partitions to read
+            columns -- column indexes to read. If None, read all columns (default None)
+        """
+
+        import os
+        import pandas as pd
+
+        if columns is not None:
+            columns = [str(column) for column in columns]
+
+        frames = []
+        for year in years:
+            if not self.has_partition(interval, stations_kind, file_format, year):
+                continue
+            path = self.partition_dir(interval, stations_kind, file_format, year)
+            for file in sorted(os.listdir(path)):
+                if file.endswith('.parquet'):
+                    df = pd.read_parquet(os.path.join(path, file), engine='pyarrow', columns=columns)
+                    frames.append(df.rename(columns=int))
+        return frames
+
+    def read_manifest(
+            self, interval, stations_kind, file_format
+    ):
+        """
+        Return the manifest of the parsed archives: {url of the IMGW directory:
+        {archive name: {'size': ..., 'modified': ..., 'sha256': ...}}}.
+        """
+
+        import json
+        import os
+
+        path = os.path.join(self.format_dir(interval, stations_kind, file_format), 'manifest.json')
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def write_manifest(
+            self, interval, stations_kind, file_format, manifest
+    ):
+        """Save the manifest of the parsed archives (see 'read_manifest')"""
+
+        import json
+        import os
+
+        path = self.format_dir(interval, stations_kind, file_format)
+        os.makedirs(path, exist_ok=True)
+        write_atomically(os.path.join(path, 'manifest.json'), json.dumps(manifest, indent=1).encode('utf-8'))
+
+
+class StationIndex:
+    """
+    Index of the station names in the per-station archives of the IMGW database:
+    {url of the IMGW directory: {archive name: [station names]}}. The index is
+    learned from the downloaded archives, so archives which cannot contain the
+    requested stations are not downloaded next time. If 'path' is given, the
+    index is kept in a JSON file; otherwise only in memory.
+
+    Keyword arguments:
+        path -- path to the JSON file with the index (default None)
+    """
+
+    def __init__(self, path=None):
+        import json
+        import threading
+
+        self.path = None if path is None else str(path)
+        self.index = {}
+        self._lock = threading.Lock()
+        if self.path is not None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.index = json.load(f)
+            except (FileNotFoundError, ValueError):
+                pass
+
+    def get(self, url):
+        """Return {archive name: [station names]} for the archives under the url"""
+
+        with self._lock:
+            return dict(self.index.get(url, {}))
+
+    def update(self, url, archive_name, station_names):
+        """Save the station names found in the archive"""
+
+        with self._lock:
+            self.index.setdefault(url, {})[archive_name] = sorted(station_names)
+
+    def save(self):
+        """Write the index to its JSON file (if the index has a path)"""
+
+        import json
+        import os
+
+        if self.path is None:
+            return
+        with self._lock:
+            content = json.dumps(self.index, ensure_ascii=False, indent=1).encode('utf-8')
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        write_atomically(self.path, content)
+
+
+class ListingIndex:
+    """
+    Index of the IMGW directory listings: {url of the IMGW directory: {'fetched':
+    time of the download, 'archives': [{'name': ..., 'modified': ..., 'size':
+    ...}]}}. Listings younger than 'ttl' seconds are served from the index, so
+    repeated downloads do not request and parse the HTML listings again. If
+    'path' is given, the index is kept in a JSON file; otherwise only in the
+    given dictionary (e.g. one shared by the whole process).
+
+    Keyword arguments:
+        path -- path to the JSON file with the index (default None)
+        ttl -- maximum age of the listings in seconds (default 3600)
+        listings -- dictionary in which the listings are kept if 'path' is None. If
+    None, a new dictionary is used (default None)
+    """
+
+    def __init__(self, path=None, ttl=3600, listings=None):
+        import json
+        import threading
+
+        if not isinstance(ttl, (int, float)) or ttl < 0:
+            raise ValueError("Invalid 'ttl' input. Use a non-negative number of seconds.")
+
+        self.path = None if path is None else str(path)
+        self.ttl = ttl
+        self.listings = {} if listings is None else listings
+        self._lock = threading.Lock()
+        if self.path is not None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.listings.update(json.load(f))
+            except (FileNotFoundError, ValueError):
+                pass
+
+    def get(self, url):
+        """Return the listing of the url or None if it is not in the index or is too old"""
+
+        import time
+
+        with self._lock:
+            entry = self.listings.get(url)
+        if entry is None or time.time() - entry['fetched'] > self.ttl:
+            return None
+        return [dict(archive) for archive in entry['archives']]
+
+    def put(self, url, listing):
+        """Save the listing of the url (and write the index to its JSON file)"""
+
+        import json
+        import os
+        import time
+
+        with self._lock:
+            self.listings[url] = {'fetched': time.time(), 'archives': listing}
+            if self.path is not None:
+                content = json.dumps(self.listings, ensure_ascii=False).encode('utf-8')
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                write_atomically(self.path, content)
+
+
+class ResumableDownloads:
+    """
+    Checkpointed downloads of the .zip archives from the IMGW database, for long
+    bulk downloads. Every archive is downloaded to a '.part' file in
+    'download_dir' and, once complete and verified (its size and the checksums
+    of its members), it is recorded in 'checkpoint.json'. A rerun reads the
+    recorded archives from disk without any requests and resumes partial
+    archives with HTTP Range requests (servers which do not support ranges send
+    the whole archive again). The archives are kept until 'clear' is called.
+
+    Keyword arguments:
+        download_dir -- directory for the downloaded archives and the checkpoint
+        chunk_size -- number of bytes written to disk at once (default 1 MiB)
+    """
+
+    def __init__(
+            self, download_dir, chunk_size=1024 ** 2
+    ):
+        import os
+        import threading
+
+        self.cache_dir = str(download_dir)  # the listing and station indexes are kept there too
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def path(self, url):
+        """Return the path of the archive from the given URL"""
+
+        import hashlib
+        import os
+
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.zip')
+
+    def read_checkpoint(self):
+        """Return the checkpoint: {url: {'size': ..., 'sha256': ...}} of the completed archives"""
+
+        import json
+        import os
+
+        try:
+            with open(os.path.join(self.cache_dir, 'checkpoint.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def record(self, url, size, sha256):
+        """Record the archive from the given URL as completed"""
+
+        import json
+        import os
+
+        with self._lock:
+            checkpoint = self.read_checkpoint()
+            checkpoint[url] = {'size': size, 'sha256': sha256}
+            write_atomically(
+                os.path.join(self.cache_dir, 'checkpoint.json'), json.dumps(checkpoint, indent=1).encode('utf-8')
+            )
+
+    def is_complete(self, url):
+        """Return True if the archive from the given URL was downloaded and verified"""
+
+        import os
+
+        entry = self.read_checkpoint().get(url)
+        path = self.path(url)
+        return entry is not None and os.path.isfile(path) and os.path.getsize(path) == entry['size']
+
+    def fetch(self, session, url, part_path):
+        """
+        Download the archive to 'part_path', continuing from the end of the file if
+        it exists. Return the expected size of the archive (None if unknown).
+        """
+
+        import os
+        import re
+
+        offset = os.path.getsize(part_path) if os.path.isfile(part_path) else 0
+        headers = {'Range': 'bytes={}-'.format(offset)} if offset else {}
+
+        with session.get(url, headers=headers, stream=True) as r:
+            if r.status_code == 416:  # the part is already complete
+                return None
+            r.raise_for_status()
+
+            if r.status_code == 206:
+                mode = 'ab'
+                content_range = re.match(r'bytes (\d+)-\d+/(\d+)', r.headers.get('Content-Range', ''))
+                if content_range is None or int(content_range.group(1)) != offset:
+                    raise ValueError("Invalid 'Content-Range' in the response from {}.".format(url))
+                size = int(content_range.group(2))
+            else:
+                mode = 'wb'
+                size = int(r.headers['Content-Length']) if 'Content-Length' in r.headers else None
+
+            with open(part_path, mode) as f:
+                for chunk in r.iter_content(self.chunk_size):
+                    f.write(chunk)
+        return size
+
+    def get(self, session, url):
+        """
+        Return the content of the archive from the given URL: read from disk if it
+        was completed before, or downloaded (resumed), verified and recorded.
+
+        Keyword arguments:
+            session -- requests.Session used for the request
+            url -- url of the .zip archive
+        """
+
+        import hashlib
+        import zipfile
+        import os
+
+        path = self.path(url)
+        if self.is_complete(url):
+            with open(path, 'rb') as f:
+                return f.read()
+
+        part_path = path + '.part'
+        for attempt in range(2):
+            size = self.fetch(session, url, part_path)
+            with open(part_path, 'rb') as f:
+                content = f.read()
+
+            try:
+                if size is not None and len(content) != size:
+                    raise zipfile.BadZipFile("Incomplete archive.")
+                with zipfile.ZipFile(part_path) as archive:
+                    if archive.testzip() is not None:
+                        raise zipfile.BadZipFile("Corrupted member.")
+            except zipfile.BadZipFile:
+                os.remove(part_path)  # start again from the beginning
+                continue
+
+            os.replace(part_path, path)
+            self.record(url, len(content), hashlib.sha256(content).hexdigest())
+            return content
+        raise zipfile.BadZipFile("The archive downloaded from {} is corrupted.".format(url))
+
+    def clear(self):
+        """Remove every downloaded archive and the checkpoint"""
+
+        import os
+
+        with self._lock:
+            for file in os.listdir(self.cache_dir):
+                if file.endswith('.zip') or file.endswith('.part') or file == 'checkpoint.json':
+                    os.remove(os.path.join(self.cache_dir, file))
@@ -0,0 +1,149 @@
+"""
+Registry of the IMGW stations (name, code, latitude, longitude and elevation).
+It is the only source of the stations' coordinates in cloupy.
+
+The shipped 'imgw_stations.csv' has no station codes (its 'code' column is
+empty), because the IMGW database does not publish them with the coordinates.
+On the first use only the lookups by name work; a lookup by code returns None
+until the code is added from the downloaded tables with 'add_codes' (e.g. by
+'cloupy.scraping.imgw.join_coordinates'). The codes added in this way are kept
+only in the process. A registry file with the codes filled in resolves the codes
+(and the per-station archives, see 'get_codes') without any download.
+
+StationRegistry(path=None)
+get_station_registry()
+"""
+
+# registry loaded once per process (see 'get_station_registry')
+STATION_REGISTRY = None
+
+
+def get_station_registry():
+    """Return the registry of the IMGW stations, loaded once per process"""
+
+    global STATION_REGISTRY
+
+    if STATION_REGISTRY is None:
+        STATION_REGISTRY = StationRegistry()
+    return STATION_REGISTRY
+
+
+class StationRegistry:
+    """
+    Registry of the IMGW stations read from 'imgw_stations.csv' (one row per
+    station: name, code, lat, lon, elv). The coordinates are kept in NumPy arrays
+    with dictionaries from the station names and codes to the rows, so a single
+    station is found in O(1) and many stations at once with one vectorized
+    lookup. The IMGW database does not publish the station codes with the
+    coordinates, so the codes are filled in from the downloaded tables (see
+    'add_codes').
+
+    Keyword arguments:
+        path -- path to the CSV file with the stations. If None, use the file
+    shipped with cloupy (default None)
+    """
+
+    def __init__(self, path=None):
+        import pandas as pd
+        import threading
+
+        if path is None:
+            path = str(__file__).replace('imgw_stations.py', 'imgw_stations.csv')
+
+        stations = pd.read_csv(path, encoding='utf-8', dtype={'name': str, 'code': 'Int64'})
+        stations = stations.drop_duplicates('name')
+
+        self.names = stations['name'].tolist()
+        self.coordinates = stations[['lat', 'lon', 'elv']].to_numpy(dtype='float64')
+        self.name_rows = {name: row for row, name in enumerate(self.names)}
+        self.code_rows = {
+            int(code): row for row, code in enumerate(stations['code']) if not pd.isnull(code)
+        }
+        self._lock = threading.Lock()
+
+    def get_row(self, station):
+        """Return the row of the station (name or code) or None if it is unknown"""
+
+        if isinstance(station, str):
+            return self.name_rows.get(station.upper())
+        return self.code_rows.get(int(station))
+
+    def get(self, station):
+        """
+        Return {'name': ..., 'lat': ..., 'lon': ..., 'elv': ...} for the station or
+        None if the station is not in the registry.
+
+        Keyword arguments:
+            station -- name (str) or code (int) of the station
+        """
+
+        row = self.get_row(station)
+        if row is None:
+            return None
+        lat, lon, elv = self.coordinates[row]
+        return {'name': self.names[row], 'lat': lat, 'lon': lon, 'elv': elv}
+
+    def get_codes(self, station_name):
+        """
+        Return the set of the known codes (int) of the station with the given name
+        (empty if the station or its codes are unknown).
+
+        Keyword arguments:
+            station_name -- name of the station
+        """
+
+        row = self.name_rows.get(station_name.upper())
+        if row is None:
+            return set()
+        with self._lock:
+            return {code for code, code_row in self.code_rows.items() if code_row == row}
+
+    def lookup(self, stations):
+        """
+        Return pd.DataFrame with the 'lat', 'lon' and 'elv' columns for every
+        element of 'stations' (NaN for unknown stations). Every distinct station is
+        looked up once, so categorical series are as fast as their categories.
+
+        Keyword arguments:
+            stations -- pd.Series (or list) with names or codes of the stations
+        """
+
+        import pandas as pd
+        import numpy as np
+
+        stations = pd.Series(stations)
+        index = stations.index
+        if isinstance(stations.dtype, pd.CategoricalDtype):
+            codes = stations.cat.codes.to_numpy()
+            uniques = stations.cat.categories
+        else:
+            codes, uniques = pd.factorize(stations)
+
+        unique_rows = [self.get_row(station) for station in uniques]
+        unique_rows = np.array([-1 if row is None else row for row in unique_rows], dtype='int64')
+        rows = np.where(codes >= 0, unique_rows[np.maximum(codes, 0)] if len(unique_rows) else -1, -1)
+
+        coordinates = np.full((len(rows), 3), np.nan)
+        known = rows >= 0
+        coordinates[known] = self.coordinates[rows[known]]
+        return pd.DataFrame(coordinates, columns=['lat', 'lon', 'elv'], index=index)
+
+    def add_codes(self, codes, names):
+        """
+        Add the station codes for the stations in the registry, e.g. from the 'Kod
+        stacji' and 'Nazwa stacji' columns of the downloaded IMGW table.
+
+        Keyword arguments:
+            codes -- station codes
+            names -- station names (in the order of 'codes')
+        """
+
+        import pandas as pd
+
+        pairs = pd.DataFrame({'code': pd.Series(codes).to_numpy(), 'name': pd.Series(names).to_numpy()})
+        pairs = pairs.dropna().drop_duplicates()
+        with self._lock:
+            for code, name in zip(pairs['code'], pairs['name']):
+                row = self.name_rows.get(str(name).upper())
+                if row is not None:
+                    self.code_rows[int(code)] = row
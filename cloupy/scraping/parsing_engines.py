@@ -0,0 +1,39 @@
+"""
+Optional engines for parsing the downloaded data tables (IMGW and WMO).
+
+get_parsing_engine(engine='pandas')
+"""
+
+# engines which can parse the tables ('auto' chooses 'pyarrow' if it is installed)
+PARSING_ENGINES = ['pandas', 'pyarrow', 'polars', 'auto']
+
+# modules which have to be installed for the engines
+ENGINE_REQUIREMENTS = {'pandas': [], 'pyarrow': ['pyarrow'], 'polars': ['polars', 'pyarrow'], 'auto': ['pyarrow']}
+
+
+def get_parsing_engine(engine='pandas'):
+    """
+    Return the engine which will parse the tables: 'engine' if the modules which it
+    needs are installed, otherwise 'pandas'. The 'pyarrow' and 'polars' engines
+    read the CSV files with multithreaded readers (polars tables are converted to
+    pandas with pyarrow, so it is required as well).
+
+    Keyword arguments:
+        engine -- 'pandas', 'pyarrow', 'polars' or 'auto' ('pyarrow' if it is
+    installed, otherwise 'pandas') (default 'pandas')
+    """
+
+    import importlib
+
+    if engine not in PARSING_ENGINES:
+        raise ValueError("Invalid 'engine' input. Available inputs: {}.".format(', '.join(PARSING_ENGINES)))
+
+    try:
+        for module in ENGINE_REQUIREMENTS[engine]:
+            importlib.import_module(module)
+    except ImportError as error:
+        if engine != 'auto':
+            print("WARNING: '{}' is not installed, so the data will be parsed with pandas.".format(error.name))
+        return 'pandas'
+
+    return 'pyarrow' if engine == 'auto' else engine
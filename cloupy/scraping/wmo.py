@@ -1,11 +1,16 @@
+# default maximum number of concurrent requests to a single host (see 'download_wmo_climatological_data')
+MAX_REQUESTS_PER_HOST = 4
+
+# number of the columns in the .dat tables (the year and the 12 monthly values)
+TABLE_COLUMNS_NUMBER = 13
+
+
 def get_wmo_stations_info():
     """Return pandas.DataFrame with WMO stations information (WMO ids, coordinates, etc.)"""
 
-    import pandas as pd
+    from cloupy.scraping.wmo_stations import get_station_catalog
 
-    wmo_ids_path = str(__file__).replace('wmo.py', 'wmo_ids_and_coords.csv')
-    ids_coords = pd.read_csv(wmo_ids_path, dtype={3: 'object'}, sep=';', index_col=0)
-    return ids_coords
+    return get_station_catalog().frame()
 
 
 def get_wmoid_or_coord(
@@ -33,27 +38,24 @@ def get_wmoid_or_coord(
     pass WMO id
     """
 
-    import pandas as pd
+    from cloupy.scraping.wmo_stations import get_station_catalog
 
     if not isinstance(station_name, str) and not isinstance(station_name, int):
         raise ValueError(
             f"The 'station_name' argument must be a single string or a single int (given type: {type(station_name)})"
         )
 
-    wmo_ids_path = str(__file__).replace('wmo.py', 'wmo_ids_and_coords.csv')
     station_name = str(station_name)
     station_name = station_name.upper()
 
-    ids_coords = pd.read_csv(wmo_ids_path, dtype={3: 'object'}, sep=';', index_col=0)
+    catalog = get_station_catalog()
     if station_name.startswith('COU'):
-        data = ids_coords[ids_coords['country'].str.contains(station_name.replace('COU', ''))]
+        rows = catalog.find_rows(country=station_name.replace('COU', ''), contains=True)
     elif station_name_is_wmo_id:
-        data = ids_coords[ids_coords['wmo_id'] == station_name]
+        rows = catalog.find_rows(wmo_id=station_name)
     else:
-        if contains_station_name:
-            data = ids_coords[ids_coords['station'].str.contains(station_name)]
-        else:
-            data = ids_coords[ids_coords['station'] == station_name]
+        rows = catalog.find_rows(station_name=station_name, contains=contains_station_name)
+    data = catalog.frame(rows)
 
     if len(data.index) == 0:
         raise ValueError(
@@ -95,39 +97,162 @@ def get_wmoid_or_coord(
     return dict_to_return
 
 
-def decode_downloaded_data(data_table):
+def decode_downloaded_data(data_table, engine='pandas'):
     """
-    Decode the data from .dat file from the WMO website. Return more
-    computer-friendly data for further adaptation.
+    Decode the data from .dat file from the WMO website. Return np.ndarray
+    (float64) with a row for every year: the year and the 12 monthly values.
+    Missing values (-90 or less in the file) are NaN.
+
+    Keyword arguments:
+        data_table -- text of the .dat file
+        engine -- 'pandas' (the values are parsed with NumPy), 'pyarrow' or
+    'polars' (the rows are read with the multithreaded Arrow CSV reader) or
+    'auto'. The result is the same for every engine (default 'pandas')
     """
 
+    import numpy as np
+    from cloupy.scraping.parsing_engines import get_parsing_engine
+
     table = data_table.split('#')
 
     data = table[-1]
     row_to_del = data.split('\n')[0]
     data = data.replace(row_to_del, "")
-    data = data.split('\n')
 
-    decoded = []
-    for row in data:
-        dec_row = row.split(' ')
-        while '' in dec_row:
-            dec_row.remove('')
-        decoded.append(dec_row)
+    decoded = None
+    if get_parsing_engine(engine) != 'pandas':
+        decoded = read_table_with_pyarrow(data)
+    if decoded is None:
+        decoded = read_table_with_numpy(data)
+
+    values = decoded[:, 1:]
+    values[values <= -90] = np.nan
+    return decoded
+
 
-    while [] in decoded:
-        decoded.remove([])
+def read_table_with_numpy(data):
+    """
+    Parse the rows of the .dat table (values separated by whitespace) into
+    np.ndarray (see 'decode_downloaded_data'). If every row has the same number of
+    values, all values are parsed in one pass; otherwise the rows are parsed one
+    by one (the missing values at the ends of the short rows are NaN). Raise
+    ValueError if a row has more than TABLE_COLUMNS_NUMBER values.
+    """
+
+    import numpy as np
+
+    rows = [row.split() for row in data.split('\n') if row.strip()]
+    if not rows:
+        return np.empty((0, TABLE_COLUMNS_NUMBER))
+
+    lengths = [len(row) for row in rows]
+    if max(lengths) > TABLE_COLUMNS_NUMBER:
+        raise ValueError(
+            "Invalid .dat table: a row has {} values instead of at most {}.".format(max(lengths), TABLE_COLUMNS_NUMBER)
+        )
+    if min(lengths) == max(lengths):
+        return np.array(rows, dtype='float64')
 
+    decoded = np.full((len(rows), max(lengths)), np.nan)
+    for i, row in enumerate(rows):
+        decoded[i, :len(row)] = np.array(row, dtype='float64')
     return decoded
 
 
-def download_data(url):
-    """Download and return the data from the given URL of the WMO website"""
+def read_table_with_pyarrow(data):
+    """
+    Read the rows of the .dat table (values separated by spaces) with the Arrow CSV
+    reader and return them as np.ndarray (see 'decode_downloaded_data'). Return
+    None if the rows have different lengths or too many values, so the table has
+    to be parsed (or rejected) by 'read_table_with_numpy'.
+    """
+
+    import io
+    import re
+    import numpy as np
+    import pyarrow as pa
+    from pyarrow import csv
+
+    data = re.sub(' +', ' ', data)
+    data = re.sub('(?m)^ | $', '', data)
+    data = re.sub('\n+', '\n', data).strip('\n')
+    if not data:
+        return np.empty((0, TABLE_COLUMNS_NUMBER))
+
+    columns_number = len(data.split('\n', 1)[0].split(' '))
+    if columns_number > TABLE_COLUMNS_NUMBER:
+        return None
+    names = [str(column) for column in range(columns_number)]
+    try:
+        table = csv.read_csv(
+            io.BytesIO(data.encode('utf-8')),
+            read_options=csv.ReadOptions(column_names=names),
+            parse_options=csv.ParseOptions(delimiter=' ', quote_char=False),
+            convert_options=csv.ConvertOptions(column_types={name: pa.float64() for name in names})
+        )
+    except pa.ArrowInvalid:
+        return None
+
+    return np.column_stack([column.to_numpy() for column in table.columns]).astype('float64')
+
+
+class HostLimiter:
+    """
+    Limit the number of concurrent requests to every host. Calling the object with
+    a URL returns the semaphore of the URL's host, which has to be held (e.g.
+    with the 'with' statement) while the request is sent.
+
+    Keyword arguments:
+        max_requests_per_host -- maximum number of concurrent requests to a single
+    host (default MAX_REQUESTS_PER_HOST)
+    """
+
+    def __init__(self, max_requests_per_host=MAX_REQUESTS_PER_HOST):
+        import threading
+
+        if not isinstance(max_requests_per_host, int) or max_requests_per_host < 1:
+            raise ValueError("Invalid 'max_requests_per_host' input. Use a positive int.")
+
+        self.max_requests_per_host = max_requests_per_host
+        self.semaphores = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, url):
+        import threading
+        from urllib.parse import urlsplit
+
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self.semaphores:
+                self.semaphores[host] = threading.BoundedSemaphore(self.max_requests_per_host)
+            return self.semaphores[host]
+
+
+def download_data(url, engine='pandas', session=None, host_limiter=None):
+    """
+    Download and return the data from the given URL of the WMO website.
+
+    Keyword arguments:
+        url -- URL of the page with the link to the data file
+        engine -- engine which decodes the data (see 'decode_downloaded_data')
+    (default 'pandas')
+        session -- requests.Session shared by the downloading threads. If None,
+    every request opens a new connection (default None)
+        host_limiter -- HostLimiter shared by the downloading threads. If None, the
+    requests are not limited (default None)
+    """
 
     from bs4 import BeautifulSoup as bs
+    import contextlib
     import requests
 
-    r = requests.get(url)
+    requester = requests if session is None else session
+
+    def get(url_):
+        with contextlib.nullcontext() if host_limiter is None else host_limiter(url_):
+            return requester.get(url_)
+
+    r = get(url)
     soup = bs(r.content, features='html.parser')
 
     data_href = None
@@ -144,13 +269,13 @@ def download_data(url):
         )
 
     full_url_for_data = 'http://climexp.knmi.nl/' + data_href
-    r = requests.get(full_url_for_data)
+    r = get(full_url_for_data)
     soup = bs(r.content, features='html.parser')
 
     table = soup.get_text()
-    downloaded_data = decode_downloaded_data(table)
+    downloaded_data = decode_downloaded_data(table, engine)
 
-    if not downloaded_data:
+    if len(downloaded_data) == 0:
         raise FileNotFoundError(
             f"""
             No data file was found for {url}
@@ -161,125 +286,145 @@ def download_data(url):
 
 
 def concatenate_dfs(dfs):
-    """Concatenate given dataframes into one consistent dataframe"""
+    """
+    Concatenate given dataframes into one consistent dataframe. Every dataframe is
+    a list with the header ['year', 'month', element] followed by the rows [year,
+    month, value] or by the whole table returned by 'transpose_table' ([None, None,
+    None] instead of the rows if there is no data for the element). The values of
+    every element are aligned on the (year, month) index by reindexing, so missing
+    years or months are NaN. Values of -90 or less are NaN as well.
+    """
 
+    import numpy as np
     import pandas as pd
 
-    min_year = 3000
-    max_year = 0
+    series = {}
     for df in dfs:
-        if df[1][0] is not None:
-            if int(df[1][0]) < min_year:
-                min_year = int(df[1][0])
-        if df[-1][0] is not None:
-            if int(df[-1][0]) > max_year:
-                max_year = int(df[-1][0])
-
-    years = []
-    months = []
-    for year in range(min_year, max_year + 1):
-        for month in range(1, 13):
-            years.append(str(year))
-            months.append(month)
-
-    concatenated_df = pd.DataFrame({
-        'year': years,
-        'month': months,
-    })
-
-    for df in dfs:
-
-        if df[1] == [None, None, None]:
-            values_to_add = [None] * len(concatenated_df['month'])
-            concatenated_df[df[0][2]] = values_to_add
+        element = df[0][2]
+        if len(df) == 2 and isinstance(df[1], np.ndarray):
+            table = df[1]
+        elif df[1] == [None, None, None]:
+            series[element] = None
+            continue
         else:
-            values_to_add = []
-
-            index_to_start = None
-            for i, year in enumerate(years):
-                if year == df[1][0]:
-                    index_to_start = i
-                    break
-                else:
-                    values_to_add.append(None)
-
-            if index_to_start is None:
-                raise ValueError("'index_to_start' value is None.")
+            table = np.array(df[1:], dtype='float64')
 
-            for i, row in enumerate(df[1:]):
-                if row[0] == years[index_to_start + i]:
-                    if row[1] == months[index_to_start + i]:
-                        if float(row[2]) > -90:
-                            values_to_add.append(row[2])
-                        else:
-                            values_to_add.append(None)
-                    else:
-                        values_to_add.append(None)
-                else:
-                    values_to_add.append(None)
+        index = pd.MultiIndex.from_arrays([table[:, 0].astype('int64'), table[:, 1].astype('int64')])
+        values = pd.Series(np.where(table[:, 2] > -90, table[:, 2], np.nan), index=index)
+        series[element] = values[~index.duplicated()]
 
-            while len(values_to_add) != len(years):
-                values_to_add.append(None)
-
-            concatenated_df[df[0][2]] = values_to_add
+    element_years = [values.index.get_level_values(0) for values in series.values() if values is not None]
+    element_years = [years for years in element_years if len(years)]
+    years = []
+    if element_years:
+        years = range(min(years.min() for years in element_years), max(years.max() for years in element_years) + 1)
+    skeleton = pd.MultiIndex.from_product([years, range(1, 13)], names=['year', 'month'])
 
-    for column in concatenated_df.columns[:2]:
-        concatenated_df = concatenated_df.astype({column: int})
-    for column in concatenated_df.columns[2:]:
-        concatenated_df = concatenated_df.astype({column: float})
+    columns = {
+        'year': skeleton.get_level_values('year').astype('int64'),
+        'month': skeleton.get_level_values('month').astype('int64')
+    }
+    for element, values in series.items():
+        if values is None:
+            columns[element] = np.full(len(skeleton), np.nan)
+        else:
+            columns[element] = values.reindex(skeleton).to_numpy(dtype='float64')
 
-    return concatenated_df
+    return pd.DataFrame(columns)
 
 
 def transpose_table(table):
-    """Transpose the table for further adaptation"""
+    """
+    Transpose the table returned by 'decode_downloaded_data' for further
+    adaptation. Return np.ndarray with a row [year, month, value] for every
+    monthly value of the table, in the order of the years and months.
+    """
 
-    new_table = []
-    for row in table:
-        for i, value in enumerate(row):
-            if i != 0:
-                new_row = [row[0], i, value]
-                new_table.append(new_row)
+    import numpy as np
 
-    return new_table
+    table = np.asarray(table, dtype='float64')
+    if table.ndim != 2 or table.shape[1] < 2:
+        return np.empty((0, 3))
+
+    months_number = table.shape[1] - 1
+    return np.column_stack([
+        np.repeat(table[:, 0], months_number),
+        np.tile(np.arange(1, months_number + 1, dtype='float64'), len(table)),
+        table[:, 1:].ravel()
+    ])
 
 
 def search_for_the_nearest_station(
-        lon, lat, degrees_range=0.5
+        lon, lat, degrees_range=0.5, k=None, radius_km=None
 ):
     """
-    Return the nearest stations from the WMO database for the given coordinates.
+    Return the nearest stations from the WMO database for the given coordinates,
+    ordered by the great-circle distance. If 'k' or 'radius_km' is given, the
+    stations are found with a spatial index instead of 'degrees_range' and the
+    distance is returned in the 'distance_km' column.
 
     Keyword arguments:
         lon -- the longitude for which station will be searched
         lat -- the latitude for which station will be searched
         degrees_range -- acceptable range in degrees in all directions (default 0.5)
+        k -- number of the nearest stations to return (default None)
+        radius_km -- return only the stations within the given distance in km
+    (default None)
     """
 
-    import pandas as pd
+    import numpy as np
+    from cloupy.scraping.wmo_stations import get_station_catalog
+
+    catalog = get_station_catalog()
+    if k is not None or radius_km is not None:
+        _, rows, distances = catalog.query(lat, lon, k, radius_km)
+        df = catalog.frame(rows)
+        df['distance_km'] = distances
+        return df
 
-    wmo_ids_path = str(__file__).replace('wmo.py', 'wmo_ids_and_coords.csv')
+    lats, lons = catalog.coordinates[:, 0], catalog.coordinates[:, 1]
+    mask = (
+        (lats < lat + degrees_range) & (lats > lat - degrees_range) & (lats != lat) &
+        (lons < lon + degrees_range) & (lons > lon - degrees_range) & (lons != lon)
+    )
+    rows = np.flatnonzero(mask)
+    distances = catalog.get_distances(lat, lon, rows)
+    return catalog.frame(rows[np.argsort(distances, kind='stable')])
 
-    ids_coords = pd.read_csv(wmo_ids_path, dtype={3: 'object'}, sep=';', index_col=0)
 
-    ids_coords = ids_coords[
-        (ids_coords['lat'] < lat + degrees_range) &
-        (ids_coords['lat'] > lat - degrees_range) &
-        (ids_coords['lat'] != lat)
-        ]
+def search_for_the_nearest_stations(
+        lons, lats, k=1, radius_km=None
+):
+    """
+    Return the nearest stations from the WMO database for many points at once (one
+    vectorized query). The returned pandas.DataFrame has a row for every found
+    station of every point: the 'point' column with the position of the point in
+    'lons' and 'lats', the station information and the great-circle distance in
+    the 'distance_km' column. The rows are ordered by the point and the distance.
+
+    Keyword arguments:
+        lons -- the longitudes of the points
+        lats -- the latitudes of the points (in the order of 'lons')
+        k -- number of the nearest stations for every point. If None, return all
+    stations within 'radius_km' (default 1)
+        radius_km -- return only the stations within the given distance in km. If
+    None, do not limit the distance (default None)
+    """
 
-    ids_coords = ids_coords[
-        (ids_coords['lon'] < lon + degrees_range) &
-        (ids_coords['lon'] > lon - degrees_range) &
-        (ids_coords['lon'] != lon)
-        ]
+    from cloupy.scraping.wmo_stations import get_station_catalog
 
-    return ids_coords
+    catalog = get_station_catalog()
+    points, rows, distances = catalog.query(lats, lons, k, radius_km)
+    df = catalog.frame(rows)
+    df.insert(0, 'point', points)
+    df['distance_km'] = distances
+    return df
 
 
 def download_wmo_climatological_data(
         station_name, elements_to_scrape, nearby_stations=False,
-        degrees_range_for_nearby_stations=0.5, return_coordinates=False
+        degrees_range_for_nearby_stations=0.5, return_coordinates=False,
+        engine='pandas', max_workers=1, max_requests_per_host=MAX_REQUESTS_PER_HOST
 ):
     """
     Download climatological data for specified station/stations from the WMO website.
@@ -302,9 +447,29 @@ def download_wmo_climatological_data(
     directions if nearby stations have to be searched (default 0.5)
         return_coordinates -- if set to True, the function will add columns with
     latitude, longitude and elevation for the specified station/stations (default False)
+        engine -- engine which decodes the downloaded data: 'pandas', 'pyarrow',
+    'polars' or 'auto' (see 'decode_downloaded_data'). If the engine is not
+    installed, the data is decoded in Python (default 'pandas')
+        max_workers -- maximum number of threads which download the data of the
+    stations and elements concurrently. The threads share one pool of keep-alive
+    connections and the returned DataFrame is the same for any number of threads
+    (default 1)
+        max_requests_per_host -- maximum number of concurrent requests to a single
+    host (default 4)
     """
 
     import pandas as pd
+    from concurrent.futures import ThreadPoolExecutor
+    from cloupy.scraping.imgw import create_session
+    from cloupy.scraping.parsing_engines import get_parsing_engine
+    from cloupy.scraping.wmo_stations import get_station_catalog
+
+    if not isinstance(max_workers, int) or max_workers < 1:
+        raise ValueError("Invalid 'max_workers' input. Use a positive int.")
+
+    engine = get_parsing_engine(engine)
+    catalog = get_station_catalog()
+    host_limiter = HostLimiter(max_requests_per_host)
 
     if isinstance(elements_to_scrape, str):
         elements_to_scrape = [elements_to_scrape]
@@ -320,119 +485,119 @@ def download_wmo_climatological_data(
     wmo_ids = get_wmoid_or_coord(station_name, 'wmo_id')
     wmo_ids_list = [wmo_id for station, wmo_id in wmo_ids.items()]
 
-    full_df = pd.DataFrame()
+    session = create_session(max_workers)
+
+    def fetch(url_):
+        """Return the data downloaded from the URL or None if there is no data file"""
+        try:
+            return download_data(url_, engine, session, host_limiter)
+        except FileNotFoundError:
+            return None
+
+    frames = []
     print('Data download started. It may take a while.')
-    for station, wmo_id in wmo_ids.items():
-        data = []
-        for element in elements_to_scrape:
-            url = elements_with_urls[element].format(wmo_id)
-
-            try:
-                downloaded_data = download_data(url)
-            except FileNotFoundError:
-                if 'cou' in station_name:
-                    continue
-                elif not nearby_stations:
-                    print(
-                        f"""
-                        WARNING: No data for '{element}' in '{station}' (WMO ID: {wmo_id}).
-                        If you want to search for data in the nearest stations, set 'nearby_stations'
-                        argument to True.
-                        """)
-                    continue
-                else:
-                    lat = get_wmoid_or_coord(wmo_id, 'lat', station_name_is_wmo_id=True)[station]
-                    lon = get_wmoid_or_coord(wmo_id, 'lon', station_name_is_wmo_id=True)[station]
-                    nearest_stations = search_for_the_nearest_station(
-                        lon, lat, degrees_range=degrees_range_for_nearby_stations
-                    )
-                    if nearest_stations.empty:
+    with session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # every (station, element) is requested up front, the results are used in the order of the stations below
+        futures = {
+            (wmo_id, element): executor.submit(fetch, elements_with_urls[element].format(wmo_id))
+            for station, wmo_id in wmo_ids.items() for element in elements_to_scrape
+        }
+
+        for station, wmo_id in wmo_ids.items():
+            data = []
+            for element in elements_to_scrape:
+                downloaded_data = futures.pop((wmo_id, element)).result()
+
+                if downloaded_data is None:
+                    if 'cou' in station_name:
+                        continue
+                    elif not nearby_stations:
                         print(
                             f"""
                             WARNING: No data for '{element}' in '{station}' (WMO ID: {wmo_id}).
-                            No nearby station found either.
-                            """
-                        )
+                            If you want to search for data in the nearest stations, set 'nearby_stations'
+                            argument to True.
+                            """)
                         continue
-
-                    data_from_near_stations = {}
-                    for near_wmo_id in nearest_stations['wmo_id']:
-                        if near_wmo_id in wmo_ids_list:
+                    else:
+                        station_info = catalog.get(wmo_id)
+                        lat, lon = station_info['lat'], station_info['lon']
+                        nearest_stations = search_for_the_nearest_station(
+                            lon, lat, degrees_range=degrees_range_for_nearby_stations
+                        )
+                        if nearest_stations.empty:
+                            print(
+                                f"""
+                                WARNING: No data for '{element}' in '{station}' (WMO ID: {wmo_id}).
+                                No nearby station found either.
+                                """
+                            )
                             continue
 
-                        url = elements_with_urls[element].format(near_wmo_id)
-                        try:
-                            data_for_station = download_data(url)
-                        except FileNotFoundError:
-                            data_from_near_stations[near_wmo_id] = None
+                        near_wmo_ids = [
+                            near_wmo_id for near_wmo_id in nearest_stations['wmo_id'] if near_wmo_id not in wmo_ids_list
+                        ]
+                        near_urls = [elements_with_urls[element].format(near_wmo_id) for near_wmo_id in near_wmo_ids]
+                        data_from_near_stations = dict(zip(near_wmo_ids, executor.map(fetch, near_urls)))
+
+                        hm_elements = 0
+                        more_elements_in = None
+                        for near_wmo_id, data_for_station in data_from_near_stations.items():
+                            try:
+                                if len(data_for_station) > hm_elements:
+                                    hm_elements = len(data_for_station)
+                                    more_elements_in = near_wmo_id
+                            except TypeError:
+                                continue
+
+                        if more_elements_in is None:
+                            downloaded_data = None
                         else:
-                            data_from_near_stations[near_wmo_id] = data_for_station
-
-                    hm_elements = 0
-                    more_elements_in = None
-                    for near_wmo_id, data_for_station in data_from_near_stations.items():
-                        try:
-                            if len(data_for_station) > hm_elements:
-                                hm_elements = len(data_for_station)
-                                more_elements_in = near_wmo_id
-                        except TypeError:
-                            continue
-
-                    if more_elements_in is None:
-                        downloaded_data = None
-                    else:
-                        downloaded_data = data_from_near_stations[more_elements_in]
-                        print(
-                            f"""
-                            Warning: no '{element}' data was found for the chosen station ({station}), so the data was 
-                            taken from the nearest station (WMO ID: {more_elements_in}). Latitude and longitude differences 
-                            were below 0.5 degrees (default) or as in the 'degrees_range_for_nearby_stations' argument (if 
-                            specified). If you do not want to download data from the nearest station, change 'nearby_stations' 
-                            argument value to False. If you would like to change acceptable latitude and longitude differences, 
-                            you can do it by passing float/int to 'degrees_range_for_nearby_stations' argument.
-                            """)
-            else:
-                pass
-
-            if downloaded_data is not None:
-                downloaded_data = transpose_table(downloaded_data)
-                downloaded_data.insert(0, ['year', 'month', element])
-            else:
-                downloaded_data = [[None, None, None]]
-                downloaded_data.insert(0, ['year', 'month', element])
-
-            data.append(downloaded_data)
+                            downloaded_data = data_from_near_stations[more_elements_in]
+                            print(
+                                f"""
+                                Warning: no '{element}' data was found for the chosen station ({station}), so the data was 
+                                taken from the nearest station (WMO ID: {more_elements_in}). Latitude and longitude differences 
+                                were below 0.5 degrees (default) or as in the 'degrees_range_for_nearby_stations' argument (if 
+                                specified). If you do not want to download data from the nearest station, change 'nearby_stations' 
+                                argument value to False. If you would like to change acceptable latitude and longitude differences, 
+                                you can do it by passing float/int to 'degrees_range_for_nearby_stations' argument.
+                                """)
+
+                if downloaded_data is not None:
+                    downloaded_data = [['year', 'month', element], transpose_table(downloaded_data)]
+                else:
+                    downloaded_data = [[None, None, None]]
+                    downloaded_data.insert(0, ['year', 'month', element])
 
-        concatenated_df = concatenate_dfs(data)
-        station_series = [station] * len(concatenated_df.index)
-        concatenated_df.insert(0, 'station', station_series)
+                data.append(downloaded_data)
 
-        if return_coordinates:
-            lat = get_wmoid_or_coord(wmo_id, 'lat', station_name_is_wmo_id=True)[station]
-            lon = get_wmoid_or_coord(wmo_id, 'lon', station_name_is_wmo_id=True)[station]
-            elv = get_wmoid_or_coord(wmo_id, 'elv', station_name_is_wmo_id=True)[station]
+            concatenated_df = concatenate_dfs(data)
+            station_series = [station] * len(concatenated_df.index)
+            concatenated_df.insert(0, 'station', station_series)
 
-            lat_series = [lat] * len(concatenated_df.index)
-            lon_series = [lon] * len(concatenated_df.index)
-            elv_series = [elv] * len(concatenated_df.index)
+            if return_coordinates:
+                station_info = catalog.get(wmo_id)
+                concatenated_df['lon'] = station_info['lon']
+                concatenated_df['lat'] = station_info['lat']
+                concatenated_df['elv'] = station_info['elv']
 
-            concatenated_df['lon'] = lon_series
-            concatenated_df['lat'] = lat_series
-            concatenated_df['elv'] = elv_series
+            frames.append(concatenated_df)
 
-        full_df = full_df.append(concatenated_df)
+    # a single concatenation at the end, appending station by station would copy the whole frame every time
+    full_df = pd.concat(frames) if frames else pd.DataFrame()
 
-        if 'cou' in station_name:
-            columns_order = elements_to_scrape
-            filtered_columns_order = ['station', 'year', 'month']
+    if 'cou' in station_name and frames:
+        columns_order = elements_to_scrape
+        filtered_columns_order = ['station', 'year', 'month']
 
-            for element in columns_order:
-                if element in list(full_df.columns):
-                    filtered_columns_order.append(element)
+        for element in columns_order:
+            if element in list(full_df.columns):
+                filtered_columns_order.append(element)
 
-            if return_coordinates:
-                filtered_columns_order += ['lon', 'lat', 'elv']
-            full_df = full_df[filtered_columns_order]
+        if return_coordinates:
+            filtered_columns_order += ['lon', 'lat', 'elv']
+        full_df = full_df[filtered_columns_order]
 
     print('Data downloaded.')
     return full_df
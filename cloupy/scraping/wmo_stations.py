@@ -0,0 +1,281 @@
+"""
+Catalog of the WMO stations (country, station name, WMO id, latitude, longitude
+and elevation).
+
+StationCatalog(path=None)
+get_station_catalog()
+get_unit_vectors(lats, lons)
+get_chord_length(distance_km)
+"""
+
+# catalog loaded once per process (see 'get_station_catalog')
+STATION_CATALOG = None
+
+# mean radius of the Earth in km, used for the great-circle distances
+EARTH_RADIUS_KM = 6371.0088
+
+
+def get_station_catalog():
+    """Return the catalog of the WMO stations, loaded once per process"""
+
+    global STATION_CATALOG
+
+    if STATION_CATALOG is None:
+        STATION_CATALOG = StationCatalog()
+    return STATION_CATALOG
+
+
+def get_unit_vectors(lats, lons):
+    """
+    Return the points given in degrees as 3D vectors on the unit sphere
+    (np.ndarray of shape (n, 3)). The straight-line (chord) distance between the
+    vectors grows with the great-circle distance between the points, so the
+    nearest vectors are the nearest points on the Earth.
+    """
+
+    import numpy as np
+
+    lats = np.radians(np.asarray(lats, dtype='float64').reshape(-1))
+    lons = np.radians(np.asarray(lons, dtype='float64').reshape(-1))
+    return np.column_stack([np.cos(lats) * np.cos(lons), np.cos(lats) * np.sin(lons), np.sin(lats)])
+
+
+def get_chord_length(distance_km):
+    """Return the chord length on the unit sphere for the great-circle distance in km"""
+
+    import numpy as np
+
+    return 2 * np.sin(min(distance_km / EARTH_RADIUS_KM, np.pi) / 2)
+
+
+class StationCatalog:
+    """
+    Catalog of the WMO stations read from 'wmo_ids_and_coords.csv'. The columns are
+    kept in NumPy arrays (the countries as categorical codes) with hash indexes
+    from the WMO ids, station names and countries to the rows, so a single
+    station is found in O(1) and many stations at once with one vectorized
+    lookup. Rows are always returned in the order of the file. Nearest stations
+    are found with a k-d tree on the stations' positions on the unit sphere (see
+    'query'), built on the first query.
+
+    Keyword arguments:
+        path -- path to the CSV file with the stations. If None, use the file
+    shipped with cloupy (default None)
+    """
+
+    def __init__(self, path=None):
+        import pandas as pd
+
+        if path is None:
+            path = str(__file__).replace('wmo_stations.py', 'wmo_ids_and_coords.csv')
+
+        stations = pd.read_csv(path, dtype={3: 'object'}, sep=';', index_col=0)
+
+        self.index = stations.index.to_numpy()
+        self.index_name = stations.index.name
+        self.string_dtype = stations['station'].dtype
+        country_codes, countries = pd.factorize(stations['country'])
+        self.country_codes = country_codes.astype('int16')
+        self.countries = countries.to_numpy(dtype=object)
+        self.stations = stations['station'].to_numpy(dtype=object)
+        self.wmo_ids = stations['wmo_id'].to_numpy(dtype=object)
+        self.coordinates = stations[['lat', 'lon', 'elv']].to_numpy(dtype='float64')
+
+        self.wmo_id_rows = {wmo_id: row for row, wmo_id in enumerate(self.wmo_ids)}
+        self.station_rows = self.group_rows(self.stations)
+        self.country_rows = self.group_rows(self.countries[self.country_codes])
+        self.tree = None
+
+    @staticmethod
+    def group_rows(values):
+        """Return a dictionary {value: list of the rows with the value}"""
+
+        groups = {}
+        for row, value in enumerate(values):
+            groups.setdefault(value, []).append(row)
+        return groups
+
+    def __len__(self):
+        return len(self.index)
+
+    def get_row(self, wmo_id):
+        """Return the row of the station with the WMO id or None if it is unknown"""
+
+        return self.wmo_id_rows.get(str(wmo_id))
+
+    def get(self, wmo_id):
+        """
+        Return {'country': ..., 'station': ..., 'wmo_id': ..., 'lat': ..., 'lon': ...,
+        'elv': ...} for the station or None if the WMO id is not in the catalog.
+
+        Keyword arguments:
+            wmo_id -- WMO id of the station (str or int)
+        """
+
+        row = self.get_row(wmo_id)
+        if row is None:
+            return None
+        lat, lon, elv = self.coordinates[row]
+        return {
+            'country': self.countries[self.country_codes[row]], 'station': self.stations[row],
+            'wmo_id': self.wmo_ids[row], 'lat': lat, 'lon': lon, 'elv': elv
+        }
+
+    def find_rows(self, station_name=None, wmo_id=None, country=None, contains=False):
+        """
+        Return the rows (np.ndarray) of the stations with the given name, WMO id or
+        country (only the first given argument is used).
+
+        Keyword arguments:
+            station_name -- name of the station (default None)
+            wmo_id -- WMO id of the station (default None)
+            country -- name of the country (default None)
+            contains -- match the station names or countries which contain the
+        given regular expression instead of the exact names (default False)
+        """
+
+        import numpy as np
+        import pandas as pd
+
+        if station_name is not None:
+            if contains:
+                return np.flatnonzero(pd.Series(self.stations).str.contains(station_name).to_numpy(dtype=bool))
+            return np.array(self.station_rows.get(station_name, []), dtype='int64')
+        elif wmo_id is not None:
+            row = self.get_row(wmo_id)
+            return np.array([] if row is None else [row], dtype='int64')
+        elif country is not None:
+            if contains:
+                matching = self.countries[pd.Series(self.countries).str.contains(country).to_numpy(dtype=bool)]
+            else:
+                matching = [country]
+            rows = [row for name in matching for row in self.country_rows.get(name, [])]
+            return np.array(sorted(rows), dtype='int64')
+        else:
+            raise ValueError("Give 'station_name', 'wmo_id' or 'country'.")
+
+    def frame(self, rows=None):
+        """
+        Return pd.DataFrame with the stations in the given rows (all stations if
+        None), as read from 'wmo_ids_and_coords.csv'.
+
+        Keyword arguments:
+            rows -- rows of the stations (e.g. returned by 'find_rows') (default None)
+        """
+
+        import pandas as pd
+
+        if rows is None:
+            rows = slice(None)
+        coordinates = self.coordinates[rows]
+        df = pd.DataFrame({
+            'country': self.countries[self.country_codes[rows]],
+            'station': self.stations[rows],
+            'wmo_id': self.wmo_ids[rows],
+            'lat': coordinates[:, 0],
+            'lon': coordinates[:, 1],
+            'elv': coordinates[:, 2]
+        }, index=pd.Index(self.index[rows], name=self.index_name))
+        return df.astype({column: self.string_dtype for column in ['country', 'station', 'wmo_id']})
+
+    def lookup(self, wmo_ids):
+        """
+        Return pd.DataFrame with the 'station', 'lat', 'lon' and 'elv' columns for
+        every element of 'wmo_ids' (NaN for unknown WMO ids). Every distinct WMO id
+        is looked up once.
+
+        Keyword arguments:
+            wmo_ids -- pd.Series (or list) with the WMO ids
+        """
+
+        import numpy as np
+        import pandas as pd
+
+        wmo_ids = pd.Series(wmo_ids)
+        codes, uniques = pd.factorize(wmo_ids.astype(str))
+        unique_rows = np.array([self.wmo_id_rows.get(wmo_id, -1) for wmo_id in uniques], dtype='int64')
+        rows = np.where(codes >= 0, unique_rows[np.maximum(codes, 0)] if len(unique_rows) else -1, -1)
+
+        known = rows >= 0
+        coordinates = np.full((len(rows), 3), np.nan)
+        coordinates[known] = self.coordinates[rows[known]]
+        stations = np.full(len(rows), None, dtype=object)
+        stations[known] = self.stations[rows[known]]
+
+        df = pd.DataFrame(coordinates, columns=['lat', 'lon', 'elv'], index=wmo_ids.index)
+        df.insert(0, 'station', stations)
+        return df
+
+    def get_tree(self):
+        """Return scipy.spatial.cKDTree with the stations' positions on the unit sphere"""
+
+        from scipy.spatial import cKDTree
+
+        if self.tree is None:
+            self.tree = cKDTree(get_unit_vectors(self.coordinates[:, 0], self.coordinates[:, 1]))
+        return self.tree
+
+    def get_distances(self, lat, lon, rows=None):
+        """
+        Return the great-circle distances in km from the point to the stations in
+        the given rows (all stations if None).
+        """
+
+        import numpy as np
+
+        if rows is None:
+            rows = slice(None)
+        vectors = get_unit_vectors(self.coordinates[rows, 0], self.coordinates[rows, 1])
+        chords = np.linalg.norm(vectors - get_unit_vectors(lat, lon), axis=1)
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chords / 2, 1))
+
+    def query(self, lats, lons, k=None, radius_km=None):
+        """
+        Find the stations nearest to the points and return a tuple of np.ndarrays
+        (point indexes, station rows, great-circle distances in km), ordered by
+        the point and then by the distance. All points are resolved in a single
+        vectorized tree query.
+
+        Keyword arguments:
+            lats -- latitudes of the points (a single number or a sequence)
+            lons -- longitudes of the points (in the order of 'lats')
+            k -- number of the nearest stations for every point. If None, return
+        every station within 'radius_km' (default None)
+            radius_km -- maximum distance of the stations in km. If None, do not
+        limit the distance (default None)
+        """
+
+        import numpy as np
+
+        if k is None and radius_km is None:
+            raise ValueError("Give 'k' or 'radius_km' (or both).")
+        if k is not None and (not isinstance(k, (int, np.integer)) or k < 1):
+            raise ValueError("Invalid 'k' input. Use a positive int.")
+        if radius_km is not None and not radius_km > 0:
+            raise ValueError("Invalid 'radius_km' input. Use a positive number.")
+
+        points = get_unit_vectors(lats, lons)
+        if len(np.atleast_1d(lons)) != len(points):
+            raise ValueError("'lats' and 'lons' must have the same length.")
+
+        tree = self.get_tree()
+        if k is not None:
+            k = min(int(k), len(self))
+            chord = np.inf if radius_km is None else get_chord_length(radius_km)
+            chords, rows = tree.query(points, k=k, distance_upper_bound=chord)
+            chords, rows = chords.reshape(len(points), k), rows.reshape(len(points), k)
+            found = np.isfinite(chords)
+            point_indexes = np.repeat(np.arange(len(points)), k)[found.ravel()]
+            rows, chords = rows[found], chords[found]
+        else:
+            neighbours = tree.query_ball_point(points, get_chord_length(radius_km))
+            point_indexes = np.repeat(np.arange(len(points)), [len(rows) for rows in neighbours])
+            rows = np.concatenate(
+                [np.empty(0, dtype='int64')] + [np.asarray(rows, dtype='int64') for rows in neighbours]
+            )
+            chords = np.linalg.norm(tree.data[rows] - points[point_indexes], axis=1)
+            order = np.lexsort((chords, point_indexes))
+            point_indexes, rows, chords = point_indexes[order], rows[order], chords[order]
+
+        distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chords / 2, 1))
+        return point_indexes, rows.astype('int64'), distances
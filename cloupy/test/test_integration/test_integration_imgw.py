@@ -30,14 +30,9 @@ class TestDataDownloading:
 
         from os import listdir
         from os.path import isfile, join
-        import shutil
         from random import shuffle
 
         y_range = range(2018, 2019)
-        files_reading_dir_path = str(__file__).replace(
-            join('test', 'test_integration', 'test_integration_imgw.py'),
-            join('scraping', 'files_reading_folder')
-        )
 
         for interval in intervals:
             for st_kind in st_kinds:
@@ -46,7 +41,8 @@ class TestDataDownloading:
                     continue
 
                 urls = imgw.get_urls(interval, st_kind, y_range)
-                imgw.download_data(urls)
+                files_reading_dir = imgw.download_data(urls)
+                files_reading_dir_path = files_reading_dir.name
                 downloaded_files_names = [f for f in listdir(files_reading_dir_path) if
                                           isfile(join(files_reading_dir_path, f))]
 
@@ -62,14 +58,14 @@ class TestDataDownloading:
                     df = imgw.concatenate_data(
                         downloaded_files_names=downloaded_files_names, file_formats=file, years_range=y_range,
                         keywords=keywords, specific_columns=None, optimize_memory_usage=False,
-                        merge_splitted_stations=True
+                        merge_splitted_stations=True, files_reading_dir=files_reading_dir
                     )
 
                     df = df[0][df[1]]
 
                     assert min(df[2]) == 2018
 
-                shutil.rmtree(files_reading_dir_path)
+                files_reading_dir.cleanup()
 
     def test_data_downloading_for_years_before_2001(
             self, intervals, st_kinds
@@ -1,5 +1,109 @@
 from cloupy.scraping import imgw
 import pytest
+import functools
+import http.server
+import io
+import os
+import shutil
+import threading
+import zipfile
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    supports_ranges = True
+    error_code = None  # if set, every request fails with this status
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_response(self, code, message=None):
+        self.server.requests_log.append((self.path, code))
+        super().send_response(code, message)
+
+    def send_head(self):
+        """Serve 'Range: bytes=start-' requests if the server supports ranges"""
+        if self.error_code is not None:
+            self.send_error(self.error_code)
+            return None
+
+        range_header = self.headers.get('Range')
+        if range_header is None or not self.supports_ranges:
+            return super().send_head()
+
+        f = open(self.translate_path(self.path), 'rb')
+        size = os.fstat(f.fileno()).st_size
+        start = int(range_header.split('=')[1].split('-')[0])
+        if start >= size:
+            f.close()
+            self.send_response(416)
+            self.send_header('Content-Range', 'bytes */{}'.format(size))
+            self.end_headers()
+            return None
+
+        f.seek(start)
+        self.send_response(206)
+        self.send_header('Content-Type', 'application/zip')
+        self.send_header('Content-Range', 'bytes {}-{}/{}'.format(start, size - 1, size))
+        self.send_header('Content-Length', str(size - start))
+        self.end_headers()
+        return f
+
+
+@pytest.fixture
+def imgw_server(tmp_path, monkeypatch):
+    """Serve a temporary directory over HTTP as a local stand-in for the IMGW database"""
+    monkeypatch.setattr(imgw, 'MEMORY_LISTINGS', {})  # the port of the server may be reused between tests
+    root = tmp_path / 'server'
+    root.mkdir()
+    handler = functools.partial(QuietHandler, directory=str(root))
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.requests_log = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server_url = 'http://127.0.0.1:{}/'.format(server.server_address[1])
+    yield root, server_url, server.requests_log
+    server.shutdown()
+    server.server_close()
+
+
+# letters written by IMGW in the columns with letter codes (e.g. 'Rodzaj opadu [S/W/ ]')
+LETTER_CODES = {'[S/W/ ]': 'SW', '[Z/R]': 'ZR', '[L/W]': 'LW', '[W/N]': 'WN', '[P]': 'P', '[opis]': 'AB'}
+
+
+def make_rows(file_format, station_code, station_name, year, months=(1, 2, 3)):
+    names = imgw.get_column_names(file_format)
+    rows = []
+    for month in months:
+        row = [str(station_code), '"{}"'.format(station_name), str(year), str(month)]
+        for i, name in enumerate(names[len(row):]):
+            letters = [codes for unit, codes in LETTER_CODES.items() if name.endswith(unit)]
+            row.append(letters[0][month % len(letters[0])] if letters else str(round(month + i / 10, 1)))
+        rows.append(','.join(row))
+    return '\n'.join(rows) + '\n'
+
+
+@pytest.fixture
+def imgw_database(imgw_server, monkeypatch):
+    """Local stand-in for the daily synop data (2000 in the '1996_2000/' bucket, 2001 and 2002)"""
+    root, base_url, requests_log = imgw_server
+    monkeypatch.setattr(imgw, 'BASE_URL', base_url)
+    stations = [(352200375, 'WARSZAWA-OKĘCIE', '375'), (349190650, 'ZAKOPANE', '650'), (352160330, 'POZNAŃ', '330')]
+    for bucket, years in [('1996_2000', [1999, 2000]), ('2001', [2001]), ('2002', [2002])]:
+        for code, name, suffix in stations:
+            make_archive(root / 'dobowe' / 'synop' / bucket / '{}_{}_s.zip'.format(bucket, suffix), {
+                's_d_{}_{}.csv'.format(suffix, bucket): ''.join(make_rows('s_d', code, name, year) for year in years),
+                's_d_t_{}_{}.csv'.format(suffix, bucket): ''.join(make_rows('s_d_t', code, name, year) for year in years)
+            })
+    return root, base_url, requests_log
+
+
+def make_archive(path, members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zip_file:
+        for name, content in members.items():
+            zip_file.writestr(name, content.encode('windows-1250'))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(buffer.getvalue())
 
 
 class TestFileFormats:
@@ -110,3 +214,876 @@ class TestKeywordsInColumns:
         for key in dictionary:
             counter += len(dictionary[key])
         return counter
+
+
+class TestDownloadingData:
+    def test_concurrent_download(self, imgw_server, tmp_path):
+        root, base_url, _ = imgw_server
+        urls = []
+        for year in [2017, 2018]:
+            urls.append(base_url + '{}/'.format(year))
+            for code, name in [(352200375, 'WARSZAWA'), (350190566, 'ZAKOPANE'), (353230295, 'POZNAŃ')]:
+                make_archive(root / str(year) / '{}_{}_s.zip'.format(year, str(code)[-3:]), {
+                    's_d_{}_{}.csv'.format(str(code)[-3:], year): make_rows('s_d', code, name, year),
+                    's_d_t_{}_{}.csv'.format(str(code)[-3:], year): make_rows('s_d_t', code, name, year)
+                })
+
+        files_reading_dir = tmp_path / 'files'
+        imgw.download_data(urls, max_workers=4, files_reading_dir=files_reading_dir)
+        assert len(os.listdir(files_reading_dir)) == 12
+
+    def test_download_to_own_directory(self, imgw_server, tmp_path):
+        root, base_url, _ = imgw_server
+        make_archive(root / '2018' / '2018_375_s.zip', {
+            's_d_375_2018.csv': make_rows('s_d', 352200375, 'WARSZAWA', 2018)
+        })
+
+        files_reading_dir = tmp_path / 'files'
+        imgw.download_data([base_url + '2018/'], files_reading_dir=files_reading_dir)
+        df = imgw.concatenate_data(
+            os.listdir(files_reading_dir), 's_d', [1, 2, 3], None, False, range(2018, 2019), True,
+            files_reading_dir=files_reading_dir
+        )
+        assert list(df[3]) == [1, 2, 3]
+        assert not os.path.exists(os.path.join(os.path.dirname(imgw.__file__), 'files_reading_folder'))
+
+    def test_download_to_temporary_directory(self, imgw_server):
+        root, base_url, _ = imgw_server
+        make_archive(root / '2018' / '2018_375_s.zip', {
+            's_d_375_2018.csv': make_rows('s_d', 352200375, 'WARSZAWA', 2018)
+        })
+
+        first_dir = imgw.download_data([base_url + '2018/'])
+        with imgw.download_data([base_url + '2018/']) as second_dir_path:
+            assert second_dir_path != first_dir.name
+            assert os.listdir(second_dir_path) == ['s_d_375_2018.csv']
+            df = imgw.concatenate_data(
+                os.listdir(first_dir.name), 's_d', [1, 2, 3], None, False, range(2018, 2019), True,
+                files_reading_dir=first_dir
+            )
+        first_dir.cleanup()
+
+        assert list(df[3]) == [1, 2, 3]
+        assert not os.path.exists(first_dir.name)
+        assert not os.path.exists(second_dir_path)
+        with pytest.raises(ValueError):
+            imgw.concatenate_data(['s_d_375_2018.csv'], 's_d', [1, 2, 3], None, False, range(2018, 2019), True)
+
+    def test_iterating_archives_with_concurrent_listings(self, imgw_database, monkeypatch, capsys):
+        import threading
+
+        _, base_url, _ = imgw_database
+        barrier = threading.Barrier(2, timeout=10)
+        get_zip_file_paths = imgw.get_zip_file_paths
+
+        def waiting_get_zip_file_paths(*args):
+            barrier.wait()  # passes only if both listings are downloaded at once
+            return get_zip_file_paths(*args)
+
+        monkeypatch.setattr(imgw, 'get_zip_file_paths', waiting_get_zip_file_paths)
+        urls = [base_url + 'dobowe/synop/2001/', base_url + 'dobowe/synop/2002/']
+        archives = list(imgw.iter_archives(urls, max_workers=2))
+
+        assert [(url, name) for url, name, _ in archives] == [
+            (url, '{}_{}_s.zip'.format(url[-5:-1], code)) for url in urls for code in ['330', '375', '650']
+        ]
+        output = capsys.readouterr().out
+        assert 'Data download started... 0% done' in output and 'Data downloaded! 100% done' in output
+
+    def test_concurrent_calls(self, imgw_database):
+        from concurrent.futures import ThreadPoolExecutor
+
+        calls = [range(1999, 2001), range(2001, 2002), range(2002, 2003), range(1999, 2003)]
+        with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+            frames = list(executor.map(
+                lambda years_range: imgw.download_imgw_climatological_data(
+                    'daily', 'synop', years_range, specific_columns=[1, 2]
+                ), calls
+            ))
+
+        for years_range, df in zip(calls, frames):
+            assert sorted(df['Rok'].unique()) == list(years_range)
+            assert len(df) == len(years_range) * 3 * 3
+
+    def test_download_without_extracting(self, imgw_server):
+        root, base_url, _ = imgw_server
+        for year in [2017, 2018]:
+            for code in ['375', '566']:
+                make_archive(root / str(year) / '{}_{}_s.zip'.format(year, code), {
+                    's_d_{}_{}.csv'.format(code, year): make_rows('s_d', 352200000 + int(code), 'STATION', year)
+                })
+
+        files_reading_dir_path = os.path.join(os.path.dirname(imgw.__file__), 'files_reading_folder')
+        archives = imgw.download_data([base_url + '2017/', base_url + '2018/'], max_workers=3, extract=False)
+
+        assert [archive.namelist() for archive in archives] == [
+            ['s_d_375_2017.csv'], ['s_d_566_2017.csv'], ['s_d_375_2018.csv'], ['s_d_566_2018.csv']
+        ]
+        assert not os.path.exists(files_reading_dir_path)
+
+    def test_file_matches_format(self):
+        assert imgw.file_matches_format('s_d_375_2018.csv', 's_d')
+        assert not imgw.file_matches_format('s_d_t_375_2018.csv', 's_d')
+        assert imgw.file_matches_format('s_d_t_375_2018.csv', 's_d_t')
+        assert not imgw.file_matches_format('k_d_t_01_2018.csv', 'k_d')
+        assert not imgw.file_matches_format('k_m_d_2018.csv', 'k_m_t')
+
+    def test_invalid_max_workers(self):
+        with pytest.raises(ValueError):
+            imgw.download_data([], max_workers=0)
+
+
+class TestArchiveCache:
+    def test_revalidation(self, imgw_server, tmp_path):
+        from cloupy.scraping.imgw_cache import ArchiveCache
+
+        root, base_url, requests_log = imgw_server
+        make_archive(root / '2018' / '2018_375_s.zip', {'s_d_375_2018.csv': make_rows('s_d', 352200375, 'WARSZAWA', 2018)})
+        url = base_url + '2018/2018_375_s.zip'
+
+        cache = ArchiveCache(tmp_path / 'cache')
+        session = imgw.create_session()
+        first = cache.get(session, url)
+        second = cache.get(session, url)
+
+        assert first == second == (root / '2018' / '2018_375_s.zip').read_bytes()
+        assert [code for _, code in requests_log] == [200, 304]
+
+    def test_server_errors(self, imgw_server, tmp_path, monkeypatch):
+        import requests
+        from cloupy.scraping.imgw_cache import ArchiveCache
+
+        root, base_url, requests_log = imgw_server
+        for code in ['375', '566']:
+            make_archive(root / '2018' / '2018_{}_s.zip'.format(code), {'s_d.csv': 'x' * 100})
+
+        cache = ArchiveCache(tmp_path / 'cache')
+        session = imgw.create_session()
+        content = cache.get(session, base_url + '2018/2018_375_s.zip')
+
+        monkeypatch.setattr(QuietHandler, 'error_code', 500)
+        assert cache.get(session, base_url + '2018/2018_375_s.zip') == content
+        with pytest.raises(requests.HTTPError):
+            cache.get(session, base_url + '2018/2018_566_s.zip')
+        assert cache.read_metadata(base_url + '2018/2018_566_s.zip') is None
+
+        monkeypatch.setattr(QuietHandler, 'error_code', 404)
+        with pytest.raises(requests.HTTPError):
+            cache.get(session, base_url + '2018/2018_375_s.zip')
+        assert [code for _, code in requests_log] == [200, 500, 500, 404]
+
+    def test_lru_eviction(self, imgw_server, tmp_path):
+        import time
+        from cloupy.scraping.imgw_cache import ArchiveCache
+
+        root, base_url, _ = imgw_server
+        for code in ['375', '566', '295']:
+            make_archive(root / '2018' / '2018_{}_s.zip'.format(code), {'s_d.csv': 'x' * 1000})
+        archive_size = (root / '2018' / '2018_375_s.zip').stat().st_size
+
+        cache = ArchiveCache(tmp_path / 'cache', max_size=2 * archive_size)
+        imgw.get_listing_index(cache).put(base_url + '2018/', [])
+        station_index = imgw.get_station_index(cache)
+        station_index.update(base_url + '2018/', '2018_375_s.zip', ['WARSZAWA'])
+        station_index.save()
+        session = imgw.create_session()
+        for code in ['375', '566', '375', '295']:
+            cache.get(session, base_url + '2018/2018_{}_s.zip'.format(code))
+            time.sleep(0.01)
+
+        assert cache.read_metadata(base_url + '2018/2018_375_s.zip') is not None
+        assert cache.read_metadata(base_url + '2018/2018_295_s.zip') is not None
+        assert cache.read_metadata(base_url + '2018/2018_566_s.zip') is None
+        assert (tmp_path / 'cache' / 'listings.json').is_file()
+        assert (tmp_path / 'cache' / 'stations.json').is_file()
+
+    def test_choosing_archive_cache(self, tmp_path):
+        from cloupy.scraping.imgw_cache import ArchiveCache, ResumableDownloads
+
+        assert imgw.get_archive_cache() is None
+        assert isinstance(imgw.get_archive_cache(True, tmp_path / 'cache'), ArchiveCache)
+        assert isinstance(
+            imgw.get_archive_cache(True, tmp_path / 'cache', download_dir=tmp_path / 'downloads'), ResumableDownloads
+        )
+
+
+class TestConcatenatingData:
+    @pytest.fixture
+    def archives(self):
+        archives = []
+        for year, code, name in [(2017, 352200375, 'WARSZAWA-OKĘCIE'), (2018, 352200375, 'WARSZAWA'),
+                                 (2018, 349190650, 'ZAKOPANE')]:
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, 'w') as zip_file:
+                zip_file.writestr('s_d_{}.csv'.format(year), make_rows('s_d', code, name, year).encode('windows-1250'))
+                zip_file.writestr('s_d_t_{}.csv'.format(year), make_rows('s_d_t', code, name, year).encode('windows-1250'))
+            archives.append(zipfile.ZipFile(buffer))
+        return archives
+
+    @pytest.mark.parametrize('engine', ['pandas', 'pyarrow'])
+    def test_letter_codes(self, archives, engine):
+        names = imgw.get_column_names('s_d')
+        df = imgw.concatenate_data(
+            None, 's_d', None, None, True, range(2017, 2019), True, archives=archives, engine=engine
+        )
+        precipitation, ground = df[names.index('Rodzaj opadu [S/W/ ]')], df[names.index('Stan gruntu [Z/R]')]
+        assert str(precipitation.dtype) == str(ground.dtype) == 'category'
+        assert sorted(precipitation.unique()) == ['S', 'W']
+        assert sorted(ground.unique()) == ['R', 'Z']
+        assert str(df[names.index('Maksymalna temperatura dobowa [°C]')].dtype) == 'float32'
+
+    def test_concatenating_archives(self, archives):
+        df = imgw.concatenate_data(
+            None, 's_d', None, None, False, range(2017, 2019), True, archives=archives
+        )
+        assert len(df.index) == 9
+        assert len(df.columns) == len(imgw.get_column_names('s_d'))
+        assert list(df[1].unique()) == ['WARSZAWA', 'ZAKOPANE']
+
+    @pytest.mark.parametrize('optimize_memory_usage', [False, True])
+    def test_parsing_in_processes(self, archives, optimize_memory_usage):
+        import pandas as pd
+
+        df = imgw.concatenate_data(
+            None, 's_d', None, None, optimize_memory_usage, range(2017, 2019), True, archives=archives
+        )
+        parallel_df = imgw.concatenate_data(
+            None, 's_d', None, None, optimize_memory_usage, range(2017, 2019), True, archives=archives,
+            parse_workers=2
+        )
+        pd.testing.assert_frame_equal(parallel_df, df)
+
+        with pytest.raises(ValueError):
+            imgw.concatenate_data(None, 's_d', None, None, False, range(2017, 2019), True, archives, parse_workers=0)
+
+    @pytest.mark.parametrize('engine', ['pyarrow', 'polars', 'auto'])
+    @pytest.mark.parametrize('optimize_memory_usage', [False, True])
+    def test_parsing_engines(self, archives, engine, optimize_memory_usage):
+        import pandas as pd
+
+        df = imgw.concatenate_data(
+            None, 's_d', [0, 1, 2, 5, 6], None, optimize_memory_usage, range(2017, 2019), True, archives=archives
+        )
+        engine_df = imgw.concatenate_data(
+            None, 's_d', [0, 1, 2, 5, 6], None, optimize_memory_usage, range(2017, 2019), True, archives=archives,
+            engine=engine
+        )
+        pd.testing.assert_frame_equal(engine_df, df)
+
+        with pytest.raises(ValueError):
+            imgw.concatenate_data(None, 's_d', None, None, False, range(2017, 2019), True, archives, engine='spark')
+
+    def test_years_range_and_keywords(self, archives):
+        df, keywords_in_columns = imgw.concatenate_data(
+            None, 's_d', None, ['nazwa stacji', 'rok'], False, range(2018, 2019), False, archives=archives
+        )
+        assert keywords_in_columns == [1, 2]
+        assert list(df[2].unique()) == [2018]
+        assert len(df.index) == 6
+
+    def test_stations_filter(self, archives):
+        df = imgw.concatenate_data(
+            None, 's_d', [1, 4], None, False, range(2017, 2019), True, archives=archives, stations='Warszawa'
+        )
+        assert list(df.columns) == [1, 4]
+        assert list(df[1].unique()) == ['WARSZAWA']
+        assert len(df.index) == 6
+
+        df = imgw.concatenate_data(
+            None, 's_d', None, None, False, range(2017, 2019), True, archives=archives, stations=[349190650]
+        )
+        assert list(df[1].unique()) == ['ZAKOPANE']
+
+    def test_parsing_only_selected_columns(self, archives, monkeypatch):
+        parsed_columns = []
+        read_imgw_csv = imgw.read_imgw_csv
+
+        def spy(source, usecols=None, *args):
+            parsed_columns.append(usecols)
+            return read_imgw_csv(source, usecols, *args)
+
+        monkeypatch.setattr(imgw, 'read_imgw_csv', spy)
+        imgw.concatenate_data(
+            None, 's_d', None, ['temperatura'], False, range(2018, 2019), True, archives=archives
+        )
+        assert parsed_columns == [[2, 5, 7, 9, 11]] * 3
+
+    def test_optimizing_memory_usage(self, archives):
+        import numpy as np
+        import pandas as pd
+
+        df = imgw.concatenate_data(
+            None, 's_d', None, None, False, range(2017, 2019), True, archives=archives
+        )
+        optimized_df = imgw.concatenate_data(
+            None, 's_d', None, None, True, range(2017, 2019), True, archives=archives
+        )
+
+        assert optimized_df.memory_usage(deep=True).sum() < df.memory_usage(deep=True).sum()
+        assert isinstance(optimized_df[1].dtype, pd.CategoricalDtype)
+        assert optimized_df[2].dtype == np.dtype('int16')
+        assert optimized_df[5].dtype == np.dtype('float32')
+        assert list(optimized_df[1].astype(object)) == list(df[1])
+        for column in df.columns[2:]:
+            if isinstance(optimized_df[column].dtype, pd.CategoricalDtype):
+                assert list(optimized_df[column].astype(str)) == list(df[column].astype(str))
+            else:
+                assert np.allclose(optimized_df[column].astype('float64'), df[column], atol=1e-4)
+
+
+class TestColumnSchema:
+    def test_schema_of_file_format(self):
+        schema = imgw.get_column_schema('s_d')
+        assert [column['name'] for column in schema] == imgw.get_column_names('s_d')
+        assert schema[5] == {
+            'index': 5, 'name': 'Maksymalna temperatura dobowa [°C]', 'unit': '°C', 'dtype': 'float32'
+        }
+        assert schema[1]['unit'] is None
+        assert imgw.get_column_schema()['formats']['Status pomiaru TEMP']['s_d_t'] == 10
+
+        with pytest.raises(ValueError):
+            imgw.get_column_schema('x_y')
+
+    def test_finding_columns(self):
+        assert 'Średnia dobowa temperatura [°C]' in imgw.find_columns('dobowa temp')
+        assert 'Maksymalna temperatura dobowa [°C]' not in imgw.find_columns('dobowa temp')
+        assert imgw.find_columns('TEMPERATURA') == imgw.find_columns('temperatura')
+        assert all('°C' in name for name in imgw.find_columns('[°c]'))
+        assert imgw.find_columns('nieistniejąca kolumna') == set()
+
+
+class TestColumnDtypes:
+    def test_schema(self):
+        dtypes = imgw.get_column_dtypes('s_t')
+        names = imgw.get_column_names('s_t')
+        assert len(dtypes) == len(names)
+        assert dtypes[0] == dtypes[1] == 'category'
+        assert [dtypes[i] for i in range(2, 6)] == ['int16', 'int8', 'int8', 'int8']
+        for index, name in enumerate(names):
+            if name.startswith('Status pomiaru'):
+                assert dtypes[index] == 'category'
+            elif '[°C]' in name or '[mm]' in name or '[hPa]' in name:
+                assert dtypes[index] == 'float32'
+
+    @pytest.mark.parametrize('file_format', ['k_d', 'k_t', 's_d', 's_t', 'o_d'])
+    def test_letter_codes_are_categories(self, file_format):
+        for name, dtype in zip(imgw.get_column_names(file_format), imgw.get_column_dtypes(file_format).values()):
+            if any(name.endswith(unit) for unit in LETTER_CODES):
+                assert dtype == 'category'
+
+    def test_out_of_range_ints_are_not_cast(self):
+        import pandas as pd
+
+        df = pd.DataFrame({2: [2018, 2019], 3: [1, 300]})
+        df = imgw.apply_column_dtypes(df, {2: 'int16', 3: 'int8'})
+        assert str(df[2].dtype) == 'int16'
+        assert str(df[3].dtype) == 'int64'
+
+
+class TestMergingStations:
+    @pytest.mark.parametrize('dtype', [object, 'category'])
+    def test_merging_stations(self, dtype):
+        import pandas as pd
+
+        df = pd.DataFrame({1: pd.Series(['WARSZAWA-OKĘCIE', 'ZAKOPANE', None, 'WARSZAWA'], dtype=dtype)})
+        merged = imgw.merge_stations(df.copy())[1]
+        assert list(merged.iloc[[0, 1, 3]]) == ['WARSZAWA', 'ZAKOPANE', 'WARSZAWA']
+        assert merged.isnull().iloc[2]
+        if dtype == 'category':
+            assert list(merged.cat.categories) == ['WARSZAWA', 'ZAKOPANE']
+
+        merged = imgw.merge_stations(df.copy(), {'ZAKOPANE': 'ZAKOPANE-KASPROWY'})[1]
+        assert list(merged.iloc[[0, 1]]) == ['WARSZAWA-OKĘCIE', 'ZAKOPANE-KASPROWY']
+
+    def test_custom_split_stations_table(self, imgw_database):
+        df = imgw.download_imgw_climatological_data(
+            'daily', 'synop', range(2001, 2002), specific_columns=[1], stations='ZAKOP',
+            merge_split_stations={'ZAKOPANE': 'ZAKOP'}
+        )
+        assert list(df['Nazwa stacji'].unique()) == ['ZAKOP']
+
+    @pytest.mark.parametrize('dtype', [object, 'category'])
+    def test_joining_coordinates(self, dtype):
+        import pandas as pd
+        from cloupy.scraping.imgw_stations import get_station_registry
+
+        zakopane = get_station_registry().get('ZAKOPANE')
+        df = pd.DataFrame({
+            'Kod stacji': pd.Series([349190650, 1, 349190650], dtype=dtype),
+            'Nazwa stacji': pd.Series(['ZAKOPANE', 'NIEZNANA', 'ZAKOPANE-NOWE'], dtype=dtype)
+        })
+        df = imgw.join_coordinates(df)
+
+        assert list(df['lat'].iloc[[0, 2]]) == [zakopane['lat']] * 2
+        assert list(df['elv'].iloc[[0, 2]]) == [zakopane['elv']] * 2
+        assert df[['lat', 'lon', 'elv']].iloc[1].isnull().all()
+
+    def test_normalizing_stations(self):
+        assert imgw.normalize_stations('WARSZAWA', True) == (['WARSZAWA'], None)
+        assert imgw.normalize_stations(None, {'OKĘCIE': 'WARSZAWA'}) == (None, {'OKĘCIE': 'WARSZAWA'})
+        assert imgw.normalize_stations(['Warszawa', 375], {'OKĘCIE': 'WARSZAWA'}) == (
+            ['Warszawa', 375, 'OKĘCIE', 'WARSZAWA'], {'OKĘCIE': 'WARSZAWA'}
+        )
+
+
+class TestStationRegistry:
+    @pytest.fixture
+    def registry(self, tmp_path):
+        from cloupy.scraping.imgw_stations import StationRegistry
+
+        path = tmp_path / 'stations.csv'
+        path.write_text(
+            'name,code,lat,lon,elv\nHEL,354180135,54.6,18.81,1.0\nZAKOPANE,,49.29,19.96,855.0\n', encoding='utf-8'
+        )
+        return StationRegistry(path)
+
+    def test_single_lookups(self, registry):
+        assert registry.get('hel') == {'name': 'HEL', 'lat': 54.6, 'lon': 18.81, 'elv': 1.0}
+        assert registry.get(354180135)['name'] == 'HEL'
+        assert registry.get(349190650) is None
+        assert registry.get('NIEZNANA') is None
+
+        registry.add_codes([349190650, 1], ['ZAKOPANE', 'NIEZNANA'])
+        assert registry.get(349190650)['name'] == 'ZAKOPANE'
+        assert registry.get(1) is None
+
+    def test_bulk_lookup(self, registry):
+        import pandas as pd
+
+        coordinates = registry.lookup(pd.Series(['ZAKOPANE', None, 'HEL', 'NIEZNANA', 'ZAKOPANE'], dtype='category'))
+        assert list(coordinates['elv'].fillna(-1)) == [855.0, -1, 1.0, -1, 855.0]
+        assert list(registry.lookup([354180135])['lat']) == [54.6]
+
+    def test_shipped_registry(self):
+        from cloupy.scraping.imgw_stations import get_station_registry
+
+        registry = get_station_registry()
+        assert registry is get_station_registry()
+        assert len(registry.names) > 1000
+        assert registry.get('WARSZAWA') is not None
+
+    def test_first_lookup_by_code(self):
+        from cloupy.scraping.imgw_stations import StationRegistry
+
+        # the shipped registry has no codes, so only the names are known before any download
+        registry = StationRegistry()
+        assert registry.get('WARSZAWA') is not None
+        assert registry.get(352200375) is None
+        assert list(registry.lookup([352200375])['lat'].isnull()) == [True]
+
+
+class TestStationArchives:
+    @pytest.fixture(autouse=True)
+    def memory_station_index(self, monkeypatch):
+        monkeypatch.setattr(imgw, 'MEMORY_STATION_INDEX', None)
+
+    @staticmethod
+    def downloaded_archives(requests_log):
+        return sorted(path.split('/')[-1] for path, _ in requests_log if path.endswith('.zip'))
+
+    def test_archive_station_id(self):
+        assert imgw.get_archive_station_id('1996_2000_375_s.zip') == '375'
+        assert imgw.get_archive_station_id('2001_375_s.zip') == '375'
+        assert imgw.get_archive_station_id('2001_01_k.zip') is None
+        assert imgw.get_archive_station_id('1951_1955_m_s.zip') is None
+
+    def test_downloading_archives_by_code(self, imgw_database):
+        _, _, requests_log = imgw_database
+        df = imgw.download_imgw_climatological_data('daily', 'synop', range(2001, 2003), stations=349190650)
+
+        assert self.downloaded_archives(requests_log) == ['2001_650_s.zip', '2002_650_s.zip']
+        assert list(df['Nazwa stacji'].unique()) == ['ZAKOPANE']
+
+    def test_first_download_by_name_with_registry_codes(self, imgw_database, tmp_path, monkeypatch):
+        from cloupy.scraping import imgw_stations
+
+        _, _, requests_log = imgw_database
+        path = tmp_path / 'stations.csv'
+        path.write_text(
+            'name,code,lat,lon,elv\nPOZNAŃ,,52.41,16.83,84.0\nPOZNAŃ-ŁAWICA,352160330,52.41,16.83,84.0\n',
+            encoding='utf-8'
+        )
+        monkeypatch.setattr(imgw_stations, 'STATION_REGISTRY', imgw_stations.StationRegistry(path))
+
+        df = imgw.download_imgw_climatological_data('daily', 'synop', range(2001, 2003), stations='POZNAŃ')
+        assert self.downloaded_archives(requests_log) == ['2001_330_s.zip', '2002_330_s.zip']
+        assert list(df['Nazwa stacji'].unique()) == ['POZNAŃ']
+
+    def test_downloading_archives_by_name(self, imgw_database, tmp_path):
+        _, _, requests_log = imgw_database
+        first_df = imgw.download_imgw_climatological_data(
+            'daily', 'synop', range(2001, 2003), stations='WARSZAWA', use_cache=True, cache_dir=tmp_path
+        )
+        assert len(self.downloaded_archives(requests_log)) == 6
+        assert (tmp_path / 'stations.json').is_file()
+
+        del requests_log[:]
+        df = imgw.download_imgw_climatological_data(
+            'daily', 'synop', range(2001, 2003), stations='WARSZAWA', use_cache=True, cache_dir=tmp_path
+        )
+        assert self.downloaded_archives(requests_log) == ['2001_375_s.zip', '2002_375_s.zip']
+        assert df.equals(first_df)
+
+
+class TestMultipleFileFormats:
+    def test_single_download_for_all_formats(self, imgw_database):
+        _, _, requests_log = imgw_database
+        frames = imgw.download_imgw_climatological_data('daily', 'synop', range(2001, 2003), file_format_index='all')
+
+        assert list(frames) == ['s_d', 's_d_t']
+        assert list(frames['s_d_t'].columns) == imgw.get_column_names('s_d_t')
+        assert len(frames['s_d']) == len(frames['s_d_t']) == 18
+        archives = [path for path, _ in requests_log if path.endswith('.zip')]
+        assert len(archives) == len(set(archives)) == 6
+
+    @pytest.mark.parametrize('parse_workers', [1, 2])
+    def test_archives_are_parsed_as_they_come(self, imgw_database, monkeypatch, parse_workers):
+        import weakref
+
+        opened_archives, alive_archives = [], []
+        open_archive = imgw.open_archive
+
+        def tracked_open_archive(*args, **kwargs):
+            alive_archives.append(len([archive for archive in opened_archives if archive() is not None]))
+            archive = open_archive(*args, **kwargs)
+            opened_archives.append(weakref.ref(archive))
+            return archive
+
+        monkeypatch.setattr(imgw, 'open_archive', tracked_open_archive)
+        frames = imgw.download_imgw_climatological_data(
+            'daily', 'synop', range(1999, 2003), file_format_index='all', parse_workers=parse_workers
+        )
+
+        assert len(frames['s_d']) == len(frames['s_d_t']) == 36
+        assert len(opened_archives) == 9
+        assert max(alive_archives) <= 2  # the archive being parsed and the one downloaded ahead
+
+    def test_joining_formats(self, imgw_database):
+        import pandas as pd
+
+        df = imgw.download_imgw_climatological_data(
+            'daily', 'synop', range(2001, 2003), file_format=['s_d', 's_d_t'], keywords=['temperatura'],
+            join_file_formats=True, optimize_memory_usage=True
+        )
+
+        assert list(df.columns[:5]) == ['Kod stacji', 'Nazwa stacji', 'Rok', 'Miesiąc', 'Dzień']
+        assert 'Średnia dobowa temperatura [°C]' in df.columns
+        assert 'Maksymalna temperatura dobowa [°C]' in df.columns
+        assert len(df) == 18
+        assert isinstance(df['Nazwa stacji'].dtype, pd.CategoricalDtype)
+
+    def test_joining_columns_with_same_names(self):
+        import pandas as pd
+
+        frames = {
+            's_d': pd.DataFrame({'Nazwa stacji': ['A', 'B'], 'Rok': [2001, 2001], 'Status pomiaru': ['8', None]}),
+            's_d_t': pd.DataFrame({'Nazwa stacji': ['A'], 'Rok': [2001], 'Status pomiaru': ['9']})
+        }
+        df = imgw.join_frames(frames)
+        assert list(df.columns) == ['Nazwa stacji', 'Rok', 'Status pomiaru (s_d)', 'Status pomiaru (s_d_t)']
+        assert len(df) == 2
+
+
+class TestIteratingData:
+    def test_chunks_by_archive(self, imgw_database):
+        chunks = list(imgw.iter_imgw_data(
+            'daily', 'synop', range(2000, 2003), keywords=['nazwa stacji', 'temperatura'],
+            max_workers=2
+        ))
+        assert len(chunks) == 9
+        for chunk in chunks:
+            assert list(chunk.columns) == ['Nazwa stacji'] + imgw.get_column_names('s_d')[5:12:2]
+        assert sum(len(chunk.index) for chunk in chunks) == 27
+        assert [set(chunk['Nazwa stacji']) for chunk in chunks[:3]] == [{'POZNAŃ'}, {'WARSZAWA'}, {'ZAKOPANE'}]
+
+    def test_chunks_by_year(self, imgw_database):
+        chunks = list(imgw.iter_imgw_data(
+            'daily', 'synop', range(2000, 2003), specific_columns=[1, 3], stations=['POZNAŃ', 'ZAKOPANE'],
+            chunks='year', return_coordinates=True
+        ))
+        assert len(chunks) == 3
+        for chunk in chunks:
+            assert list(chunk.columns) == ['Nazwa stacji', 'Miesiąc', 'lon', 'lat', 'elv']
+            assert len(chunk.index) == 6
+        assert chunks[0].loc[chunks[0]['Nazwa stacji'] == 'ZAKOPANE', 'lat'].notnull().all()
+
+    def test_same_data_as_download(self, imgw_database):
+        import pandas as pd
+
+        chunks = imgw.iter_imgw_data('daily', 'synop', range(2000, 2003))
+        df = imgw.download_imgw_climatological_data('daily', 'synop', range(2000, 2003))
+        pd.testing.assert_frame_equal(pd.concat(chunks), df)
+
+
+class TestAggregatingData:
+    @pytest.fixture
+    def prompt_database(self, imgw_database):
+        """Prompt climat data: 2 stations, 4 measurements a day for 3 days in January and February of 2001"""
+        root, base_url, requests_log = imgw_database
+        columns_number = len(imgw.get_column_names('k_t'))
+        for code, name, suffix in [(250190390, 'BIAŁKA', '390'), (249200020, 'WISŁA', '020')]:
+            rows = []
+            for month in [1, 2]:
+                for day in [1, 2, 3]:
+                    for hour in [0, 6, 12, 18]:
+                        row = [str(code), '"{}"'.format(name), '2001', str(month), str(day), str(hour)]
+                        row += [str(month * 10 + day + hour / 6), '']  # temperature and its status
+                        row += [str(float(i)) for i in range(columns_number - len(row))]
+                        rows.append(','.join(row))
+            make_archive(root / 'terminowe' / 'klimat' / '2001' / '2001_{}_k.zip'.format(suffix), {
+                'k_t_{}_2001.csv'.format(suffix): '\n'.join(rows) + '\n'
+            })
+        return root, base_url, requests_log
+
+    @pytest.mark.parametrize('period', ['daily', 'monthly'])
+    def test_same_statistics_as_full_table(self, prompt_database, period):
+        keys = ['Kod stacji', 'Nazwa stacji'] + imgw.AGGREGATION_PERIODS[period]
+        temperature = 'Temperatura powietrza [°C]'
+
+        df = imgw.download_imgw_climatological_data('prompt', 'climat', range(2001, 2002), max_workers=2)
+        expected = df.groupby(keys)[temperature].agg(['mean', 'min', 'max', 'sum', 'count']).reset_index()
+
+        aggregated = imgw.download_imgw_climatological_data(
+            'prompt', 'climat', range(2001, 2002), keywords='temperatura powietrza', aggregate=period
+        )
+        assert list(aggregated.columns) == keys + ['{} ({})'.format(temperature, statistic) for statistic in
+                                                   ['mean', 'min', 'max', 'sum', 'count']]
+        assert len(aggregated.index) == {'daily': 12, 'monthly': 4}[period]
+        for statistic in ['mean', 'min', 'max', 'sum', 'count']:
+            assert aggregated['{} ({})'.format(temperature, statistic)].tolist() == \
+                pytest.approx(expected[statistic].tolist())
+
+    def test_combining_partial_aggregates(self, prompt_database, monkeypatch):
+        monkeypatch.setattr(imgw, 'AGGREGATION_BATCH_SIZE', 1)
+        chunks = imgw.iter_imgw_data(
+            'prompt', 'climat', range(2001, 2002), specific_columns=[0, 1, 2, 3, 4, 6], optimize_memory_usage=True
+        )
+        df = imgw.aggregate_chunks(chunks, 'monthly', statistics=['mean', 'count'])
+        assert df['Temperatura powietrza [°C] (count)'].tolist() == [12] * 4
+        assert df['Temperatura powietrza [°C] (mean)'].tolist() == pytest.approx([13.5, 23.5, 13.5, 23.5])
+
+    def test_only_measurements_are_aggregated(self, prompt_database):
+        df = imgw.download_imgw_climatological_data('prompt', 'climat', range(2001, 2002), aggregate='monthly')
+        keys = ['Kod stacji', 'Nazwa stacji'] + imgw.AGGREGATION_PERIODS['monthly']
+        statistics_columns = [column for column in df.columns if column not in keys]
+        assert 'Temperatura powietrza [°C] (mean)' in statistics_columns
+        assert not [column for column in statistics_columns if column.startswith('Status pomiaru') or '[kod]' in column]
+        assert all(imgw.get_column_dtype(column.rsplit(' (', 1)[0]) == 'float32' for column in statistics_columns)
+
+    def test_invalid_aggregation(self, imgw_database):
+        with pytest.raises(ValueError):
+            imgw.download_imgw_climatological_data('daily', 'synop', range(2001, 2002), aggregate='daily')
+        with pytest.raises(ValueError):
+            imgw.download_imgw_climatological_data('daily', 'synop', range(2001, 2002), aggregate='monthly',
+                                                   file_format_index='all')
+        with pytest.raises(ValueError):
+            imgw.aggregate_chunks([], 'monthly', statistics=['median'])
+
+
+class TestListingIndex:
+    def test_reusing_listings(self, imgw_database, tmp_path):
+        _, _, requests_log = imgw_database
+        for _ in range(2):  # by default, the listings are always downloaded
+            del requests_log[:]
+            imgw.download_imgw_climatological_data('daily', 'synop', range(2001, 2003), use_cache=True, cache_dir=tmp_path)
+            assert len([path for path, _ in requests_log if path.endswith('/')]) == 2
+
+        del requests_log[:]
+        imgw.download_imgw_climatological_data(
+            'daily', 'synop', range(2001, 2003), use_cache=True, cache_dir=tmp_path, listing_ttl=3600
+        )
+        assert not [path for path, _ in requests_log if path.endswith('/')]
+
+    def test_clearing_cache_keeps_indexes(self, imgw_database, tmp_path):
+        from cloupy.scraping.imgw_cache import ArchiveCache
+
+        cache_dir = tmp_path / 'cache'
+        imgw.download_imgw_climatological_data(
+            'daily', 'synop', range(2001, 2003), use_cache=True, cache_dir=cache_dir, stations='POZNAŃ'
+        )
+        ArchiveCache(cache_dir).clear()
+        assert sorted(path.name for path in cache_dir.iterdir()) == ['listings.json', 'stations.json']
+
+    def test_persisting_listings(self, tmp_path):
+        from cloupy.scraping.imgw_cache import ListingIndex
+
+        listing = [{'name': '2001_375_s.zip', 'modified': None, 'size': None}]
+        index = ListingIndex(tmp_path / 'listings.json')
+        index.put('url/', listing)
+        assert ListingIndex(tmp_path / 'listings.json').get('url/') == listing
+
+        index.listings['url/']['fetched'] -= 3601
+        assert index.get('url/') is None
+
+        with pytest.raises(ValueError):
+            ListingIndex(ttl=-1)
+
+
+class TestResumableDownloads:
+    @pytest.mark.parametrize('supports_ranges', [True, False])
+    def test_resuming_partial_archive(self, imgw_server, tmp_path, monkeypatch, supports_ranges):
+        import requests
+        from cloupy.scraping.imgw_cache import ResumableDownloads
+
+        root, base_url, requests_log = imgw_server
+        make_archive(root / '2001' / '2001_375_s.zip', {
+            's_d_375_2001.csv': make_rows('s_d', 352200375, 'WARSZAWA', 2001, months=range(1, 13))
+        })
+        content = (root / '2001' / '2001_375_s.zip').read_bytes()
+        url = base_url + '2001/2001_375_s.zip'
+
+        downloads = ResumableDownloads(tmp_path / 'downloads')
+        with open(downloads.path(url) + '.part', 'wb') as f:  # transfer interrupted in the middle
+            f.write(content[:len(content) // 2])
+
+        monkeypatch.setattr(QuietHandler, 'supports_ranges', supports_ranges)
+        with requests.Session() as session:
+            assert downloads.get(session, url) == content
+            assert [code for _, code in requests_log] == ([206] if supports_ranges else [200])
+            assert downloads.is_complete(url)
+
+            del requests_log[:]
+            assert downloads.get(session, url) == content
+            assert not requests_log
+
+    def test_rerunning_failed_download(self, imgw_database, tmp_path):
+        root, _, requests_log = imgw_database
+        download_dir = tmp_path / 'downloads'
+        broken_archive = root / 'dobowe' / 'synop' / '2002' / '2002_650_s.zip'
+        content = broken_archive.read_bytes()
+        broken_archive.write_bytes(b'not a zip file')
+
+        with pytest.raises(zipfile.BadZipFile):
+            imgw.download_imgw_climatological_data('daily', 'synop', range(2001, 2003), download_dir=download_dir)
+
+        broken_archive.write_bytes(content)
+        del requests_log[:]
+        df = imgw.download_imgw_climatological_data('daily', 'synop', range(2001, 2003), download_dir=download_dir)
+        assert [path for path, _ in requests_log if path.endswith('.zip')] == ['/dobowe/synop/2002/2002_650_s.zip']
+        assert len(df) == 18
+
+
+class TestParquetStore:
+    @pytest.fixture(autouse=True)
+    def pyarrow(self):
+        return pytest.importorskip('pyarrow')
+
+    def test_reading_from_store(self, imgw_database, tmp_path):
+        import pandas as pd
+
+        _, _, requests_log = imgw_database
+        store_dir = tmp_path / 'store'
+        df = imgw.download_imgw_climatological_data('daily', 'synop', range(2000, 2003))
+
+        stored_df = imgw.download_imgw_climatological_data('daily', 'synop', range(2000, 2003), store_dir=store_dir)
+        pd.testing.assert_frame_equal(stored_df.reset_index(drop=True), df.reset_index(drop=True))
+        assert (store_dir / 'interval=daily' / 'stations_kind=synop' / 'file_format=s_d' / 'year=1999').is_dir()
+
+        requests_number = len(requests_log)
+        stored_df = imgw.download_imgw_climatological_data(
+            'daily', 'synop', range(1999, 2002), store_dir=store_dir, keywords=['nazwa stacji', 'rok'],
+            stations='WARSZAWA', optimize_memory_usage=True
+        )
+        assert len(requests_log) == requests_number
+        assert list(stored_df.columns) == ['Nazwa stacji', 'Rok']
+        assert list(stored_df['Rok'].unique()) == [1999, 2000, 2001]
+        assert list(stored_df['Nazwa stacji'].unique()) == ['WARSZAWA']
+
+    def test_reading_optimized_data_from_store(self, imgw_database, tmp_path):
+        import pandas as pd
+
+        kwargs = dict(optimize_memory_usage=True, stations=[352200375])
+        df = imgw.download_imgw_climatological_data('daily', 'synop', range(2000, 2003), **kwargs)
+        stored_df = imgw.download_imgw_climatological_data(
+            'daily', 'synop', range(2000, 2003), store_dir=tmp_path / 'store', **kwargs
+        )
+        assert len(df) == 9
+        pd.testing.assert_frame_equal(stored_df.reset_index(drop=True), df.reset_index(drop=True))
+
+    def test_storing_letter_codes(self, imgw_database, tmp_path):
+        storage_dtypes = imgw.get_storage_dtypes('s_d')
+        names = imgw.get_column_names('s_d')
+        assert storage_dtypes[names.index('Stan gruntu [Z/R]')] == 'str'
+        assert storage_dtypes[names.index('Maksymalna temperatura dobowa [°C]')] == 'float64'
+
+        df = imgw.download_imgw_climatological_data(
+            'daily', 'synop', range(2001, 2003), store_dir=tmp_path / 'store', optimize_memory_usage=True,
+            keywords=['rodzaj opadu', 'stan gruntu']
+        )
+        assert len(df) == 18
+        assert sorted(df['Rodzaj opadu [S/W/ ]'].unique()) == ['S', 'W']
+        assert sorted(df['Stan gruntu [Z/R]'].unique()) == ['R', 'Z']
+
+    def test_downloading_only_missing_years(self, imgw_database, tmp_path):
+        _, _, requests_log = imgw_database
+        store_dir = tmp_path / 'store'
+        imgw.download_imgw_climatological_data('daily', 'synop', range(2001, 2002), store_dir=store_dir)
+
+        del requests_log[:]
+        imgw.download_imgw_climatological_data('daily', 'synop', range(2001, 2003), store_dir=store_dir)
+        assert {path.split('/')[-2] for path, _ in requests_log} == {'2002'}
+
+    def test_empty_and_current_years_are_not_complete(self, imgw_database, tmp_path):
+        import datetime
+
+        root, _, requests_log = imgw_database
+        current_year = datetime.date.today().year
+        (root / 'dobowe' / 'synop' / '2003').mkdir()
+        make_archive(root / 'dobowe' / 'synop' / str(current_year) / '{}_375_s.zip'.format(current_year), {
+            's_d_375_{}.csv'.format(current_year): make_rows('s_d', 352200375, 'WARSZAWA-OKĘCIE', current_year)
+        })
+        store_dir = tmp_path / 'store'
+        for years in [range(2003, 2004), range(current_year, current_year + 1)]:
+            imgw.download_imgw_climatological_data('daily', 'synop', years, store_dir=store_dir)
+
+            del requests_log[:]
+            df = imgw.download_imgw_climatological_data('daily', 'synop', years, store_dir=store_dir)
+            assert ('/dobowe/synop/{}/'.format(years[0]), 200) in requests_log  # listed again
+            assert list(df['Rok'].unique()) == ([] if years[0] == 2003 else [current_year])
+
+        partition = store_dir / 'interval=daily' / 'stations_kind=synop' / 'file_format=s_d' / 'year=2003'
+        assert not (partition / '_COMPLETE').exists()
+
+    def test_refreshing_store(self, imgw_database, tmp_path):
+        root, _, _ = imgw_database
+        store_dir = tmp_path / 'store'
+        summary = imgw.refresh_imgw_store('daily', 'synop', range(2001, 2003), store_dir)
+        assert summary == {'new': 6, 'changed': 0, 'unchanged': 0, 'removed': 0}
+
+        make_archive(root / 'dobowe' / 'synop' / '2002' / '2002_375_s.zip', {
+            's_d_375_2002.csv': make_rows('s_d', 352200375, 'WARSZAWA-OKĘCIE', 2002, months=(1, 2, 3, 4))
+        })
+        (root / 'dobowe' / 'synop' / '2002' / '2002_650_s.zip').unlink()
+        summary = imgw.refresh_imgw_store('daily', 'synop', range(2001, 2003), store_dir)
+        assert summary == {'new': 0, 'changed': 1, 'unchanged': 4, 'removed': 1}
+
+        df = imgw.download_imgw_climatological_data(
+            'daily', 'synop', range(2002, 2003), store_dir=store_dir, specific_columns=[1, 3]
+        )
+        assert sorted(df['Nazwa stacji'].unique()) == ['POZNAŃ', 'WARSZAWA']
+        assert list(df.loc[df['Nazwa stacji'] == 'WARSZAWA', 'Miesiąc']) == [1, 2, 3, 4]
+
+    def test_failed_listing_keeps_store(self, imgw_database, tmp_path):
+        root, _, _ = imgw_database
+        store_dir = tmp_path / 'store'
+        imgw.refresh_imgw_store('daily', 'synop', range(2001, 2003), store_dir)
+        partition = store_dir / 'interval=daily' / 'stations_kind=synop' / 'file_format=s_d' / 'year=2002'
+        parts = sorted(path.name for path in partition.iterdir())
+
+        shutil.rmtree(root / 'dobowe' / 'synop' / '2002')  # the listing responds with 404
+        summary = imgw.refresh_imgw_store('daily', 'synop', range(2001, 2003), store_dir)
+        assert summary == {'new': 0, 'changed': 0, 'unchanged': 3, 'removed': 0}
+        assert sorted(path.name for path in partition.iterdir()) == parts
+
+    def test_reading_listing_details(self):
+        import mock
+
+        session = mock.Mock()
+        session.get.return_value.content = (
+            b'<pre><a href="../">../</a>\n'
+            b'<a href="2002_375_s.zip">2002_375_s.zip</a>        2019-03-05 09:49   12K\n'
+            b'<a href="opis.txt">opis.txt</a>        2019-03-05 09:49   1.2K\n</pre>'
+        )
+        assert imgw.get_listing(session, 'url') == [
+            {'name': '2002_375_s.zip', 'modified': '2019-03-05 09:49', 'size': '12K'}
+        ]
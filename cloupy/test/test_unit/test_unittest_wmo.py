@@ -89,8 +89,51 @@ class TestReturningWmoidOrCoord:
         ) == {'LISBON': 46.45}
 
 
+class TestStationCatalog:
+    def test_catalog_is_loaded_once(self, monkeypatch):
+        import pandas as pd
+        from cloupy.scraping import wmo_stations
+
+        monkeypatch.setattr(wmo_stations, 'STATION_CATALOG', None)
+        read_csv = pd.read_csv
+        reads = []
+
+        def spy(*args, **kwargs):
+            reads.append(args)
+            return read_csv(*args, **kwargs)
+
+        monkeypatch.setattr(pd, 'read_csv', spy)
+        wmo.get_wmo_stations_info()
+        wmo.get_wmoid_or_coord('POZNAN', 'lat', contains_station_name=False)
+        wmo.search_for_the_nearest_station(lat=50, lon=-100)
+        assert len(reads) == 1
+
+    def test_same_stations_as_file(self):
+        import pandas as pd
+
+        path = str(wmo.__file__).replace('wmo.py', 'wmo_ids_and_coords.csv')
+        pd.testing.assert_frame_equal(
+            wmo.get_wmo_stations_info(), pd.read_csv(path, dtype={3: 'object'}, sep=';', index_col=0)
+        )
+
+    def test_lookups(self):
+        from cloupy.scraping.wmo_stations import get_station_catalog
+
+        catalog = get_station_catalog()
+        assert catalog.get(12330)['station'] == 'POZNAN'
+        assert catalog.get('0') is None
+        assert len(catalog.frame(catalog.find_rows(country='POLAND'))) == 61
+
+        df = catalog.lookup(['12330', 80419, '0'])
+        assert df['station'].tolist()[:2] == ['POZNAN', 'BARCELONA']
+        assert df['elv'].tolist()[:2] == [92.0, 7.0]
+        assert df.iloc[2].isnull().all()
+
+
 class TestDataDecoderAndTransposingTable:
     def test_wmo_data_decoding_and_table_transposing(self):
+        import numpy as np
+
         data = str(
             """
             # climexp_url :: https://climexp.knmi.nl/gettempall.cgi?WMO=12330
@@ -105,16 +148,19 @@ class TestDataDecoderAndTransposingTable:
         )
 
         decoded_data = wmo.decode_downloaded_data(data)
-        assert decoded_data == [
+        assert decoded_data.dtype == np.float64
+        np.testing.assert_array_equal(decoded_data, np.array([
             ['1951', '-0.9', '0.4', '0.7', '7.9', '11.8', '17.8', '18.3', '19.5', '14.8', '6.8', '6.5', '2.5'],
             ['1952', '0.4', '-0.2', '-1.2', '10.3', '11.7', '15.6', '18.1', '18.6', '11.5', '6.7', '1.8', '-1.9'],
             ['1953', '-1.4', '-1.1', '3.6', '10.0', '13.7', '19.3', '19.7', '16.8', '13.7', '10.6', '3.7', '0.3'],
             ['1954', '-5.7', '-8.2', '2.2', '5.3', '13.8', '19.0', '16.2', '17.5', '14.6', '9.0', '2.5', '2.7'],
             ['1955', '-3.5', '-3.3', '-0.7', '5.4', '11.0', '15.5', '18.7', '18.7', '14.4', '8.0', '3.4', '1.5']
-        ]
+        ], dtype='float64'))
+
+        np.testing.assert_array_equal(wmo.decode_downloaded_data(data, engine='pyarrow'), decoded_data)
 
         transposed_table = wmo.transpose_table(decoded_data)
-        assert transposed_table == [
+        np.testing.assert_array_equal(transposed_table, np.array([
             ['1951', 1, '-0.9'], ['1951', 2, '0.4'], ['1951', 3, '0.7'], ['1951', 4, '7.9'],
             ['1951', 5, '11.8'], ['1951', 6, '17.8'], ['1951', 7, '18.3'], ['1951', 8, '19.5'],
             ['1951', 9, '14.8'], ['1951', 10, '6.8'], ['1951', 11, '6.5'], ['1951', 12, '2.5'],
@@ -130,8 +176,47 @@ class TestDataDecoderAndTransposingTable:
             ['1955', 1, '-3.5'], ['1955', 2, '-3.3'], ['1955', 3, '-0.7'], ['1955', 4, '5.4'],
             ['1955', 5, '11.0'], ['1955', 6, '15.5'], ['1955', 7, '18.7'], ['1955', 8, '18.7'],
             ['1955', 9, '14.4'], ['1955', 10, '8.0'], ['1955', 11, '3.4'], ['1955', 12, '1.5']
-        ]
+        ], dtype='float64'))
+
+    @pytest.mark.parametrize('engine', ['pandas', 'pyarrow'])
+    def test_missing_values_and_ragged_rows(self, engine):
+        import numpy as np
+
+        data = str(
+            """
+            # tavg [Celsius] daily mean temperature
+            1990   -0.9 -999.9    0.7    7.9   11.8   17.8   18.3   19.5   14.8    6.8    6.5    2.5
+            1991    0.4   -0.2   -1.2   10.3   11.7   15.6   18.1   18.6   11.5    6.7  -99.9
+            """
+        )
+
+        decoded_data = wmo.decode_downloaded_data(data, engine=engine)
+        assert decoded_data.shape == (2, 13)
+        assert list(decoded_data[:, 0]) == [1990, 1991]
+        assert np.isnan(decoded_data[0, 2]) and np.isnan(decoded_data[1, 11:]).all()
+        assert np.isnan(decoded_data).sum() == 3
+
+
+    @pytest.mark.parametrize('engine', ['pandas', 'pyarrow'])
+    def test_rows_are_not_shifted(self, engine):
+        import numpy as np
+
+        data = str(
+            """
+            # tavg [Celsius] daily mean temperature
+            1990   -0.9   -1.0    0.7    7.9   11.8   17.8   18.3   19.5   14.8    6.8    6.5
+            1991    0.4   -0.2   -1.2   10.3   11.7   15.6   18.1   18.6   11.5    6.7    5.1    2.2
+            1992
+            """
+        )  # 26 values, as many as in 2 full rows
 
+        decoded_data = wmo.decode_downloaded_data(data, engine=engine)
+        assert list(decoded_data[:, 0]) == [1990, 1991, 1992]
+        assert np.isnan(decoded_data[0, 12]) and np.isnan(decoded_data[2, 1:]).all()
+        assert decoded_data[1, 12] == 2.2
+
+        with pytest.raises(ValueError):
+            wmo.decode_downloaded_data(data.replace('2.2\n', '2.2    1.0\n'), engine=engine)
 
 class TestLookingForTheNearestStation:
     def test_default_settings(self):
@@ -159,6 +244,47 @@ class TestLookingForTheNearestStation:
                         }
 
 
+class TestSpatialQueries:
+    @staticmethod
+    def haversine(lon, lat, df):
+        import numpy as np
+
+        lat1, lon1, lat2, lon2 = map(np.radians, [lat, lon, df['lat'].to_numpy(), df['lon'].to_numpy()])
+        a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        return 2 * 6371.0088 * np.arcsin(np.sqrt(a))
+
+    def test_k_nearest_stations(self):
+        stations = wmo.get_wmo_stations_info()
+        distances = self.haversine(16.9, 52.4, stations)
+
+        df = wmo.search_for_the_nearest_station(lon=16.9, lat=52.4, k=5)
+        assert list(df.index) == list(stations.index[distances.argsort(kind='stable')[:5]])
+        assert df['distance_km'].tolist() == pytest.approx(sorted(distances)[:5])
+        assert df['station'].iloc[0] == 'POZNAN'
+
+    def test_stations_within_radius(self):
+        stations = wmo.get_wmo_stations_info()
+        distances = self.haversine(-100, 50, stations)
+
+        df = wmo.search_for_the_nearest_station(lon=-100, lat=50, radius_km=150)
+        assert sorted(df.index) == sorted(stations.index[distances <= 150])
+        assert df['distance_km'].is_monotonic_increasing
+
+        assert len(wmo.search_for_the_nearest_station(lon=-100, lat=50, k=2, radius_km=150).index) == 2
+        with pytest.raises(ValueError):
+            wmo.search_for_the_nearest_station(lon=-100, lat=50, radius_km=-1)
+
+    def test_batch_queries(self):
+        import numpy as np
+
+        lons, lats = np.array([16.9, -100, 103.2]), np.array([52.4, 50, 45.9])
+        df = wmo.search_for_the_nearest_stations(lons, lats, k=3)
+        assert df['point'].tolist() == [0, 0, 0, 1, 1, 1, 2, 2, 2]
+        for point, (lon, lat) in enumerate(zip(lons, lats)):
+            single = wmo.search_for_the_nearest_station(lon, lat, k=3)
+            assert list(df[df['point'] == point].index) == list(single.index)
+
+
 class TestConcatenatingDataframes:
     def test_concatenating(self):
         data = [
@@ -210,3 +336,83 @@ class TestConcatenatingDataframes:
                      25: 3.4, 26: 6.4, 27: 10.9, 28: 12.4, 29: 23.3, 30: 2.0,
                      31: 2.0, 32: 2.0, 33: 2.0, 34: 2.0, 35: 2.0}
         }
+
+
+class TestConcurrentDownloading:
+    @pytest.fixture
+    def fake_website(self, monkeypatch):
+        """Replace the requests to the WMO website with a stand-in which records the concurrent requests"""
+        import numpy as np
+        import threading
+        import time
+
+        state = {'active': 0, 'max_active': 0, 'urls': []}
+        lock = threading.Lock()
+
+        def download_data(url, engine='pandas', session=None, host_limiter=None):
+            with host_limiter(url):
+                with lock:
+                    state['active'] += 1
+                    state['max_active'] = max(state['max_active'], state['active'])
+                    state['urls'].append(url)
+                time.sleep(0.01)
+                with lock:
+                    state['active'] -= 1
+
+            wmo_id = url.split('WMO=')[1]
+            if wmo_id.endswith('0') and 'getprcpall' in url:
+                raise FileNotFoundError()
+            value = float(wmo_id.split('.')[0]) % 100
+            return np.array([[2000] + [value] * 12, [2001] + [value] * 12])
+
+        monkeypatch.setattr(wmo, 'download_data', download_data)
+        return state
+
+    def test_same_data_for_any_number_of_threads(self, fake_website):
+        import pandas as pd
+
+        df = wmo.download_wmo_climatological_data('couPOLAND', ['temp', 'preci'], return_coordinates=True)
+        requests_number = len(fake_website['urls'])
+        assert fake_website['max_active'] == 1
+
+        parallel_df = wmo.download_wmo_climatological_data(
+            'couPOLAND', ['temp', 'preci'], return_coordinates=True, max_workers=8, max_requests_per_host=3
+        )
+        assert fake_website['max_active'] == 3
+        assert len(fake_website['urls']) == 2 * requests_number
+        pd.testing.assert_frame_equal(parallel_df, df)
+
+        assert list(df.columns) == ['station', 'year', 'month', 'temp', 'preci', 'lon', 'lat', 'elv']
+        assert list(df['station'].unique()) == list(wmo.get_wmoid_or_coord('couPOLAND', 'wmo_id'))
+        assert df['preci'].isnull().any() and df['preci'].notnull().any()
+
+    def test_invalid_workers(self, fake_website):
+        with pytest.raises(ValueError):
+            wmo.download_wmo_climatological_data('POZNAN', 'temp', max_workers=0)
+        with pytest.raises(ValueError):
+            wmo.download_wmo_climatological_data('POZNAN', 'temp', max_requests_per_host=0)
+
+
+class TestAligningElements:
+    def test_aligning_on_year_and_month(self):
+        import numpy as np
+
+        temp = wmo.transpose_table(np.array([
+            [2000] + [1.0] * 12,
+            [2002] + [3.0] * 11 + [-99.9]  # 2001 is missing in the middle of the series
+        ]))
+        preci = [['year', 'month', 'preci'], ['2001', 1, '10'], ['2001', 2, '20'], ['2003', 12, '30']]
+
+        sl_press = [['year', 'month', 'sl_press'], [None, None, None]]
+
+        df = wmo.concatenate_dfs([[['year', 'month', 'temp'], temp], preci, sl_press])
+        assert list(df.columns) == ['year', 'month', 'temp', 'preci', 'sl_press']
+        assert len(df.index) == 4 * 12
+        assert df['year'].tolist() == [year for year in range(2000, 2004) for _ in range(12)]
+
+        temp_by_year = df.groupby('year')['temp']
+        assert temp_by_year.count().tolist() == [12, 0, 11, 0]
+        assert df.loc[(df['year'] == 2002) & (df['month'] == 11), 'temp'].tolist() == [3.0]
+        assert df['preci'].dropna().tolist() == [10.0, 20.0, 30.0]
+        assert df.loc[(df['year'] == 2003) & (df['month'] == 12), 'preci'].tolist() == [30.0]
+        assert df['sl_press'].isnull().all()